@@ -0,0 +1,190 @@
+# benchmark_encoder.py
+"""
+인코더 백엔드 벤치마크 (torch vs onnx vs onnx-int8)
+- 단일 쿼리 인코딩 지연시간 (p50 / p95)
+- 배치 인코딩 지연시간 및 처리량
+- 프로세스 RSS (모델 로드 후 / 벤치마크 후 최대치)
+- torch fp32 대비 코사인 유사도 (기존 인덱스 호환성)
+
+백엔드마다 별도 서브프로세스에서 실행하여 메모리 측정을 분리합니다.
+
+사용 방법:
+    python database/benchmark_encoder.py
+    python database/benchmark_encoder.py --backends torch onnx-int8 --queries 500 --batch-size 64
+"""
+
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+SAMPLE_QUERIES = [
+    "투석 식이요법",
+    "CKD stage 3 diet",
+    "만성 신부전 환자의 칼륨 제한 식단",
+    "복막투석 중 여행을 가도 되나요?",
+    "혈액투석 후 피로감이 심해요",
+    "chronic kidney disease treatment",
+    "eGFR 수치가 45이면 몇 기인가요?",
+    "SGLT2 inhibitors in diabetic kidney disease",
+    "신장 이식 후 면역억제제 부작용",
+    "phosphate binder adherence in hemodialysis patients",
+    "단백뇨가 있으면 어떤 음식을 피해야 하나요",
+    "anemia management in CKD erythropoietin",
+    "신장 기능 저하 식이요법",
+    "hyperkalemia dietary potassium restriction",
+    "신부전 식단",
+    "blood pressure target for CKD patients",
+]
+
+
+def _rss_mb() -> float:
+    """현재 RSS (MB) - Linux /proc 기준, 없으면 최대 RSS 사용"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 1024 / 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_worker(backend: str, queries: int, batch_size: int, output_path: str):
+    """단일 백엔드 측정 (서브프로세스에서 실행)"""
+    from database.encoders import load_encoder
+
+    rss_before = _rss_mb()
+    load_start = time.perf_counter()
+    model = load_encoder(backend)
+    load_seconds = time.perf_counter() - load_start
+    rss_loaded = _rss_mb()
+
+    # 워밍업
+    model.encode(SAMPLE_QUERIES[:4])
+
+    # 1. 단일 쿼리 지연시간
+    single_ms = []
+    for i in range(queries):
+        text = SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)]
+        start = time.perf_counter()
+        model.encode(text)
+        single_ms.append((time.perf_counter() - start) * 1000)
+
+    # 2. 배치 지연시간
+    batch_texts = [SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)] for i in range(batch_size)]
+    batch_ms = []
+    for _ in range(max(3, queries // batch_size)):
+        start = time.perf_counter()
+        model.encode(batch_texts, batch_size=batch_size)
+        batch_ms.append((time.perf_counter() - start) * 1000)
+
+    embeddings = np.asarray(model.encode(SAMPLE_QUERIES), dtype=np.float32)
+    np.save(output_path + ".npy", embeddings)
+
+    result = {
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "single_p50_ms": statistics.median(single_ms),
+        "single_p95_ms": _percentile(single_ms, 95),
+        "batch_size": batch_size,
+        "batch_p50_ms": statistics.median(batch_ms),
+        "batch_qps": batch_size / (statistics.median(batch_ms) / 1000),
+        "rss_model_mb": rss_loaded - rss_before,
+        "rss_peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+    with open(output_path, "w") as f:
+        json.dump(result, f)
+
+
+def run_benchmark(backends: List[str], queries: int, batch_size: int) -> List[Dict]:
+    """백엔드별 서브프로세스 실행 후 결과 수집"""
+    from database.encoders import cosine_report, COSINE_TOLERANCE
+
+    results = []
+    reference = None
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for backend in backends:
+            output_path = str(Path(tmp_dir) / f"{backend}.json")
+            print(f"\n⏱️  {backend} 측정 중...")
+            subprocess.run(
+                [
+                    sys.executable, __file__,
+                    "--worker", backend,
+                    "--queries", str(queries),
+                    "--batch-size", str(batch_size),
+                    "--output", output_path,
+                ],
+                check=True
+            )
+
+            with open(output_path) as f:
+                result = json.load(f)
+            embeddings = np.load(output_path + ".npy")
+
+            if backend == "torch":
+                reference = embeddings
+            if reference is not None:
+                result.update(cosine_report(reference, embeddings))
+                result["within_tolerance"] = result["min_cosine"] >= COSINE_TOLERANCE.get(backend, 0.0)
+
+            results.append(result)
+
+    return results
+
+
+def print_report(results: List[Dict]):
+    print(f"\n{'='*100}")
+    print("📊 인코더 백엔드 벤치마크")
+    print(f"{'='*100}")
+    print(
+        f"{'backend':<12}{'load(s)':>9}{'p50(ms)':>10}{'p95(ms)':>10}"
+        f"{'batch p50(ms)':>15}{'batch qps':>12}{'RSS(MB)':>10}{'peak(MB)':>10}{'min cos':>10}"
+    )
+    for r in results:
+        min_cos = f"{r['min_cosine']:.4f}" if "min_cosine" in r else "-"
+        print(
+            f"{r['backend']:<12}{r['load_seconds']:>9.2f}{r['single_p50_ms']:>10.2f}{r['single_p95_ms']:>10.2f}"
+            f"{r['batch_p50_ms']:>15.2f}{r['batch_qps']:>12.1f}{r['rss_model_mb']:>10.1f}{r['rss_peak_mb']:>10.1f}{min_cos:>10}"
+        )
+        if r.get("within_tolerance") is False:
+            print(f"   ⚠️ {r['backend']}: torch 대비 코사인 허용 오차 초과")
+    print(f"{'='*100}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="인코더 백엔드 벤치마크")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--queries", type=int, default=200, help="단일 쿼리 측정 횟수")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.queries, args.batch_size, args.output)
+    else:
+        backends = args.backends
+        # 호환성 비교 기준(torch)을 항상 먼저 측정
+        if "torch" in backends:
+            backends = ["torch"] + [b for b in backends if b != "torch"]
+        print_report(run_benchmark(backends, args.queries, args.batch_size))
@@ -0,0 +1,472 @@
+"""
+로컬 BM25 역색인 (MongoDB $text 대체 키워드 검색)
+- MongoDB $text는 한국어 형태소 분석이 없어 복합어("신장이식", "만성신부전증")가 거의 매칭되지 않음
+- 한글은 음절 2-gram/3-gram, 영문/숫자는 단어 단위로 토큰화 → 띄어쓰기·복합어와 무관하게 매칭
+- BM25 점수 (컬렉션 간 비교 가능한 스케일, textScore와 달리 문서 길이 정규화 포함)
+- 세그먼트 단위 증분 색인: 새 문서는 새 세그먼트로 추가, 재색인 문서는 이전 세그먼트에서 삭제 표시
+- postings는 CSR 배열(.npy)로 저장하고 mmap 로드 → 2.2M 문서도 상주 메모리 최소화
+
+디렉토리 구조:
+    {index_dir}/manifest.json
+    {index_dir}/seg_000001/term_hashes.npy   # 정렬된 term 해시 (uint64)
+                          /term_offsets.npy  # term별 postings 시작 위치 (int64, T+1)
+                          /post_docs.npy     # 세그먼트 내 문서 번호 (uint32)
+                          /post_tfs.npy      # term 빈도 (uint16)
+                          /doc_lengths.npy   # 문서 길이 (토큰 수, uint32)
+                          /doc_ids.npy       # 문서 ID (bytes)
+                          /deleted.npy       # 삭제 표시 (bool)
+"""
+
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import hashlib
+import json
+import re
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from database.embedding_cache import normalize_text
+
+# 컬렉션별 색인 대상 필드
+INDEX_FIELDS = {
+    "qa_data": ["question", "answer"],
+    "papers": ["title", "abstract"],
+    "medical_data": ["text", "keyword"],
+}
+
+# 한글 음절 연속 구간 / 영문·숫자 단어
+_TOKEN_RE = re.compile(r"[가-힣]+|[a-z0-9]+")
+
+
+def tokenize(text: str, ngram_sizes: Sequence[int] = (2, 3)) -> List[str]:
+    """한글은 음절 n-gram, 영문/숫자는 단어 단위 토큰화
+
+    예: "만성신부전 diet" → ["만성", "성신", "신부", "부전", "만성신", "성신부", "신부전", "diet"]
+    """
+    tokens = []
+    for run in _TOKEN_RE.findall(normalize_text(text or "")):
+        if run[0] < "가":
+            tokens.append(run)
+            continue
+
+        if len(run) < min(ngram_sizes):
+            tokens.append(run)
+            continue
+
+        for n in ngram_sizes:
+            tokens.extend(run[i:i + n] for i in range(len(run) - n + 1))
+
+    return tokens
+
+
+def term_hash(term: str) -> int:
+    """term → 64bit 해시 (어휘 사전을 메모리에 두지 않기 위함)"""
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def document_text(doc: Dict, fields: Sequence[str]) -> str:
+    """색인 대상 필드 결합 (리스트 필드는 공백 결합)"""
+    parts = []
+    for field in fields:
+        value = doc.get(field)
+        if isinstance(value, list):
+            value = " ".join(str(v) for v in value)
+        if value:
+            parts.append(str(value))
+    return " ".join(parts)
+
+
+# ==================== 세그먼트 ====================
+
+class _Segment:
+    """불변 postings 세그먼트 (삭제 표시만 변경 가능)"""
+
+    FILES = ("term_hashes", "term_offsets", "post_docs", "post_tfs", "doc_lengths", "doc_ids")
+
+    def __init__(self, directory: Path, arrays: Dict[str, np.ndarray], deleted: np.ndarray):
+        self.directory = directory
+        self.term_hashes = arrays["term_hashes"]
+        self.term_offsets = arrays["term_offsets"]
+        self.post_docs = arrays["post_docs"]
+        self.post_tfs = arrays["post_tfs"]
+        self.doc_lengths = arrays["doc_lengths"]
+        self.doc_ids = arrays["doc_ids"]
+        self.deleted = deleted
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    @property
+    def live_count(self) -> int:
+        return len(self) - int(self.deleted.sum())
+
+    @property
+    def live_length(self) -> int:
+        return int(self.doc_lengths[~self.deleted].sum())
+
+    @classmethod
+    def build(cls, directory: Path, doc_ids: List[str], doc_tokens: List[List[str]]) -> "_Segment":
+        """문서 토큰 리스트 → CSR postings 세그먼트 생성 및 저장"""
+        # term별 (문서 번호, 빈도)를 typed array에 누적 (수천만 개 tuple 생성 시 GC 비용 회피)
+        post_rows: Dict[str, array] = defaultdict(lambda: array("I"))
+        post_counts: Dict[str, array] = defaultdict(lambda: array("H"))
+        doc_lengths = np.zeros(len(doc_ids), dtype=np.uint32)
+
+        for row, tokens in enumerate(doc_tokens):
+            doc_lengths[row] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                post_rows[term].append(row)
+                post_counts[term].append(min(tf, 65535))
+
+        terms = list(post_rows)
+        hashes = np.array([term_hash(t) for t in terms], dtype=np.uint64)
+        order = np.argsort(hashes, kind="stable")
+
+        counts = np.array([len(post_rows[terms[i]]) for i in order], dtype=np.int64)
+        term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(counts, out=term_offsets[1:])
+
+        post_docs = np.empty(term_offsets[-1], dtype=np.uint32)
+        post_tfs = np.empty(term_offsets[-1], dtype=np.uint16)
+        for position, i in enumerate(order):
+            start, end = term_offsets[position], term_offsets[position + 1]
+            post_docs[start:end] = np.frombuffer(post_rows[terms[i]], dtype=np.uint32)
+            post_tfs[start:end] = np.frombuffer(post_counts[terms[i]], dtype=np.uint16)
+
+        arrays = {
+            "term_hashes": hashes[order],
+            "term_offsets": term_offsets,
+            "post_docs": post_docs,
+            "post_tfs": post_tfs,
+            "doc_lengths": doc_lengths,
+            "doc_ids": np.array([d.encode("utf-8") for d in doc_ids], dtype=bytes),
+        }
+        deleted = np.zeros(len(doc_ids), dtype=bool)
+
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, values in arrays.items():
+            np.save(directory / f"{name}.npy", values)
+        np.save(directory / "deleted.npy", deleted)
+
+        return cls.load(directory)
+
+    @classmethod
+    def load(cls, directory: Path) -> "_Segment":
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in cls.FILES}
+        # 삭제 표시는 수정 가능해야 하므로 메모리에 적재
+        deleted = np.load(directory / "deleted.npy")
+        return cls(directory, arrays, deleted)
+
+    def save_deleted(self):
+        np.save(self.directory / "deleted.npy", self.deleted)
+
+    def lookup(self, hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """term 해시 배열 → (postings 시작, 끝) - 없는 term은 start == end"""
+        if len(self.term_hashes) == 0:
+            empty = np.zeros(len(hashes), dtype=np.int64)
+            return empty, empty
+
+        positions = np.searchsorted(self.term_hashes, hashes)
+        positions = np.minimum(positions, len(self.term_hashes) - 1)
+        found = self.term_hashes[positions] == hashes
+
+        starts = np.where(found, self.term_offsets[positions], 0)
+        ends = np.where(found, self.term_offsets[positions + 1], 0)
+        return starts, ends
+
+    def mark_deleted(self, doc_ids: np.ndarray) -> int:
+        """주어진 ID의 문서 삭제 표시 → 새로 삭제된 수"""
+        mask = np.isin(self.doc_ids, doc_ids) & ~self.deleted
+        count = int(mask.sum())
+        if count:
+            self.deleted |= mask
+            self.save_deleted()
+        return count
+
+
+# ==================== 인덱스 ====================
+
+class BM25Index:
+    """세그먼트 기반 BM25 역색인
+
+    사용 예:
+        index = BM25Index("data/bm25_index/qa_data")
+        index.load()
+        index.add_documents([("id1", "만성 신부전 식단"), ...])
+        index.flush()
+        hits = index.search("신부전 식이요법", limit=10)  # [(doc_id, score), ...]
+    """
+
+    def __init__(
+        self,
+        index_dir,
+        k1: float = 1.2,
+        b: float = 0.75,
+        ngram_sizes: Sequence[int] = (2, 3),
+        segment_size: int = 200_000
+    ):
+        """
+        Args:
+            index_dir: 인덱스 디렉토리
+            k1, b: BM25 파라미터
+            ngram_sizes: 한글 음절 n-gram 크기
+            segment_size: 세그먼트당 최대 문서 수 (검색 시 점수 배열 크기 상한)
+        """
+        self.index_dir = Path(index_dir)
+        self.k1 = k1
+        self.b = b
+        self.ngram_sizes = tuple(ngram_sizes)
+        self.segment_size = segment_size
+
+        self.segments: List[_Segment] = []
+        self.watermark: Optional[str] = None  # 마지막으로 색인한 원본 ID (증분 색인 재개 지점)
+
+        self._buffer_ids: List[str] = []
+        self._buffer_tokens: List[List[str]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(segment.live_count for segment in self.segments)
+
+    # ==================== 저장 / 로드 ====================
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.index_dir / "manifest.json"
+
+    def load(self) -> bool:
+        """디스크에서 로드 (인덱스가 없으면 False)"""
+        if not self.manifest_path.exists():
+            return False
+
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if tuple(manifest.get("ngram_sizes", self.ngram_sizes)) != self.ngram_sizes:
+            raise ValueError(
+                f"n-gram 설정 불일치: 인덱스 {manifest['ngram_sizes']}, 요청 {list(self.ngram_sizes)} - 재색인 필요"
+            )
+
+        with self._lock:
+            self.segments = [_Segment.load(self.index_dir / name) for name in manifest["segments"]]
+            self.watermark = manifest.get("watermark")
+
+        return True
+
+    def _save_manifest(self):
+        manifest = {
+            "segments": [segment.directory.name for segment in self.segments],
+            "watermark": self.watermark,
+            "ngram_sizes": list(self.ngram_sizes),
+            "documents": len(self),
+            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        tmp_path.replace(self.manifest_path)
+
+    # ==================== 증분 색인 ====================
+
+    def add_documents(self, documents: Iterable[Tuple[str, str]], track_watermark: bool = False):
+        """(문서 ID, 텍스트) 추가 - segment_size마다 자동 flush
+
+        Args:
+            track_watermark: 문서를 원본 ID 순서로 추가하는 경우 True - 자동 flush 때마다
+                세그먼트의 마지막 문서 ID를 watermark로 저장 (중단 후 재실행 시 그 이후부터 색인)
+        """
+        for doc_id, text in documents:
+            self._buffer_ids.append(str(doc_id))
+            self._buffer_tokens.append(tokenize(text, self.ngram_sizes))
+
+            if len(self._buffer_ids) >= self.segment_size:
+                self.flush(watermark=str(doc_id) if track_watermark else None)
+
+    def flush(self, watermark: Optional[str] = None):
+        """버퍼 문서를 새 세그먼트로 저장 (이미 색인된 같은 ID는 이전 세그먼트에서 삭제 표시)"""
+        with self._lock:
+            if self._buffer_ids:
+                new_ids = np.array([d.encode("utf-8") for d in self._buffer_ids], dtype=bytes)
+                for segment in self.segments:
+                    segment.mark_deleted(new_ids)
+
+                # 버퍼 내부 중복은 마지막 것만 유지
+                latest = {doc_id: row for row, doc_id in enumerate(self._buffer_ids)}
+                rows = sorted(latest.values())
+
+                self.index_dir.mkdir(parents=True, exist_ok=True)
+                segment_dir = self.index_dir / f"seg_{self._next_segment_number():06d}"
+                segment = _Segment.build(
+                    segment_dir,
+                    [self._buffer_ids[r] for r in rows],
+                    [self._buffer_tokens[r] for r in rows]
+                )
+                self.segments.append(segment)
+
+                self._buffer_ids = []
+                self._buffer_tokens = []
+
+            if watermark is not None:
+                self.watermark = watermark
+
+            if self.segments:
+                self._save_manifest()
+
+    def delete(self, doc_ids: Iterable[str]) -> int:
+        """문서 삭제 표시 → 삭제된 문서 수"""
+        ids = np.array([str(d).encode("utf-8") for d in doc_ids], dtype=bytes)
+        with self._lock:
+            deleted = sum(segment.mark_deleted(ids) for segment in self.segments)
+            if deleted:
+                self._save_manifest()
+        return deleted
+
+    def _next_segment_number(self) -> int:
+        numbers = [int(segment.directory.name.split("_")[1]) for segment in self.segments]
+        return max(numbers, default=0) + 1
+
+    # ==================== 검색 ====================
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """BM25 검색 → [(문서 ID, 점수), ...] (점수 내림차순)"""
+        query_terms = Counter(tokenize(query, self.ngram_sizes))
+        if not query_terms or not self.segments or limit <= 0:
+            return []
+
+        hashes = np.array([term_hash(t) for t in query_terms], dtype=np.uint64)
+        query_tfs = np.array(list(query_terms.values()), dtype=np.float32)
+
+        segments = self.segments
+        ranges = [segment.lookup(hashes) for segment in segments]
+
+        # 전체 세그먼트 기준 통계 (df는 삭제 표시 문서를 포함한 근사값)
+        total_docs = sum(segment.live_count for segment in segments)
+        if total_docs == 0:
+            return []
+        avg_length = sum(segment.live_length for segment in segments) / total_docs
+        df = np.sum([ends - starts for starts, ends in ranges], axis=0).astype(np.float64)
+        idf = np.log1p((total_docs - df + 0.5) / (df + 0.5)) * query_tfs
+
+        candidates: List[Tuple[float, int, int]] = []
+        for seg_no, (segment, (starts, ends)) in enumerate(zip(segments, ranges)):
+            matched_terms = np.nonzero(ends > starts)[0]
+            if len(matched_terms) == 0:
+                continue
+
+            # 문서 길이 정규화 항 (세그먼트당 1회 계산)
+            length_norm = (self.k1 * (1 - self.b + self.b * np.asarray(segment.doc_lengths) / avg_length)).astype(np.float32)
+
+            docs_parts, weight_parts = [], []
+            for term_no in matched_terms:
+                start, end = starts[term_no], ends[term_no]
+                docs = np.asarray(segment.post_docs[start:end])
+                tfs = np.asarray(segment.post_tfs[start:end], dtype=np.float32)
+                docs_parts.append(docs)
+                weight_parts.append(idf[term_no] * tfs * (self.k1 + 1) / (tfs + length_norm[docs]))
+
+            scores = np.bincount(
+                np.concatenate(docs_parts),
+                weights=np.concatenate(weight_parts),
+                minlength=len(segment)
+            )
+            scores[segment.deleted] = 0.0
+
+            k = min(limit, int(np.count_nonzero(scores)))
+            if k == 0:
+                continue
+            top = np.argpartition(-scores, k - 1)[:k]
+            candidates.extend((float(scores[row]), seg_no, int(row)) for row in top)
+
+        candidates.sort(key=lambda c: -c[0])
+        return [
+            (segments[seg_no].doc_ids[row].decode("utf-8"), score)
+            for score, seg_no, row in candidates[:limit]
+        ]
+
+    def get_stats(self) -> Dict:
+        return {
+            "documents": len(self),
+            "segments": len(self.segments),
+            "terms": sum(len(segment.term_hashes) for segment in self.segments),
+            "postings": sum(len(segment.post_docs) for segment in self.segments),
+            "disk_mb": sum(
+                f.stat().st_size for segment in self.segments for f in segment.directory.iterdir()
+            ) / 1024 / 1024,
+            "watermark": self.watermark,
+        }
+
+
+# ==================== 벤치마크 ====================
+
+def benchmark(num_docs: int = 100_000, num_queries: int = 200, limit: int = 10, index_dir: Optional[str] = None) -> Dict:
+    """합성 한국어 문서로 색인/검색 성능 측정"""
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    vocabulary = [
+        "만성", "신부전", "신장", "투석", "혈액투석", "복막투석", "사구체", "여과율", "단백뇨", "고혈압",
+        "당뇨병성", "신증", "칼륨", "인", "나트륨", "식이요법", "저염식", "이식", "면역억제제", "크레아티닌",
+        "빈혈", "부종", "요산", "환자", "치료", "관리", "증상", "검사", "수치", "약물",
+    ]
+
+    # 단일어 + 복합어 ("만성신부전", "신장이식" 등 띄어쓰기 없는 조합)
+    words = vocabulary + [a + b for a in vocabulary for b in vocabulary if a != b]
+
+    def make_text(length: int) -> str:
+        return " ".join(words[i] for i in rng.integers(0, len(words), length))
+
+    directory = Path(index_dir) if index_dir else Path(tempfile.mkdtemp(prefix="bm25_bench_"))
+    index = BM25Index(directory)
+
+    start = time.perf_counter()
+    index.add_documents((f"doc{i}", make_text(int(rng.integers(20, 60)))) for i in range(num_docs))
+    index.flush(watermark=f"doc{num_docs - 1}")
+    build_seconds = time.perf_counter() - start
+
+    # mmap 재로드 후 검색
+    index = BM25Index(directory)
+    index.load()
+
+    queries = [make_text(int(rng.integers(1, 4))) for _ in range(num_queries)]
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, limit)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    return {
+        **index.get_stats(),
+        "build_seconds": build_seconds,
+        "docs_per_second": num_docs / build_seconds,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95)],
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="BM25 역색인 벤치마크 (합성 문서)")
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--index-dir", help="인덱스 저장 위치 (기본값: 임시 디렉토리)")
+    args = parser.parse_args()
+
+    print(f"\n🔤 BM25 벤치마크: 문서 {args.docs:,}개, 쿼리 {args.queries}개")
+    stats = benchmark(args.docs, args.queries, args.limit, args.index_dir)
+
+    print(f"  색인: {stats['build_seconds']:.1f}초 ({stats['docs_per_second']:,.0f} docs/s)")
+    print(f"  세그먼트 {stats['segments']}개, term {stats['terms']:,}개, postings {stats['postings']:,}개, 디스크 {stats['disk_mb']:.1f} MB")
+    print(f"  검색 지연: p50 {stats['p50_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms")
@@ -0,0 +1,150 @@
+"""
+MongoDB 컬렉션 → 로컬 BM25 역색인 생성 (증분)
+- _id 순서로 읽으며 마지막으로 색인한 _id(watermark) 이후 문서만 추가
+- --rebuild: 기존 인덱스 삭제 후 전체 재색인
+- --benchmark: 같은 쿼리로 MongoDB $text vs BM25 지연 비교
+
+사용법:
+    python database/build_bm25_index.py                       # 전체 컬렉션 증분 색인
+    python database/build_bm25_index.py --collection qa_data  # 특정 컬렉션만
+    python database/build_bm25_index.py --benchmark "신부전 식단" "투석 칼륨"
+"""
+
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import argparse
+import asyncio
+import shutil
+import time
+from typing import List
+
+from bson import ObjectId
+
+from database.bm25_index import BM25Index, INDEX_FIELDS, document_text
+from database.mongodb_manager import MongoDBManager
+
+
+async def build_collection(
+    mongo: MongoDBManager,
+    collection_name: str,
+    batch_size: int = 10_000,
+    rebuild: bool = False
+):
+    """컬렉션 하나를 증분 색인"""
+    index_dir = mongo.bm25_dir / collection_name
+    if rebuild and index_dir.exists():
+        shutil.rmtree(index_dir)
+
+    index = BM25Index(index_dir)
+    index.load()
+
+    query = {}
+    if index.watermark:
+        last_id = ObjectId(index.watermark) if ObjectId.is_valid(index.watermark) else index.watermark
+        query = {"_id": {"$gt": last_id}}
+
+    fields = INDEX_FIELDS[collection_name]
+    total = await mongo.db[collection_name].count_documents(query)
+    print(f"\n📚 {collection_name}: 색인 대상 {total:,}개 (watermark: {index.watermark or '없음'})")
+
+    if total == 0:
+        return
+
+    cursor = mongo.db[collection_name].find(query, {field: 1 for field in fields}).sort("_id", 1)
+
+    start = time.perf_counter()
+    indexed = 0
+    batch = []
+    last_id = None
+
+    async for doc in cursor:
+        last_id = str(doc["_id"])
+        batch.append((last_id, document_text(doc, fields)))
+
+        if len(batch) >= batch_size:
+            index.add_documents(batch, track_watermark=True)
+            indexed += len(batch)
+            batch = []
+            print(f"  ... {indexed:,}/{total:,} ({indexed / (time.perf_counter() - start):,.0f} docs/s)")
+
+    if batch:
+        index.add_documents(batch, track_watermark=True)
+        indexed += len(batch)
+
+    # 세그먼트 저장과 함께 watermark 갱신 (segment_size마다 자동 flush 시에도 갱신)
+    # → 중단 후 재실행 시 마지막으로 저장된 세그먼트 이후부터 이어서 색인
+    index.flush(watermark=last_id)
+
+    stats = index.get_stats()
+    print(f"✅ {collection_name}: {indexed:,}개 색인 ({time.perf_counter() - start:.1f}초)")
+    print(f"   문서 {stats['documents']:,}개, 세그먼트 {stats['segments']}개, 디스크 {stats['disk_mb']:.1f} MB")
+
+
+async def benchmark(mongo: MongoDBManager, queries: List[str], limit: int = 10, repeat: int = 5):
+    """같은 쿼리로 MongoDB $text vs BM25 검색 지연 비교"""
+    searches = {
+        "qa_data": mongo.search_qa,
+        "papers": mongo.search_papers,
+        "medical_data": mongo.search_medical,
+    }
+
+    mongo.load_bm25_indexes()
+    bm25_indexes = dict(mongo.bm25_indexes)
+
+    print(f"\n{'collection':<14}{'backend':<8}{'avg(ms)':>10}{'결과 수':>8}  쿼리")
+    for collection_name, search in searches.items():
+        if collection_name not in bm25_indexes:
+            continue
+
+        for query in queries:
+            for backend in ("mongo", "bm25"):
+                # search_* 는 bm25_indexes에 컬렉션이 있으면 BM25를 사용
+                mongo.bm25_indexes = bm25_indexes if backend == "bm25" else {}
+
+                results = await search(query, limit)  # 워밍업
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    await search(query, limit)
+                elapsed = (time.perf_counter() - start) / repeat * 1000
+
+                print(f"{collection_name:<14}{backend:<8}{elapsed:>10.1f}{len(results):>8}  {query}")
+
+    mongo.bm25_indexes = bm25_indexes
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="MongoDB → 로컬 BM25 역색인 생성")
+    parser.add_argument("--collection", choices=list(INDEX_FIELDS), help="특정 컬렉션만 색인 (기본값: 전체)")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--rebuild", action="store_true", help="기존 인덱스 삭제 후 전체 재색인")
+    parser.add_argument("--benchmark", nargs="*", metavar="QUERY", help="색인 대신 $text vs BM25 지연 비교")
+    args = parser.parse_args()
+
+    # 색인 중에는 $text 검색 사용 (connect 시 BM25 인덱스 로드 생략)
+    mongo = MongoDBManager(keyword_backend="mongo")
+    await mongo.connect()
+
+    try:
+        if args.benchmark is not None:
+            await benchmark(mongo, args.benchmark or ["신부전 식단", "혈액투석 칼륨 제한", "신장이식 면역억제제"])
+            return
+
+        print("\n" + "="*70)
+        print(f"🔤 BM25 역색인 생성 → {mongo.bm25_dir}")
+        print("="*70)
+
+        collections = [args.collection] if args.collection else list(INDEX_FIELDS)
+        for collection_name in collections:
+            await build_collection(mongo, collection_name, args.batch_size, args.rebuild)
+
+    finally:
+        await mongo.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
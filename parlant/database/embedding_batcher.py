@@ -0,0 +1,106 @@
+"""
+마이크로 배칭 임베딩 인코더
+- 짧은 시간(max_wait_ms) 안에 들어온 동시 요청을 모아 한 번의 model.encode 배치 호출로 처리
+- 인코딩은 전용 스레드 풀(executor)에서 실행 → 이벤트 루프 블로킹 방지
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from typing import Callable, List, Sequence, Set, Tuple, Optional, Dict
+
+
+class MicroBatchEncoder:
+    """동시 인코딩 요청 → 단일 배치 호출
+
+    사용 예:
+        encoder = MicroBatchEncoder(model.encode, executor, max_batch_size=32, max_wait_ms=5)
+        embedding = await encoder.encode("투석 식이요법")
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], Sequence],
+        executor: Executor,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        """
+        Args:
+            encode_fn: 텍스트 리스트 → 임베딩 배열 (동기 함수, executor에서 실행)
+            executor: 인코딩 실행용 스레드 풀 (크기 제한)
+            max_batch_size: 배치당 최대 요청 수 (도달 시 즉시 실행)
+            max_wait_ms: 첫 요청 이후 배치를 모으는 최대 대기 시간
+        """
+        self.encode_fn = encode_fn
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        # 실행 중인 배치 태스크 (이벤트 루프는 약한 참조만 유지 → 완료 전 GC 방지)
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.stats = {
+            "requests": 0,
+            "batches": 0,
+            "max_batch_size_seen": 0,
+        }
+
+    async def encode(self, text: str) -> List[float]:
+        """단일 텍스트 인코딩 (내부적으로 다른 요청과 배치 처리)"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        self._pending.append((text, future))
+        self.stats["requests"] += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """대기 중인 요청을 배치로 묶어 executor에 제출"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        loop = asyncio.get_running_loop()
+        texts = [text for text, _ in batch]
+
+        self.stats["batches"] += 1
+        self.stats["max_batch_size_seen"] = max(self.stats["max_batch_size_seen"], len(batch))
+
+        try:
+            embeddings = await loop.run_in_executor(self.executor, self.encode_fn, texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(
+                    embedding.tolist() if hasattr(embedding, "tolist") else list(embedding)
+                )
+
+    def get_stats(self) -> Dict:
+        """배치 통계 (평균 배치 크기 포함)"""
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "avg_batch_size": self.stats["requests"] / batches if batches else 0.0,
+        }
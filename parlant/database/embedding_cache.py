@@ -0,0 +1,102 @@
+"""
+쿼리 임베딩 캐시 (LRU + TTL)
+- 정규화된 텍스트를 키로 임베딩 벡터 저장 ("투석  식이요법" == "투석 식이요법")
+- 크기 제한 LRU 제거 + 선택적 TTL 만료
+- hit/miss 카운터 제공
+- 스레드 안전 (executor 스레드와 이벤트 루프에서 동시 사용)
+- 쿼리 전용: 문서 적재(upsert_embeddings)는 캐시를 거치지 않음 (문서 텍스트가 쿼리 임베딩을 밀어내지 않도록)
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional, Dict, Tuple
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 텍스트 정규화 (NFKC + 소문자 + 공백 정리)"""
+    text = unicodedata.normalize("NFKC", text)
+    return _WHITESPACE_RE.sub(" ", text).strip().lower()
+
+
+class EmbeddingCache:
+    """크기 제한 LRU + TTL 임베딩 캐시
+
+    사용 예:
+        cache = EmbeddingCache(max_size=10000, ttl_seconds=3600)
+        vector = cache.get("CKD stage 3 diet")
+        if vector is None:
+            vector = model.encode(...).tolist()
+            cache.put("CKD stage 3 diet", vector)
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            max_size: 최대 항목 수 (초과 시 가장 오래 사용되지 않은 항목 제거)
+            ttl_seconds: 항목 유효 시간 (None 또는 0이면 만료 없음)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds or None
+
+        self._data: "OrderedDict[str, Tuple[float, Tuple[float, ...]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, text: str) -> Optional[List[float]]:
+        key = normalize_text(text)
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            created_at, vector = entry
+            if self.ttl_seconds and time.monotonic() - created_at > self.ttl_seconds:
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return list(vector)
+
+    def put(self, text: str, vector: List[float]):
+        if self.max_size <= 0:
+            return
+
+        key = normalize_text(text)
+
+        with self._lock:
+            self._data[key] = (time.monotonic(), tuple(vector))
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,116 @@
+"""
+임베딩 인코더 백엔드 선택 (CPU 추론 최적화)
+- torch      : 기존 PyTorch fp32 (기본값)
+- onnx       : ONNX Runtime fp32 (동일 가중치, CPU 그래프 최적화)
+- onnx-int8  : ONNX Runtime + 동적 int8 양자화
+
+모든 백엔드는 SentenceTransformer 객체를 반환하므로 model.encode() 호출부는 변경 없음.
+
+기존 인덱스(torch fp32로 임베딩)와의 호환 허용 오차 (쿼리별 코사인 유사도 하한):
+- onnx      : >= 0.999 (수치 오차 수준)
+- onnx-int8 : >= 0.98  (상위 결과 순위는 대부분 유지, 재임베딩 불필요)
+"""
+
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from typing import List, Dict, Optional
+import os
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+SUPPORTED_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# 백엔드별 최소 코사인 유사도 (torch fp32 기준)
+COSINE_TOLERANCE = {
+    "torch": 1.0,
+    "onnx": 0.999,
+    "onnx-int8": 0.98,
+}
+
+
+def load_encoder(
+    backend: str = "torch",
+    model_name: str = DEFAULT_MODEL,
+    export_dir: Optional[str] = None,
+    quantization_config: Optional[str] = None
+) -> SentenceTransformer:
+    """백엔드별 SentenceTransformer 로드
+
+    Args:
+        backend: torch | onnx | onnx-int8
+        model_name: Hugging Face 모델 이름
+        export_dir: ONNX 변환/양자화 모델 저장 경로 (재시작 시 재사용)
+        quantization_config: int8 양자화 대상 CPU 명령어셋 (avx2 | avx512 | avx512_vnni | arm64)
+    """
+    backend = backend.lower()
+
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+
+    if backend == "onnx":
+        return SentenceTransformer(model_name, backend="onnx")
+
+    if backend == "onnx-int8":
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+
+        quantization_config = quantization_config or os.getenv("ONNX_QUANT_CONFIG", "avx2")
+        # 상대 경로는 실행 위치가 아닌 parlant/ 기준
+        export_root = Path(export_dir or os.getenv("ONNX_EXPORT_DIR") or project_root / "data" / "onnx_models")
+        if not export_root.is_absolute():
+            export_root = project_root / export_root
+        export_path = export_root / model_name.replace("/", "__")
+        file_name = f"onnx/model_qint8_{quantization_config}.onnx"
+
+        if not (export_path / file_name).exists():
+            print(f"📦 ONNX int8 양자화 모델 생성 중: {export_path / file_name}")
+            fp32_model = SentenceTransformer(model_name, backend="onnx")
+            fp32_model.save(str(export_path))
+            export_dynamic_quantized_onnx_model(
+                fp32_model,
+                quantization_config,
+                str(export_path)
+            )
+
+        return SentenceTransformer(
+            str(export_path),
+            backend="onnx",
+            model_kwargs={"file_name": file_name}
+        )
+
+    raise ValueError(f"지원하지 않는 인코더 백엔드: {backend} ({' | '.join(SUPPORTED_BACKENDS)})")
+
+
+def check_compatibility(
+    reference: SentenceTransformer,
+    candidate: SentenceTransformer,
+    texts: List[str]
+) -> Dict:
+    """두 인코더의 임베딩 코사인 유사도 비교 (기존 인덱스 호환성 확인)
+
+    Returns:
+        {"min_cosine": 0.991, "mean_cosine": 0.997}
+    """
+    ref = np.asarray(reference.encode(texts), dtype=np.float32)
+    cand = np.asarray(candidate.encode(texts), dtype=np.float32)
+
+    return cosine_report(ref, cand)
+
+
+def cosine_report(ref: np.ndarray, cand: np.ndarray) -> Dict:
+    """행별 코사인 유사도 요약"""
+    ref = ref / np.linalg.norm(ref, axis=1, keepdims=True)
+    cand = cand / np.linalg.norm(cand, axis=1, keepdims=True)
+    cosines = np.sum(ref * cand, axis=1)
+
+    return {
+        "min_cosine": float(cosines.min()),
+        "mean_cosine": float(cosines.mean()),
+    }
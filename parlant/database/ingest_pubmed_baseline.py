@@ -0,0 +1,461 @@
+"""
+PubMed baseline / update XML → 로컬 미러 적재 (papers 컬렉션 + BM25 역색인 + 벡터)
+- https://ftp.ncbi.nlm.nih.gov/pubmed/baseline/, /updatefiles/ 의 pubmedNNnXXXX.xml.gz를 스트리밍 파싱
+  (pubmed_xml.iter_pubmed_articles - 파일 전체를 메모리에 올리지 않음)
+- 파일 단위 병렬: 파싱은 프로세스 풀에서 동시에, MongoDB 반영은 파일 이름 순서대로
+  (update 파일의 개정/삭제가 baseline 이후에 적용되어야 하므로)
+- 선택적 MeSH 필터 (--mesh-filter nephrology) - 신장 관련 논문만 적재
+- 재개 가능: 단계별 상태를 pubmed_mirror_files 컬렉션에 기록 (parsed 스테이징 파일 → loaded → indexed)
+  중단 후 같은 명령을 다시 실행하면 끝나지 않은 파일/단계부터 이어서 진행
+- 미러 논문은 source="pubmed_baseline", metadata.pmid 기준 upsert
+  같은 DOI의 기존 로컬 논문이 있으면 새로 넣지 않고 metadata.pmid만 연결
+- update 파일의 DeleteCitation은 MongoDB / BM25 (Pinecone 백엔드는 벡터도)에서 삭제
+  (로컬 벡터 스토어는 삭제를 지원하지 않음 - 검색 시 MongoDB에 없는 문서는 제외됨)
+
+사용법:
+    python database/ingest_pubmed_baseline.py /data/pubmed/baseline /data/pubmed/updatefiles --mesh-filter nephrology
+    python database/ingest_pubmed_baseline.py /data/pubmed/updatefiles --workers 8 --skip-vectors
+    python database/ingest_pubmed_baseline.py --status
+
+적재 후 PUBMED_SEARCH_MODE=local_first로 실행하면 PubMed 검색이 미러를 먼저 사용합니다.
+새 BM25 세그먼트 / 벡터는 서버 재시작 시 로드됩니다.
+"""
+
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, UTC
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from database.bm25_index import BM25Index, INDEX_FIELDS, document_text
+from database.mongodb_manager import MongoDBManager
+from pubmed_mirror import MIRROR_SOURCE, STATE_COLLECTION, PubMedMirror, paper_to_document
+from pubmed_xml import element_text, history_date, iter_pubmed_articles, parse_article
+
+DEFAULT_STAGING_DIR = project_root / "data" / "pubmed_mirror"
+
+# 신장내과 MeSH 디스크립터 (단어 경계 기준 - "Adrenal"은 제외)
+MESH_FILTERS = {
+    "nephrology": (
+        r"\b(?:kidney|renal|nephr\w*|glomerul\w*|dialysis|hemodialysis|hemodiafiltration|"
+        r"uremi\w*|albuminuria|proteinuria|hyperkalemia|hyperphosphatemia)\b"
+    ),
+}
+
+# MongoDB bulk_write 1회당 문서 수 / BM25·벡터 색인 배치
+LOAD_BATCH_SIZE = 1000
+INDEX_BATCH_SIZE = 5000
+
+
+def file_stem(path: Path) -> str:
+    """pubmed25n0001.xml.gz → pubmed25n0001"""
+    return path.name.split(".")[0]
+
+
+def collect_files(inputs: List[str]) -> List[Path]:
+    """파일/디렉토리 인자 → XML 파일 목록 (파일 이름순 = baseline → update 순서)"""
+    files = {}
+    for item in inputs:
+        path = Path(item)
+        candidates = sorted(path.glob("*.xml.gz")) + sorted(path.glob("*.xml")) if path.is_dir() else [path]
+        for candidate in candidates:
+            files.setdefault(file_stem(candidate), candidate)
+
+    return [files[name] for name in sorted(files)]
+
+
+# ==================== 1단계: 파싱 (프로세스 풀) ====================
+
+def parse_file(path: str, staging_dir: str, mesh_pattern: Optional[str] = None) -> Dict:
+    """XML 파일 1개 → 스테이징 JSONL.gz ({"op": "upsert", "doc"} / {"op": "delete", "pmid"})
+
+    스테이징 파일과 통계(.stats.json)가 이미 있으면 다시 파싱하지 않습니다.
+    임시 파일에 쓴 뒤 이름을 바꾸므로 중단된 파일은 다음 실행에서 처음부터 다시 파싱합니다.
+
+    Returns:
+        {"file", "articles", "kept", "deleted", "errors", "max_entrez_date", "staging", "seconds"}
+    """
+    path = Path(path)
+    name = file_stem(path)
+    staging_path = Path(staging_dir) / f"{name}.jsonl.gz"
+    stats_path = Path(staging_dir) / f"{name}.stats.json"
+
+    if staging_path.exists() and stats_path.exists():
+        with open(stats_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    mesh_re = re.compile(mesh_pattern, re.IGNORECASE) if mesh_pattern else None
+    stats = {
+        "file": name,
+        "articles": 0,
+        "kept": 0,
+        "deleted": 0,
+        "errors": 0,
+        "max_entrez_date": "",
+        "staging": str(staging_path),
+    }
+
+    start = time.perf_counter()
+    staging_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = staging_path.with_suffix(".tmp")
+    opener = gzip.open if path.suffix == ".gz" else open
+
+    with opener(path, "rb") as source, gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=1) as out:
+        for element in iter_pubmed_articles(source, tags=("PubmedArticle", "DeleteCitation")):
+            if element.tag == "DeleteCitation":
+                for pmid in element.iter("PMID"):
+                    out.write(json.dumps({"op": "delete", "pmid": element_text(pmid).strip()}) + "\n")
+                    stats["deleted"] += 1
+                continue
+
+            stats["articles"] += 1
+            try:
+                paper = parse_article(element)
+                entrez_date = history_date(element, "entrez")
+            except Exception:
+                stats["errors"] += 1
+                continue
+
+            # 적재 범위는 필터와 무관하게 파일의 전체 논문 기준
+            stats["max_entrez_date"] = max(stats["max_entrez_date"], entrez_date)
+
+            if not paper["pmid"] or not paper["title"]:
+                continue
+            if mesh_re is not None and not any(mesh_re.search(term) for term in paper["mesh_terms"]):
+                continue
+
+            doc = paper_to_document(paper, entrez_date)
+            out.write(json.dumps({"op": "upsert", "doc": doc}, ensure_ascii=False) + "\n")
+            stats["kept"] += 1
+
+    tmp_path.replace(staging_path)
+
+    stats["seconds"] = round(time.perf_counter() - start, 1)
+    tmp_stats = stats_path.with_suffix(".tmp")
+    with open(tmp_stats, "w", encoding="utf-8") as f:
+        json.dump(stats, f, ensure_ascii=False)
+    tmp_stats.replace(stats_path)
+
+    return stats
+
+
+# ==================== 2단계: MongoDB 반영 (파일 순서대로) ====================
+
+async def ensure_indexes(mongo: MongoDBManager):
+    """미러 upsert / 파일별 색인 조회용 인덱스"""
+    await mongo.db.papers.create_index("metadata.pmid", sparse=True, name="paper_pmid_lookup")
+    await mongo.db.papers.create_index("mirror_file", sparse=True, name="paper_mirror_file")
+    await mongo.db[STATE_COLLECTION].create_index("stage", name="mirror_stage")
+
+
+async def upsert_batch(mongo: MongoDBManager, docs: List[Dict], file_name: str) -> Dict[str, int]:
+    """미러 문서 배치 upsert (metadata.pmid 기준, 로컬 논문과 DOI가 같으면 PMID만 연결)"""
+    counts = {"upserted": 0, "linked": 0, "failed": 0}
+
+    dois = [doc["metadata"]["doi"] for doc in docs if doc["metadata"].get("doi")]
+    local_dois = set()
+    if dois:
+        async for existing in mongo.db.papers.find(
+            {"metadata.doi": {"$in": dois}, "source": {"$ne": MIRROR_SOURCE}},
+            {"metadata.doi": 1}
+        ):
+            local_dois.add(existing["metadata"]["doi"])
+
+    now = datetime.now(UTC)
+    operations = []
+    for doc in docs:
+        metadata = doc["metadata"]
+        if metadata.get("doi") in local_dois:
+            # 기존 로컬 논문 (전처리 메타데이터)은 유지하고 PMID만 연결
+            operations.append(UpdateOne({"metadata.doi": metadata["doi"]}, {"$set": {"metadata.pmid": metadata["pmid"]}}))
+            counts["linked"] += 1
+        else:
+            operations.append(UpdateOne(
+                {"metadata.pmid": metadata["pmid"]},
+                {"$set": {**doc, "mirror_file": file_name, "indexed_at": now}},
+                upsert=True
+            ))
+            counts["upserted"] += 1
+
+    try:
+        await mongo.db.papers.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        # 같은 DOI를 가진 PubMed 레코드 (정정/중복 게재) → DOI 없이 다시 저장
+        retry = []
+        for error in e.details.get("writeErrors", []):
+            doc = docs[error["index"]]
+            if error.get("code") == 11000 and doc["metadata"].get("doi"):
+                metadata = {k: v for k, v in doc["metadata"].items() if k != "doi"}
+                retry.append(UpdateOne(
+                    {"metadata.pmid": metadata["pmid"]},
+                    {"$set": {**doc, "metadata": metadata, "mirror_file": file_name, "indexed_at": now}},
+                    upsert=True
+                ))
+            else:
+                counts["failed"] += 1
+                print(f"  ⚠️ PMID {doc['metadata']['pmid']} 저장 실패: {error.get('errmsg', '')[:80]}")
+
+        if retry:
+            try:
+                await mongo.db.papers.bulk_write(retry, ordered=False)
+            except BulkWriteError as retry_error:
+                counts["failed"] += len(retry_error.details.get("writeErrors", []))
+
+    return counts
+
+
+async def delete_pmids(mongo: MongoDBManager, pmids: List[str], bm25: Optional[BM25Index], vector_db) -> int:
+    """DeleteCitation PMID → 미러 문서 삭제 (MongoDB, BM25, Pinecone)"""
+    ids = []
+    async for doc in mongo.db.papers.find(
+        {"metadata.pmid": {"$in": pmids}, "source": MIRROR_SOURCE}, {"_id": 1}
+    ):
+        ids.append(doc["_id"])
+
+    if not ids:
+        return 0
+
+    await mongo.db.papers.delete_many({"_id": {"$in": ids}})
+    if bm25 is not None:
+        bm25.delete(str(doc_id) for doc_id in ids)
+    if vector_db is not None and vector_db.backend == "pinecone":
+        vector_db.index.delete(ids=[str(doc_id) for doc_id in ids], namespace="papers")
+
+    return len(ids)
+
+
+async def load_file(
+    mongo: MongoDBManager,
+    stats: Dict,
+    bm25: Optional[BM25Index],
+    vector_db,
+    keep_staging: bool = False
+) -> Dict:
+    """스테이징 파일 1개를 MongoDB에 반영 후 상태를 loaded로 기록"""
+    name = stats["file"]
+    staging_path = Path(stats["staging"])
+    counts = {"upserted": 0, "linked": 0, "failed": 0, "removed": 0}
+
+    batch = []
+    deleted = []
+    with gzip.open(staging_path, "rt", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record["op"] == "delete":
+                deleted.append(record["pmid"])
+                continue
+
+            batch.append(record["doc"])
+            if len(batch) >= LOAD_BATCH_SIZE:
+                for key, value in (await upsert_batch(mongo, batch, name)).items():
+                    counts[key] += value
+                batch = []
+
+    if batch:
+        for key, value in (await upsert_batch(mongo, batch, name)).items():
+            counts[key] += value
+
+    # 삭제는 같은 파일의 개정보다 나중에 적용
+    for i in range(0, len(deleted), LOAD_BATCH_SIZE):
+        counts["removed"] += await delete_pmids(mongo, deleted[i:i + LOAD_BATCH_SIZE], bm25, vector_db)
+
+    await mongo.db[STATE_COLLECTION].update_one(
+        {"_id": name},
+        {"$set": {
+            **{k: v for k, v in stats.items() if k != "staging"},
+            **counts,
+            "stage": "loaded",
+            "loaded_at": datetime.now(UTC),
+        }},
+        upsert=True
+    )
+
+    if not keep_staging:
+        staging_path.unlink(missing_ok=True)
+        staging_path.with_name(f"{name}.stats.json").unlink(missing_ok=True)
+
+    return counts
+
+
+# ==================== 3단계: BM25 / 벡터 색인 ====================
+
+async def index_batch(docs: List[Dict], bm25: Optional[BM25Index], vector_db):
+    if bm25 is not None:
+        bm25.add_documents((str(doc["_id"]), document_text(doc, INDEX_FIELDS["papers"])) for doc in docs)
+    if vector_db is not None:
+        await vector_db.upsert_embeddings(docs, namespace="papers", text_fields=["title", "abstract"], persist=False)
+
+
+async def index_files(mongo: MongoDBManager, names: List[str], bm25: Optional[BM25Index], vector_db) -> int:
+    """loaded 상태 파일의 미러 문서를 BM25 / 벡터에 추가 후 indexed로 기록
+
+    개정된 문서는 최신 파일(mirror_file)에서만 색인되고, BM25는 같은 ID를 재색인하면 이전 항목을 삭제 표시합니다.
+    """
+    indexed = 0
+    start = time.perf_counter()
+
+    for name in names:
+        batch = []
+        async for doc in mongo.db.papers.find(
+            {"mirror_file": name, "source": MIRROR_SOURCE},
+            MongoDBManager.DOCUMENT_PROJECTIONS["papers"]
+        ):
+            batch.append(doc)
+            if len(batch) >= INDEX_BATCH_SIZE:
+                await index_batch(batch, bm25, vector_db)
+                indexed += len(batch)
+                batch = []
+
+        if batch:
+            await index_batch(batch, bm25, vector_db)
+            indexed += len(batch)
+
+        print(f"  🔤 {name}: 누적 {indexed:,}개 색인 ({indexed / max(time.perf_counter() - start, 1e-9):,.0f} docs/s)")
+
+    # 세그먼트 / 벡터 저장 후에만 indexed로 기록 (중단 시 다음 실행에서 다시 색인)
+    if bm25 is not None:
+        bm25.flush()
+    if vector_db is not None and vector_db.backend == "local":
+        vector_db.index.save("papers")
+
+    if names:
+        await mongo.db[STATE_COLLECTION].update_many(
+            {"_id": {"$in": names}},
+            {"$set": {"stage": "indexed", "indexed_at": datetime.now(UTC)}}
+        )
+
+    return indexed
+
+
+# ==================== 실행 ====================
+
+async def print_status(mongo: MongoDBManager):
+    stats = await PubMedMirror(mongo).get_stats()
+    print("\n📚 PubMed 로컬 미러")
+    print(f"  논문 {stats['papers']:,}개, 적재 범위(등록일) {stats['coverage_date'] or '없음'}")
+    for stage, files in sorted(stats["files"].items()):
+        print(f"  {stage}: 파일 {files:,}개")
+
+
+async def ingest(args):
+    files = collect_files(args.inputs)
+    mesh_pattern = MESH_FILTERS.get(args.mesh_filter, args.mesh_filter) if args.mesh_filter != "none" else None
+
+    # 적재 중에는 $text 검색 사용 (connect 시 BM25 인덱스 로드 생략)
+    mongo = MongoDBManager(keyword_backend="mongo")
+    await mongo.connect()
+
+    try:
+        if args.status:
+            await print_status(mongo)
+            return
+
+        await ensure_indexes(mongo)
+
+        states = {}
+        async for state in mongo.db[STATE_COLLECTION].find({}, {"stage": 1}):
+            states[state["_id"]] = state["stage"]
+
+        to_parse = [path for path in files if states.get(file_stem(path)) not in ("loaded", "indexed")]
+
+        print("\n" + "="*70)
+        print(f"📥 PubMed 미러 적재: 파일 {len(files):,}개 (파싱/반영 {len(to_parse):,}개, 이미 반영 {len(files) - len(to_parse):,}개)")
+        print(f"   MeSH 필터: {args.mesh_filter}, 워커 {args.workers}개, 스테이징 {args.staging_dir}")
+        print("="*70)
+
+        bm25 = None
+        if not args.skip_bm25:
+            bm25 = BM25Index(mongo.bm25_dir / "papers")
+            bm25.load()
+
+        vector_db = None
+        if not args.skip_vectors:
+            from database.vector_manager import VectorDBManager
+            vector_db = VectorDBManager()
+            await vector_db.create_index()
+
+        # 파싱은 병렬, 반영은 파일 순서대로 (스테이징 디스크 사용량 제한: 최대 workers × 2개 파일 선행)
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        totals = {"kept": 0, "upserted": 0, "linked": 0, "removed": 0}
+
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            pending = deque(to_parse)
+            in_flight = deque()
+
+            while pending or in_flight:
+                while pending and len(in_flight) < args.workers * 2:
+                    path = pending.popleft()
+                    in_flight.append(loop.run_in_executor(pool, parse_file, str(path), str(args.staging_dir), mesh_pattern))
+
+                stats = await in_flight.popleft()
+                counts = await load_file(mongo, stats, bm25, vector_db, args.keep_staging)
+                states[stats["file"]] = "loaded"
+
+                totals["kept"] += stats["kept"]
+                for key in ("upserted", "linked", "removed"):
+                    totals[key] += counts[key]
+
+                print(
+                    f"  📄 {stats['file']}: 논문 {stats['articles']:,}개 → 적재 {counts['upserted']:,}개, "
+                    f"로컬 연결 {counts['linked']:,}개, 삭제 {counts['removed']:,}개 "
+                    f"(등록일 ~{stats['max_entrez_date'] or '-'}, 파싱 {stats.get('seconds', 0)}초)"
+                )
+
+        print(
+            f"\n✅ 반영 완료: {len(to_parse):,}개 파일, 적재 {totals['upserted']:,}개, "
+            f"로컬 연결 {totals['linked']:,}개, 삭제 {totals['removed']:,}개 ({time.perf_counter() - start:.1f}초)"
+        )
+
+        # 색인 (이전 실행에서 반영만 끝난 파일 포함)
+        to_index = [name for name in sorted(states) if states[name] == "loaded"]
+        if to_index:
+            print(f"\n🔤 색인: 파일 {len(to_index):,}개 (BM25 {'생략' if bm25 is None else '포함'}, 벡터 {'생략' if vector_db is None else '포함'})")
+            indexed = await index_files(mongo, to_index, bm25, vector_db)
+            print(f"✅ 색인 완료: {indexed:,}개")
+
+        await print_status(mongo)
+
+    finally:
+        await mongo.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PubMed baseline/update XML → 로컬 미러 적재")
+    parser.add_argument("inputs", nargs="*", help="XML(.gz) 파일 또는 디렉토리 (baseline, updatefiles)")
+    parser.add_argument(
+        "--mesh-filter", default="none",
+        help=f"MeSH 디스크립터 필터: none | {' | '.join(MESH_FILTERS)} | 정규식 (기본값: none)"
+    )
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1), help="파싱 프로세스 수")
+    parser.add_argument("--staging-dir", type=Path, default=DEFAULT_STAGING_DIR)
+    parser.add_argument("--keep-staging", action="store_true", help="반영 후 스테이징 파일 유지")
+    parser.add_argument("--skip-bm25", action="store_true", help="BM25 역색인 갱신 생략")
+    parser.add_argument("--skip-vectors", action="store_true", help="벡터 임베딩 생략")
+    parser.add_argument("--status", action="store_true", help="적재 상태만 출력")
+    args = parser.parse_args()
+
+    if not args.inputs and not args.status:
+        parser.error("XML 파일/디렉토리를 지정하거나 --status를 사용하세요")
+
+    asyncio.run(ingest(args))
+
+
+if __name__ == "__main__":
+    main()
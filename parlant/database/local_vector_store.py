@@ -0,0 +1,565 @@
+"""
+로컬 인메모리 벡터 스토어 (Pinecone Index 호환)
+- 소규모 namespace (papers 4,850개 등): NumPy 행렬곱 기반 정확(exact) 검색
+- 대규모 namespace (qa 2.2M개): HNSW 그래프 기반 근사(ANN) 검색 (hnswlib)
+  또는 int8/binary 양자화 + PCA 압축 벡터 스캔 → fp32 재점수화 (메모리 4~30배 절감)
+- Pinecone Index와 동일한 upsert()/query() 인터페이스 → VectorDBManager에서 그대로 사용
+- 메타데이터 필터 (Pinecone 문법 일부: 값 일치, $eq, $in): 필드별 파티션(값 → 행 번호) 인덱스로
+  해당 행만 검색 - 전체 top-k 후 거르는 방식과 달리 결과 수가 줄지 않음
+- 외부 서비스 없이 디스크에 저장/로드 가능
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import List, Dict, Optional
+
+import numpy as np
+
+from database.vector_quantization import VectorCodec
+
+try:
+    import hnswlib
+except ImportError:  # hnswlib 미설치 시 exact 검색만 사용
+    hnswlib = None
+
+
+class LocalMatch:
+    """Pinecone ScoredVector 호환 결과 객체"""
+
+    __slots__ = ("id", "score", "metadata")
+
+    def __init__(self, id: str, score: float, metadata: Optional[Dict] = None):
+        self.id = id
+        self.score = score
+        self.metadata = metadata
+
+
+class LocalQueryResponse:
+    """Pinecone QueryResponse 호환 응답 객체"""
+
+    __slots__ = ("matches", "namespace")
+
+    def __init__(self, matches: List[LocalMatch], namespace: str):
+        self.matches = matches
+        self.namespace = namespace
+
+
+class NamespaceIndex:
+    """단일 namespace 벡터 저장소
+
+    - 벡터는 L2 정규화 후 float32 행렬로 보관 (내적 = 코사인 유사도)
+    - 문서 수가 hnsw_threshold 이상이면 HNSW 인덱스를 구축해 근사 검색
+    - quantization/pca_dim 설정 시 대규모 namespace는 HNSW 대신 2단계 검색:
+      압축 코드 스캔으로 후보 (top_k × rescore_factor) 선택 → 원본 fp32로 재점수화
+      (로드 후 원본 벡터는 디스크 mmap, 메모리에는 압축 코드만 상주)
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        hnsw_threshold: int = 100_000,
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 200,
+        hnsw_ef_search: int = 64,
+        quantization: str = "none",
+        pca_dim: Optional[int] = None,
+        rescore_factor: int = 10
+    ):
+        self.dimension = dimension
+        self.hnsw_threshold = hnsw_threshold
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.hnsw_ef_search = hnsw_ef_search
+
+        self.ids: List[str] = []
+        self.id_to_row: Dict[str, int] = {}
+        self.metadata: List[Dict] = []
+
+        self._vectors = np.zeros((0, dimension), dtype=np.float32)
+        self._count = 0
+        self._hnsw = None
+        self._lock = threading.RLock()
+
+        # hnswlib 미설치면 임계값을 넘어도 HNSW 구축을 시도하지 않음 (배치마다 경고 출력 방지)
+        self.hnsw_available = hnswlib is not None
+
+        # lock 밖에서 실행 중인 검색 수 (HNSW resize_index는 검색과 동시에 실행할 수 없음)
+        self._searches = 0
+        self._idle = threading.Condition(self._lock)
+
+        # 압축 저장 (대규모 namespace)
+        self.rescore_factor = max(1, rescore_factor)
+        self._codec = (
+            VectorCodec(quantization, pca_dim)
+            if quantization != "none" or pca_dim else None
+        )
+        self._codes: Optional[np.ndarray] = None
+
+        # 메타데이터 필터용 파티션: 필드 → {값: 행 번호 배열} (첫 필터 검색 시 생성, upsert 시 무효화)
+        self._partitions: Dict[str, Dict] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """유효한 행만 반환 (용량 버퍼 제외)"""
+        return self._vectors[:self._count]
+
+    @property
+    def uses_hnsw(self) -> bool:
+        return self._hnsw is not None
+
+    @property
+    def uses_compression(self) -> bool:
+        return self._codec is not None and self._count >= self.hnsw_threshold
+
+    @property
+    def search_mode(self) -> str:
+        if self.uses_compression:
+            codec = self._codec
+            return codec.quantization + (f"+pca{codec.pca_dim}" if codec.pca_dim else "") + "+rescore"
+        return "hnsw" if self.uses_hnsw else "exact"
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _ensure_capacity(self, required: int):
+        """용량 2배씩 확장 (append 비용 상각)"""
+        capacity = self._vectors.shape[0]
+        if required <= capacity and self._vectors.flags.writeable:
+            return
+
+        new_capacity = max(required, capacity * 2, 1024)
+        grown = np.zeros((new_capacity, self.dimension), dtype=np.float32)
+        grown[:self._count] = self._vectors[:self._count]
+        self._vectors = grown
+
+        if self._hnsw is not None and self._hnsw.get_max_elements() < new_capacity:
+            self._idle.wait_for(lambda: self._searches == 0)
+            self._hnsw.resize_index(new_capacity)
+
+    def upsert(self, items: List[Dict]):
+        """벡터 삽입/갱신
+
+        Args:
+            items: [{"id": "...", "values": [...], "metadata": {...}}, ...]
+        """
+        if not items:
+            return
+
+        values = np.asarray([item["values"] for item in items], dtype=np.float32)
+        if values.shape[1] != self.dimension:
+            raise ValueError(
+                f"벡터 차원 불일치: {values.shape[1]} (기대값: {self.dimension})"
+            )
+        values = self._normalize(values)
+
+        with self._lock:
+            self._ensure_capacity(self._count + len(items))
+
+            rows = []
+            for item, vector in zip(items, values):
+                doc_id = str(item["id"])
+                row = self.id_to_row.get(doc_id)
+
+                if row is None:
+                    row = self._count
+                    self._count += 1
+                    self.ids.append(doc_id)
+                    self.metadata.append(item.get("metadata") or {})
+                    self.id_to_row[doc_id] = row
+                else:
+                    self.metadata[row] = item.get("metadata") or {}
+
+                self._vectors[row] = vector
+                rows.append(row)
+
+            self._partitions = {}
+
+            if self._codec is not None:
+                self._update_codes(rows)
+            elif self._hnsw is not None:
+                # 동일 label 재삽입 시 hnswlib가 벡터를 갱신
+                self._hnsw.add_items(self._vectors[rows], np.asarray(rows))
+            elif self.hnsw_available and self._count >= self.hnsw_threshold:
+                self.build_hnsw()
+
+    def _update_codes(self, rows: List[int]):
+        """기존 압축 코드에 변경 행 반영 (코드가 아직 없으면 검색/저장 시 일괄 생성)"""
+        if self._codes is None:
+            return
+
+        rows = np.asarray(rows)
+        codes = self._codec.encode(self._vectors[rows])
+        known = rows < self._codes.shape[0]
+
+        if known.any():
+            if not self._codes.flags.writeable:
+                self._codes = np.array(self._codes)
+            self._codes[rows[known]] = codes[known]
+        if (~known).any():
+            order = np.argsort(rows[~known])
+            self._codes = np.concatenate([self._codes, codes[~known][order]])
+
+    def build_codes(self):
+        """압축 코드 생성 (코덱 미학습 시 학습 포함)"""
+        with self._lock:
+            if not self._codec.fitted:
+                self._codec.fit(self.vectors)
+            self._codes = self._codec.encode(self.vectors)
+
+        print(f"✅ 압축 코드 생성 완료: {self._count:,}개 벡터 ({self.search_mode})")
+
+    def build_hnsw(self):
+        """현재 벡터 전체로 HNSW 인덱스 구축"""
+        if hnswlib is None:
+            print("⚠️ hnswlib 미설치 - exact 검색으로 대체합니다 (pip install hnswlib)")
+            return
+
+        with self._lock:
+            index = hnswlib.Index(space="ip", dim=self.dimension)
+            index.init_index(
+                max_elements=max(self._vectors.shape[0], 1),
+                ef_construction=self.hnsw_ef_construction,
+                M=self.hnsw_m
+            )
+            if self._count:
+                index.add_items(self.vectors, np.arange(self._count))
+            index.set_ef(self.hnsw_ef_search)
+            self._hnsw = index
+
+        print(f"✅ HNSW 인덱스 구축 완료: {self._count:,}개 벡터")
+
+    # ==================== 메타데이터 필터 ====================
+
+    def _partition(self, field: str) -> Dict:
+        """필드 값 → 행 번호 배열 (없으면 메타데이터 스캔으로 생성)"""
+        partition = self._partitions.get(field)
+        if partition is None:
+            groups: Dict = {}
+            for row, meta in enumerate(self.metadata):
+                value = meta.get(field)
+                if value is not None:
+                    groups.setdefault(value, []).append(row)
+            partition = {value: np.asarray(rows, dtype=np.int64) for value, rows in groups.items()}
+            self._partitions[field] = partition
+        return partition
+
+    def filter_rows(self, filter: Dict) -> np.ndarray:
+        """Pinecone 형식 필터 → 조건을 만족하는 행 번호 (정렬됨)
+
+        지원: {"field": 값}, {"field": {"$eq": 값}}, {"field": {"$in": [...]}} (여러 필드는 AND)
+        """
+        result = None
+        for field, condition in filter.items():
+            if isinstance(condition, dict):
+                if set(condition) - {"$eq", "$in"}:
+                    raise ValueError(f"지원하지 않는 필터 연산자: {condition} ($eq, $in만 지원)")
+                values = list(condition.get("$in", [])) + ([condition["$eq"]] if "$eq" in condition else [])
+            else:
+                values = [condition]
+
+            partition = self._partition(field)
+            parts = [partition[v] for v in values if v in partition]
+            rows = np.unique(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int64)
+            result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+
+        return result if result is not None else np.arange(self._count)
+
+    # ==================== 검색 ====================
+
+    def query(self, vector: List[float], top_k: int, filter: Optional[Dict] = None) -> List[tuple]:
+        """상위 top_k (row, score) 반환 - score는 코사인 유사도
+
+        lock은 검색 대상 (벡터 행렬, HNSW 인덱스, 압축 코드, 필터 행)을 가져오는 동안만 잡고,
+        knn_query / BLAS 행렬곱은 lock 밖에서 실행합니다 (GIL을 풀므로 같은 namespace 동시 검색 가능).
+        """
+        if self._count == 0 or top_k <= 0:
+            return []
+
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        with self._lock:
+            if self.uses_compression and self._codes is None:
+                self.build_codes()
+
+            rows = self.filter_rows(filter) if filter else None
+            vectors = self.vectors
+            hnsw = self._hnsw
+            codes = self._codes if self.uses_compression else None
+            self._searches += 1
+
+        try:
+            k = min(top_k, len(vectors))
+
+            if rows is not None:
+                return self._query_filtered(query, k, rows, vectors, hnsw, codes)
+
+            if codes is not None:
+                return self._query_compressed(query, k, vectors, codes)
+
+            if hnsw is not None:
+                # knn_query는 max(ef, k)로 탐색 (검색마다 set_ef로 공유 상태를 바꾸지 않음)
+                labels, distances = hnsw.knn_query(query, k=k)
+                # space="ip" 거리 = 1 - 내적
+                return [
+                    (int(row), float(1.0 - dist))
+                    for row, dist in zip(labels[0], distances[0])
+                ]
+
+            # Exact: 행렬곱 (BLAS) + 부분 정렬
+            scores = vectors @ query
+            if k < len(vectors):
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(len(vectors))
+            top = top[np.argsort(-scores[top])]
+            return [(int(row), float(scores[row])) for row in top]
+
+        finally:
+            with self._lock:
+                self._searches -= 1
+                if self._searches == 0:
+                    self._idle.notify_all()
+
+    def _query_filtered(
+        self,
+        query: np.ndarray,
+        k: int,
+        rows: np.ndarray,
+        vectors: np.ndarray,
+        hnsw,
+        codes: Optional[np.ndarray]
+    ) -> List[tuple]:
+        """필터를 만족하는 행만 검색
+
+        - 파티션이 작으면 (hnsw_threshold 미만) 해당 행만 정확 검색
+        - 큰 파티션: HNSW는 행 마스크 필터로 그래프 탐색, 압축 모드는 해당 행 코드만 스캔
+        """
+        if len(rows) == 0:
+            return []
+
+        k = min(k, len(rows))
+
+        if codes is not None and len(rows) >= self.hnsw_threshold:
+            return self._query_compressed(query, k, vectors, codes, rows)
+
+        if hnsw is not None and len(rows) >= self.hnsw_threshold:
+            mask = np.zeros(len(vectors), dtype=bool)
+            mask[rows] = True
+            labels, distances = hnsw.knn_query(
+                query, k=k, filter=lambda label: label < len(mask) and mask[label]
+            )
+            return [
+                (int(row), float(1.0 - dist))
+                for row, dist in zip(labels[0], distances[0])
+            ]
+
+        scores = np.asarray(vectors[rows], dtype=np.float32) @ query
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+        top = top[np.argsort(-scores[top])]
+        return [(int(rows[i]), float(scores[i])) for i in top]
+
+    def _query_compressed(
+        self,
+        query: np.ndarray,
+        k: int,
+        vectors: np.ndarray,
+        codes: np.ndarray,
+        rows: Optional[np.ndarray] = None
+    ) -> List[tuple]:
+        """2단계 검색: 압축 코드 스캔 → 후보만 fp32 정확 재점수화 (rows 지정 시 해당 행만)"""
+        # 검색 도중 추가된 행은 이번 검색에서 제외 (코드/벡터 길이를 맞춤)
+        total_rows = min(len(codes), len(vectors))
+        if rows is None:
+            codes = codes[:total_rows]
+        else:
+            rows = rows[rows < total_rows]
+
+        total = total_rows if rows is None else len(rows)
+        if total == 0:
+            return []
+        k = min(k, total)
+        n_candidates = min(total, k * self.rescore_factor)
+        coarse = self._codec.coarse_scores(codes if rows is None else codes[rows], query)
+        if n_candidates < total:
+            candidates = np.argpartition(-coarse, n_candidates - 1)[:n_candidates]
+        else:
+            candidates = np.arange(total)
+        if rows is not None:
+            candidates = rows[candidates]
+
+        # 정렬된 행 순서로 읽어 mmap 디스크 접근 지역성 확보
+        candidates.sort()
+        exact = np.asarray(vectors[candidates], dtype=np.float32) @ query
+        order = np.argsort(-exact)[:k]
+        return [(int(candidates[i]), float(exact[i])) for i in order]
+
+    # ==================== 저장 / 로드 ====================
+
+    def save(self, directory: Path):
+        directory.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            np.save(directory / "vectors.npy", self.vectors)
+            with open(directory / "records.jsonl", "w", encoding="utf-8") as f:
+                for doc_id, meta in zip(self.ids, self.metadata):
+                    f.write(json.dumps({"id": doc_id, "metadata": meta}, ensure_ascii=False) + "\n")
+            if self._hnsw is not None:
+                self._hnsw.save_index(str(directory / "hnsw.bin"))
+            if self.uses_compression:
+                if self._codes is None:
+                    self.build_codes()
+                np.save(directory / "codes.npy", self._codes)
+                self._codec.save(directory / "codec.npz")
+
+    def load(self, directory: Path):
+        vectors_path = directory / "vectors.npy"
+        records_path = directory / "records.jsonl"
+        if not vectors_path.exists() or not records_path.exists():
+            return
+
+        with self._lock:
+            # mmap 로드 - 첫 upsert 시 _ensure_capacity에서 쓰기 가능한 배열로 복사
+            self._vectors = np.load(vectors_path, mmap_mode="r")
+            self._count = self._vectors.shape[0]
+
+            self.ids = []
+            self.metadata = []
+            with open(records_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    self.ids.append(record["id"])
+                    self.metadata.append(record.get("metadata") or {})
+            self.id_to_row = {doc_id: row for row, doc_id in enumerate(self.ids)}
+            self._partitions = {}
+
+            if self._codec is not None:
+                # 압축 코드만 메모리에 적재 (설정이 바뀌었으면 첫 검색 시 재생성)
+                codes_path = directory / "codes.npy"
+                if self._codec.load(directory / "codec.npz") and codes_path.exists():
+                    self._codes = np.load(codes_path)
+                return
+
+            hnsw_path = directory / "hnsw.bin"
+            if self.hnsw_available and hnsw_path.exists():
+                index = hnswlib.Index(space="ip", dim=self.dimension)
+                index.load_index(str(hnsw_path), max_elements=max(self._count, 1))
+                index.set_ef(self.hnsw_ef_search)
+                self._hnsw = index
+            elif self.hnsw_available and self._count >= self.hnsw_threshold:
+                self.build_hnsw()
+
+
+class LocalVectorStore:
+    """Pinecone Index 호환 로컬 벡터 스토어
+
+    사용 예:
+        store = LocalVectorStore(dimension=384, persist_dir="data/vector_store")
+        store.load()
+        store.upsert(vectors=[...], namespace="papers")
+        store.query(vector=[...], top_k=5, namespace="papers", include_metadata=True)
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        persist_dir: Optional[str] = None,
+        hnsw_threshold: int = 100_000,
+        hnsw_ef_search: int = 64,
+        quantization: str = "none",
+        pca_dim: Optional[int] = None,
+        rescore_factor: int = 10
+    ):
+        self.dimension = dimension
+        self.persist_dir = Path(persist_dir) if persist_dir else None
+        self.hnsw_threshold = hnsw_threshold
+        self.hnsw_ef_search = hnsw_ef_search
+        self.quantization = quantization
+        self.pca_dim = pca_dim
+        self.rescore_factor = rescore_factor
+        self.namespaces: Dict[str, NamespaceIndex] = {}
+        self._lock = threading.Lock()
+
+    def _get_namespace(self, namespace: str) -> NamespaceIndex:
+        with self._lock:
+            if namespace not in self.namespaces:
+                self.namespaces[namespace] = NamespaceIndex(
+                    self.dimension,
+                    hnsw_threshold=self.hnsw_threshold,
+                    hnsw_ef_search=self.hnsw_ef_search,
+                    quantization=self.quantization,
+                    pca_dim=self.pca_dim,
+                    rescore_factor=self.rescore_factor
+                )
+            return self.namespaces[namespace]
+
+    def upsert(self, vectors: List[Dict], namespace: str = ""):
+        self._get_namespace(namespace).upsert(vectors)
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int = 10,
+        namespace: str = "",
+        include_metadata: bool = False,
+        filter: Optional[Dict] = None
+    ) -> LocalQueryResponse:
+        ns_index = self.namespaces.get(namespace)
+        if ns_index is None:
+            return LocalQueryResponse([], namespace)
+
+        matches = [
+            LocalMatch(
+                id=ns_index.ids[row],
+                score=score,
+                metadata=ns_index.metadata[row] if include_metadata else None
+            )
+            for row, score in ns_index.query(vector, top_k, filter)
+        ]
+        return LocalQueryResponse(matches, namespace)
+
+    def describe_index_stats(self) -> Dict:
+        return {
+            "dimension": self.dimension,
+            "namespaces": {
+                name: {
+                    "vector_count": len(ns_index),
+                    "search": ns_index.search_mode
+                }
+                for name, ns_index in self.namespaces.items()
+            },
+            "total_vector_count": sum(len(ns) for ns in self.namespaces.values())
+        }
+
+    # ==================== 저장 / 로드 ====================
+
+    def save(self, namespace: Optional[str] = None):
+        """디스크 저장 (namespace 미지정 시 전체)"""
+        if not self.persist_dir:
+            return
+
+        names = [namespace] if namespace else list(self.namespaces)
+        for name in names:
+            if name in self.namespaces:
+                self.namespaces[name].save(self.persist_dir / name)
+
+    def load(self):
+        """persist_dir 하위 namespace 디렉토리 전체 로드"""
+        if not self.persist_dir or not self.persist_dir.exists():
+            return
+
+        for ns_dir in sorted(self.persist_dir.iterdir()):
+            if ns_dir.is_dir():
+                self._get_namespace(ns_dir.name).load(ns_dir)
+
+        for name, ns_index in self.namespaces.items():
+            print(f"✅ 로컬 벡터 로드: {name} ({len(ns_index):,}개, {ns_index.search_mode})")
@@ -1,18 +1,123 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import List, Dict, Optional
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
+from typing import List, Dict, Optional, Tuple
+from pathlib import Path
+from hashlib import md5
+import asyncio
 import os
+import re
 from dotenv import load_dotenv
+from database.bm25_index import BM25Index
+from database.embedding_cache import normalize_text
 
 load_dotenv()
 
+
+def canonical_question(question: str) -> str:
+    """질문 정규화 - 대소문자/전각/공백/문장부호 차이 제거
+
+    예: "신부전 식단은?" / "신부전식단은" / "신부전  식단은 ?" → "신부전식단은"
+    """
+    return re.sub(r"[\W_]+", "", normalize_text(question))
+
+
+def question_hashes(question: str) -> Tuple[str, str]:
+    """(question_hash: 원문 md5, question_norm_hash: 정규화 질문 md5)"""
+    return (
+        md5(question.encode()).hexdigest(),
+        md5(canonical_question(question).encode()).hexdigest()
+    )
+
+
 class MongoDBManager:
     """MongoDB 비동기 관리자"""
     
-    def __init__(self, uri: str = None, db_name: str = "careguide"):
+    # 컬렉션별 검색 결과 반환 필드 (ID 기반 일괄 조회에도 동일하게 사용)
+    DOCUMENT_PROJECTIONS = {
+        "qa_data": {"question": 1, "answer": 1, "_id": 1},
+        "papers": {"title": 1, "abstract": 1, "source": 1, "metadata": 1, "_id": 1},
+        "medical_data": {"text": 1, "keyword": 1, "patent_id": 1, "_id": 1},
+    }
+    
+    # 컬렉션별 필터 가능 필드 (search_*의 filters 인자 - 해당 필드가 없는 컬렉션에는 적용하지 않음)
+    FILTERABLE_FIELDS = {
+        "qa_data": ("category", "source_dataset"),
+        "papers": ("source",),  # PubMed 미러 조회 (source="pubmed_baseline")
+        "medical_data": ("category",),
+    }
+    
+    # 미리보기 모드: 프롬프트 생성(llm_refine_results_v2)에 쓰는 필드만, 긴 필드는 서버에서 잘라서 반환
+    # 필드 → 최대 글자 수 (None이면 자르지 않음)
+    PREVIEW_FIELDS = {
+        "qa_data": {"question": 100, "answer": 200},
+        "papers": {"title": 150, "source": None, "metadata.doi": None, "metadata.pmid": None},
+        "medical_data": {"text": 200, "keyword": None, "patent_id": None},
+    }
+    
+    # BM25 + 필터 검색 시 후보 배수 (필터는 ID 조회 단계에서 적용)
+    BM25_FILTER_DEPTH = 10
+    
+    def __init__(
+        self,
+        uri: str = None,
+        db_name: str = "careguide",
+        keyword_backend: str = None,
+        projection_mode: str = None
+    ):
+        """
+        Args:
+            keyword_backend: 키워드 검색 방식 - mongo ($text, 기본값) | bm25 (로컬 역색인, KEYWORD_BACKEND)
+            projection_mode: 검색 결과 필드 - full (기본값) | preview (잘린 필드만, SEARCH_PROJECTION_MODE)
+        """
         self.uri = uri or os.getenv("MONGODB_URI", "mongodb://localhost:27017")
         self.db_name = db_name
         self.client: Optional[AsyncIOMotorClient] = None
         self.db = None
+        
+        # 로컬 BM25 역색인 (한국어 n-gram, 인덱스가 없는 컬렉션은 $text 사용)
+        self.keyword_backend = (keyword_backend or os.getenv("KEYWORD_BACKEND", "mongo")).lower()
+        # 상대 경로는 실행 위치가 아닌 parlant/ 기준 (서버/색인 스크립트가 같은 위치를 사용)
+        parlant_root = Path(__file__).parent.parent
+        self.bm25_dir = Path(os.getenv("BM25_INDEX_DIR") or parlant_root / "data" / "bm25_index")
+        if not self.bm25_dir.is_absolute():
+            self.bm25_dir = parlant_root / self.bm25_dir
+        self.bm25_indexes: Dict[str, BM25Index] = {}
+        
+        self.projection_mode = (projection_mode or os.getenv("SEARCH_PROJECTION_MODE", "full")).lower()
+        if self.projection_mode not in ("full", "preview"):
+            raise ValueError(f"지원하지 않는 projection 모드: {self.projection_mode} (full | preview)")
+    
+    @classmethod
+    def build_filter(cls, collection_name: str, filters: Optional[Dict] = None) -> Dict:
+        """검색 필터 → MongoDB 조건 (문자열은 일치, 리스트는 $in)
+        
+        예: {"category": "투석", "source_dataset": ["a", "b"]}
+            → {"category": "투석", "source_dataset": {"$in": ["a", "b"]}}
+        """
+        predicate = {}
+        for field in cls.FILTERABLE_FIELDS.get(collection_name, ()):
+            value = (filters or {}).get(field)
+            if value is None or value == "" or value == []:
+                continue
+            predicate[field] = {"$in": list(value)} if isinstance(value, (list, tuple, set)) else value
+        
+        return predicate
+    
+    def projection_for(self, collection_name: str) -> Dict:
+        """검색 결과 반환 필드 (preview 모드: $substrCP로 서버에서 유니코드 안전하게 자름)"""
+        if self.projection_mode == "full":
+            return self.DOCUMENT_PROJECTIONS[collection_name]
+        
+        projection = {"_id": 1}
+        for field, max_chars in self.PREVIEW_FIELDS[collection_name].items():
+            if max_chars is None:
+                projection[field] = 1
+            else:
+                projection[field] = {"$substrCP": [{"$ifNull": [f"${field}", ""]}, 0, max_chars]}
+        
+        return projection
     
     async def connect(self):
         """MongoDB 연결"""
@@ -20,6 +125,8 @@ class MongoDBManager:
             self.client = AsyncIOMotorClient(self.uri)
             self.db = self.client[self.db_name]
             await self.create_indexes()
+            if self.keyword_backend == "bm25":
+                self.load_bm25_indexes()
             print(f"✅ MongoDB 연결 성공: {self.db_name}")
     
     async def close(self):
@@ -67,6 +174,17 @@ class MongoDBManager:
             )
         except Exception as e:
             print(f"⚠️ 의료 데이터 인덱스 생성 경고: {e}")
+        
+        try:
+            # FAQ 정확 일치 조회 (원문 해시 / 정규화 질문 해시)
+            await self.db.qa_data.create_index("question_hash", name="qa_question_hash")
+            await self.db.qa_data.create_index(
+                "question_norm_hash",
+                sparse=True,
+                name="qa_question_norm_hash"
+            )
+        except Exception as e:
+            print(f"⚠️ QA 해시 인덱스 생성 경고: {e}")
     
     # ==================== QA 데이터 ====================
     
@@ -82,11 +200,10 @@ class MongoDBManager:
         
         if upsert:
             # question 해시 기반 upsert
-            from hashlib import md5
             operations = []
             
             for qa in qa_list:
-                q_hash = md5(qa["question"].encode()).hexdigest()
+                q_hash, norm_hash = question_hashes(qa["question"])
                 operations.append({
                     "update_one": {
                         "filter": {"question_hash": q_hash},
@@ -94,7 +211,8 @@ class MongoDBManager:
                             "$set": {
                                 "question": qa["question"],
                                 "answer": qa["answer"],
-                                "question_hash": q_hash
+                                "question_hash": q_hash,
+                                "question_norm_hash": norm_hash
                             }
                         },
                         "upsert": True
@@ -108,15 +226,68 @@ class MongoDBManager:
             result = await self.db.qa_data.insert_many(qa_list, ordered=False)
             print(f"✅ QA 데이터 삽입: {len(result.inserted_ids)}개")
     
-    async def search_qa(self, query: str, limit: int = 10) -> List[Dict]:
-        """QA 텍스트 검색"""
+    async def find_faq(self, query: str, filters: Optional[Dict] = None) -> Optional[Dict]:
+        """FAQ 정확 일치 조회 - 원문 해시 우선, 없으면 정규화 질문 해시 (인덱스 조회 최대 2회)
+        
+        같은 정규화 해시를 가진 질문이 여러 개일 수 있으므로 $or 한 번으로 찾지 않고
+        question_hash (고유 키)를 먼저 조회합니다.
+        
+        Args:
+            filters: {"category": ..., "source_dataset": ...} - 일치해도 필터 밖이면 None
+        
+        Returns:
+            QA 문서 + faq_match ("exact" | "canonical"), 없으면 None
+        """
+        if not canonical_question(query):
+            return None
+        
+        q_hash, norm_hash = question_hashes(query.strip())
+        
+        query_filter = self.build_filter("qa_data", filters)
+        projection = self.projection_for("qa_data")
+        
+        for kind, condition in (("exact", {"question_hash": q_hash}), ("canonical", {"question_norm_hash": norm_hash})):
+            doc = await self.db.qa_data.find_one({**condition, **query_filter}, projection)
+            if doc is not None:
+                return {**doc, "faq_match": kind}
+        
+        return None
+    
+    async def backfill_question_norm_hash(self, batch_size: int = 1000) -> int:
+        """question_norm_hash가 없는 기존 QA 문서에 정규화 해시 추가 → 갱신 수"""
+        cursor = self.db.qa_data.find(
+            {"question_norm_hash": {"$exists": False}},
+            {"question": 1}
+        )
+        
+        updated = 0
+        operations = []
+        async for doc in cursor:
+            _, norm_hash = question_hashes(doc.get("question") or "")
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"question_norm_hash": norm_hash}}))
+            
+            if len(operations) >= batch_size:
+                result = await self.db.qa_data.bulk_write(operations, ordered=False)
+                updated += result.modified_count
+                operations = []
+        
+        if operations:
+            result = await self.db.qa_data.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+        
+        print(f"✅ QA 정규화 해시 추가: {updated}개")
+        return updated
+    
+    async def search_qa(self, query: str, limit: int = 10, filters: Optional[Dict] = None) -> List[Dict]:
+        """QA 텍스트 검색 (filters: category, source_dataset)"""
+        if "qa_data" in self.bm25_indexes:
+            return await self.search_bm25("qa_data", query, limit, filters)
+        
         cursor = self.db.qa_data.find(
-            {"$text": {"$search": query}},
+            {"$text": {"$search": query}, **self.build_filter("qa_data", filters)},
             {
-                "score": {"$meta": "textScore"},
-                "question": 1,
-                "answer": 1,
-                "_id": 1
+                **self.projection_for("qa_data"),
+                "score": {"$meta": "textScore"}
             }
         ).sort([("score", {"$meta": "textScore"})]).limit(limit)
         
@@ -174,17 +345,16 @@ class MongoDBManager:
             "skipped": skipped
         }
     
-    async def search_papers(self, query: str, limit: int = 10) -> List[Dict]:
-        """논문 텍스트 검색 - Abstract 포함"""
+    async def search_papers(self, query: str, limit: int = 10, filters: Optional[Dict] = None) -> List[Dict]:
+        """논문 텍스트 검색 - Abstract 포함 (필터 가능 필드: source)"""
+        if "papers" in self.bm25_indexes:
+            return await self.search_bm25("papers", query, limit, filters)
+        
         cursor = self.db.papers.find(
-            {"$text": {"$search": query}},
+            {"$text": {"$search": query}, **self.build_filter("papers", filters)},
             {
-                "score": {"$meta": "textScore"},
-                "title": 1,
-                "abstract": 1,  # ✅ Abstract 추가
-                "source": 1,
-                "metadata": 1,
-                "_id": 1
+                **self.projection_for("papers"),  # full 모드: Abstract 포함
+                "score": {"$meta": "textScore"}
             }
         ).sort([("score", {"$meta": "textScore"})]).limit(limit)
         
@@ -233,16 +403,16 @@ class MongoDBManager:
             result = await self.db.medical_data.insert_many(medical_list, ordered=False)
             print(f"✅ 의료 데이터 삽입: {len(result.inserted_ids)}개")
     
-    async def search_medical(self, query: str, limit: int = 10) -> List[Dict]:
-        """의료 데이터 텍스트 검색"""
+    async def search_medical(self, query: str, limit: int = 10, filters: Optional[Dict] = None) -> List[Dict]:
+        """의료 데이터 텍스트 검색 (filters: category)"""
+        if "medical_data" in self.bm25_indexes:
+            return await self.search_bm25("medical_data", query, limit, filters)
+        
         cursor = self.db.medical_data.find(
-            {"$text": {"$search": query}},
+            {"$text": {"$search": query}, **self.build_filter("medical_data", filters)},
             {
-                "score": {"$meta": "textScore"},
-                "text": 1,
-                "keyword": 1,
-                "patent_id": 1,
-                "_id": 1
+                **self.projection_for("medical_data"),
+                "score": {"$meta": "textScore"}
             }
         ).sort([("score", {"$meta": "textScore"})]).limit(limit)
         
@@ -252,6 +422,212 @@ class MongoDBManager:
         
         return results
     
+    # ==================== 통합 키워드 검색 ($unionWith) ====================
+    
+    def _keyword_subpipeline(
+        self,
+        collection_name: str,
+        query: str,
+        limit: int,
+        projection: Dict,
+        predicate: Optional[Dict] = None
+    ) -> List[Dict]:
+        """컬렉션 1개의 $text 검색 단계 (필터 → 점수순 limit개 + 소스 태그)"""
+        return [
+            {"$match": {"$text": {"$search": query}, **(predicate or {})}},
+            {"$sort": {"score": {"$meta": "textScore"}}},
+            {"$limit": limit},
+            {"$project": {**projection, "score": {"$meta": "textScore"}}},
+            {"$addFields": {"source_collection": collection_name}},
+        ]
+    
+    async def search_all_collections(
+        self,
+        query: str,
+        limits: Dict[str, int],
+        projections: Optional[Dict[str, Dict]] = None,
+        filters: Optional[Dict] = None
+    ) -> Dict[str, List[Dict]]:
+        """여러 컬렉션 키워드 검색을 집계 파이프라인 1회로 실행 ($unionWith, 왕복 1회)
+        
+        BM25 인덱스가 있는 컬렉션은 로컬에서 점수를 계산하고 같은 파이프라인에서 ID로 조회합니다.
+        
+        Args:
+            query: 검색어
+            limits: {"qa_data": 5, "papers": 5, ...} - 컬렉션별 최대 결과 수
+            projections: 컬렉션별 반환 필드 (기본값: projection_for - full/preview 모드)
+            filters: {"category": ..., "source_dataset": ...} - 컬렉션별 필터 가능 필드에만 적용
+        
+        Returns:
+            {"qa_data": [...], "papers": [...]} - 각 문서에 source_collection 태그,
+            normalized_score (컬렉션 내 최고 점수 대비 0~1) 포함
+        """
+        projections = projections or {}
+        collections = [name for name, limit in limits.items() if limit > 0]
+        if not collections:
+            return {}
+        
+        # BM25 컬렉션은 로컬 점수 계산 → 파이프라인에서는 ID 조회만
+        predicates = {name: self.build_filter(name, filters) for name in collections}
+        
+        bm25_scores: Dict[str, Dict[str, float]] = {}
+        for name in collections:
+            if name in self.bm25_indexes:
+                # 필터는 ID 조회 단계에서 적용 → 후보를 더 깊게 가져옴
+                depth = limits[name] * (self.BM25_FILTER_DEPTH if predicates[name] else 1)
+                hits = await asyncio.get_running_loop().run_in_executor(
+                    None, self.bm25_indexes[name].search, query, depth
+                )
+                bm25_scores[name] = dict(hits)
+        
+        def subpipeline(name: str) -> List[Dict]:
+            projection = projections.get(name) or self.projection_for(name)
+            if name not in bm25_scores:
+                return self._keyword_subpipeline(name, query, limits[name], projection, predicates[name])
+            
+            object_ids = [ObjectId(i) if ObjectId.is_valid(i) else i for i in bm25_scores[name]]
+            return [
+                {"$match": {"_id": {"$in": object_ids}, **predicates[name]}},
+                {"$project": projection},
+                {"$addFields": {"source_collection": name}},
+            ]
+        
+        pipeline = subpipeline(collections[0])
+        for name in collections[1:]:
+            pipeline.append({"$unionWith": {"coll": name, "pipeline": subpipeline(name)}})
+        
+        results: Dict[str, List[Dict]] = {name: [] for name in collections}
+        try:
+            async for doc in self.db[collections[0]].aggregate(pipeline):
+                name = doc["source_collection"]
+                if name in bm25_scores:
+                    doc["score"] = bm25_scores[name].get(str(doc["_id"]), 0.0)
+                results[name].append(doc)
+        except OperationFailure as e:
+            # $unionWith 미지원 서버 (4.4 미만) 등 → 컬렉션별 개별 검색
+            print(f"⚠️ 통합 키워드 검색 실패, 개별 검색으로 전환: {e}")
+            return await self._search_collections_separately(query, limits, filters)
+        
+        for name, docs in results.items():
+            docs.sort(key=lambda d: d.get("score", 0), reverse=True)
+            del docs[limits[name]:]
+            max_score = max((d.get("score", 0) for d in docs), default=0)
+            for doc in docs:
+                doc["normalized_score"] = doc.get("score", 0) / max_score if max_score > 0 else 0.0
+        
+        return results
+    
+    async def _search_collections_separately(
+        self,
+        query: str,
+        limits: Dict[str, int],
+        filters: Optional[Dict] = None
+    ) -> Dict[str, List[Dict]]:
+        """search_all_collections 폴백 - 컬렉션별 검색 동시 실행"""
+        searches = {
+            "qa_data": self.search_qa,
+            "papers": self.search_papers,
+            "medical_data": self.search_medical,
+        }
+        names = [name for name, limit in limits.items() if limit > 0]
+        found = await asyncio.gather(*(searches[name](query, limits[name], filters) for name in names))
+        
+        results = {}
+        for name, docs in zip(names, found):
+            max_score = max((d.get("score", 0) for d in docs), default=0)
+            results[name] = [
+                {
+                    **doc,
+                    "source_collection": name,
+                    "normalized_score": doc.get("score", 0) / max_score if max_score > 0 else 0.0
+                }
+                for doc in docs
+            ]
+        
+        return results
+    
+    # ==================== 로컬 BM25 키워드 검색 ====================
+    
+    def load_bm25_indexes(self):
+        """컬렉션별 BM25 인덱스 로드 (build_bm25_index.py로 생성)"""
+        for collection_name in self.DOCUMENT_PROJECTIONS:
+            index = BM25Index(self.bm25_dir / collection_name)
+            if index.load():
+                self.bm25_indexes[collection_name] = index
+                print(f"✅ BM25 인덱스 로드: {collection_name} ({len(index):,}개)")
+            else:
+                print(f"⚠️ BM25 인덱스 없음: {collection_name} - $text 검색 사용")
+    
+    async def search_bm25(
+        self,
+        collection_name: str,
+        query: str,
+        limit: int = 10,
+        filters: Optional[Dict] = None
+    ) -> List[Dict]:
+        """BM25 검색 → ID 일괄 조회 ($text 검색과 동일한 결과 구조, score = BM25 점수)
+        
+        필터는 ID 조회 쿼리에 함께 적용하므로 limit × BM25_FILTER_DEPTH개 후보를 가져옵니다.
+        """
+        index = self.bm25_indexes[collection_name]
+        predicate = self.build_filter(collection_name, filters)
+        depth = limit * (self.BM25_FILTER_DEPTH if predicate else 1)
+        
+        # NumPy 연산은 이벤트 루프를 막지 않도록 스레드에서 실행
+        hits = await asyncio.get_running_loop().run_in_executor(None, index.search, query, depth)
+        documents = await self.get_documents_by_ids(
+            collection_name,
+            [doc_id for doc_id, _ in hits],
+            match=predicate
+        )
+        
+        results = []
+        for doc_id, score in hits:
+            doc = documents.get(doc_id)
+            if doc is not None:  # 색인 후 삭제된 문서 / 필터 밖 문서 제외
+                results.append({**doc, "score": score})
+        
+        return results[:limit]
+    
+    # ==================== ID 기반 일괄 조회 ====================
+    
+    async def get_documents_by_ids(
+        self,
+        collection_name: str,
+        ids: List[str],
+        projection: Optional[Dict] = None,
+        full: bool = False,
+        match: Optional[Dict] = None
+    ) -> Dict[str, Dict]:
+        """ID 리스트로 문서 일괄 조회 ($in 쿼리 1회)
+        
+        Args:
+            collection_name: qa_data, papers, medical_data
+            ids: 문서 ID 문자열 리스트 (ObjectId 형식이면 자동 변환)
+            projection: 반환 필드 (기본값: projection_for - full/preview 모드)
+            full: True이면 projection 없이 원문 전체 반환 (미리보기 결과의 상세 조회용)
+            match: 추가 조건 (예: build_filter 결과)
+        
+        Returns:
+            {"문서 ID": 문서, ...} - 존재하지 않는 ID는 제외
+        """
+        if not ids:
+            return {}
+        
+        if full:
+            projection = None
+        elif projection is None:
+            projection = self.projection_for(collection_name)
+        
+        object_ids = [ObjectId(i) if ObjectId.is_valid(i) else i for i in ids]
+        cursor = self.db[collection_name].find({"_id": {"$in": object_ids}, **(match or {})}, projection)
+        
+        documents = {}
+        async for doc in cursor:
+            documents[str(doc["_id"])] = doc
+        
+        return documents
+    
     # ==================== 통계 ====================
     
     async def get_stats(self) -> Dict:
@@ -6,38 +6,118 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from pinecone import Pinecone, ServerlessSpec
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict
+from typing import List, Dict, Optional
 import os
 from dotenv import load_dotenv
 from database.mongodb_manager import MongoDBManager
+from database.local_vector_store import LocalVectorStore
+from database.embedding_batcher import MicroBatchEncoder
+from database.embedding_cache import EmbeddingCache
+from database.encoders import load_encoder
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import asyncio
 
 load_dotenv()
 
 
 class VectorDBManager:
-    """Pinecone Vector DB 관리자"""
+    """Vector DB 관리자 (Pinecone 또는 로컬 벡터 스토어)"""
     
-    def __init__(self, index_name: str = "medical-embeddings"):
+    # 메타데이터 필터 대상 필드 (ids 모드에서도 벡터 메타데이터로 저장)
+    FILTER_FIELDS = ("category", "source_dataset")
+    
+    # 문서 임베딩 배치 크기 (upsert_embeddings)
+    EMBED_BATCH_SIZE = 64
+    
+    def __init__(
+        self,
+        index_name: str = "medical-embeddings",
+        backend: Optional[str] = None,
+        local_dir: Optional[str] = None,
+        encoder_backend: Optional[str] = None,
+        metadata_mode: Optional[str] = None
+    ):
+        """
+        Args:
+            index_name: Pinecone 인덱스 이름
+            backend: "pinecone" (기본값) 또는 "local" (인프로세스 검색, 외부 서비스 불필요)
+            local_dir: 로컬 벡터 스토어 저장 경로 (backend="local")
+            encoder_backend: 임베딩 추론 백엔드 "torch" (기본값) | "onnx" | "onnx-int8"
+            metadata_mode: "full" (기본값, 본문 일부를 메타데이터에 저장) |
+                "ids" (ID만 저장, 검색 결과는 MongoDB에서 일괄 조회)
+        """
         self.index_name = index_name
         self.dimension = 384  # all-MiniLM-L6-v2 차원
-        
-        # Pinecone 초기화
-        api_key = os.getenv("PINECONE_API_KEY")
-        if not api_key:
-            raise ValueError("PINECONE_API_KEY not found in .env")
-        
-        self.pc = Pinecone(api_key=api_key)
+        self.backend = (backend or os.getenv("VECTOR_BACKEND", "pinecone")).lower()
+        self.metadata_mode = (metadata_mode or os.getenv("VECTOR_METADATA_MODE", "full")).lower()
+        if self.metadata_mode not in ("full", "ids"):
+            raise ValueError(f"지원하지 않는 메타데이터 모드: {self.metadata_mode} (full | ids)")
         self.index = None
+        self.pc = None
+        
+        if self.backend == "pinecone":
+            # Pinecone 초기화
+            api_key = os.getenv("PINECONE_API_KEY")
+            if not api_key:
+                raise ValueError("PINECONE_API_KEY not found in .env")
+            
+            self.pc = Pinecone(api_key=api_key)
+        elif self.backend == "local":
+            # 상대 경로는 실행 위치가 아닌 parlant/ 기준 (서버/적재 스크립트가 같은 위치를 사용)
+            local_path = Path(local_dir or os.getenv("LOCAL_VECTOR_DIR") or project_root / "data" / "vector_store")
+            self.local_dir = str(local_path if local_path.is_absolute() else project_root / local_path)
+            # 이 크기 이상인 namespace는 HNSW 근사 검색 (qa), 미만은 exact 검색 (papers, medical)
+            self.hnsw_threshold = int(os.getenv("LOCAL_HNSW_THRESHOLD", "100000"))
+            # 대규모 namespace 압축 저장: none | int8 | binary (+ 선택적 PCA 차원 축소)
+            self.quantization = os.getenv("LOCAL_VECTOR_QUANTIZATION", "none").lower()
+            self.pca_dim = int(os.getenv("LOCAL_VECTOR_PCA_DIM", "0")) or None
+            self.rescore_factor = int(os.getenv("LOCAL_VECTOR_RESCORE_FACTOR", "10"))
+        else:
+            raise ValueError(f"지원하지 않는 벡터 백엔드: {self.backend} (pinecone | local)")
         
-        # Sentence Transformer 모델
-        print("📥 Sentence Transformer 모델 로딩 중...")
-        self.model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+        # Sentence Transformer 모델 (torch / onnx / onnx-int8)
+        self.encoder_backend = (encoder_backend or os.getenv("EMBED_BACKEND", "torch")).lower()
+        print(f"📥 Sentence Transformer 모델 로딩 중... ({self.encoder_backend})")
+        self.model = load_encoder(self.encoder_backend, 'sentence-transformers/all-MiniLM-L6-v2')
         print("✅ 모델 로딩 완료")
+        
+        # 블로킹 작업(임베딩, 인덱스 조회) 전용 스레드 풀 - 이벤트 루프 블로킹 방지
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("VECTOR_EXECUTOR_WORKERS", "4")),
+            thread_name_prefix="vector-db"
+        )
+        
+        # 동시 쿼리 마이크로 배칭 (수 ms 내 요청 → model.encode 1회)
+        self.encoder = MicroBatchEncoder(
+            self._encode_batch,
+            self.executor,
+            max_batch_size=int(os.getenv("EMBED_MAX_BATCH_SIZE", "32")),
+            max_wait_ms=float(os.getenv("EMBED_MAX_WAIT_MS", "5"))
+        )
+        
+        # 쿼리 임베딩 캐시 (반복 질문은 모델 호출 생략)
+        self.embedding_cache = EmbeddingCache(
+            max_size=int(os.getenv("EMBED_CACHE_SIZE", "10000")),
+            ttl_seconds=float(os.getenv("EMBED_CACHE_TTL", "0"))
+        )
     
     async def create_index(self):
-        """Pinecone 인덱스 생성 또는 연결"""
+        """Pinecone 인덱스 생성 또는 연결 (로컬 백엔드는 디스크에서 로드)"""
+        
+        if self.backend == "local":
+            if self.index is None:
+                self.index = LocalVectorStore(
+                    dimension=self.dimension,
+                    persist_dir=self.local_dir,
+                    hnsw_threshold=self.hnsw_threshold,
+                    quantization=self.quantization,
+                    pca_dim=self.pca_dim,
+                    rescore_factor=self.rescore_factor
+                )
+                self.index.load()
+                print(f"✅ 로컬 벡터 스토어 연결: {self.local_dir}")
+            return
         
         # 인덱스 존재 확인
         existing_indexes = [idx.name for idx in self.pc.list_indexes()]
@@ -59,30 +139,61 @@ class VectorDBManager:
         
         self.index = self.pc.Index(self.index_name)
     
-    def generate_embedding(self, text: str) -> List[float]:
-        """텍스트 → 임베딩 벡터"""
-        return self.model.encode(text).tolist()
+    def generate_embedding(self, text: str, use_cache: bool = False) -> List[float]:
+        """텍스트 → 임베딩 벡터 (동기)
+        
+        문서 임베딩용이라 기본값은 캐시 미사용입니다 (대량 적재가 쿼리 임베딩을 LRU에서 밀어내지 않도록).
+        쿼리는 embed_query를 사용하세요.
+        """
+        if use_cache:
+            cached = self.embedding_cache.get(text)
+            if cached is not None:
+                return cached
+        
+        embedding = self.model.encode(text).tolist()
+        
+        if use_cache:
+            self.embedding_cache.put(text, embedding)
+        
+        return embedding
+    
+    def _encode_batch(self, texts: List[str]):
+        """텍스트 배치 → 임베딩 배열 (executor 스레드에서 실행)"""
+        return self.model.encode(texts, batch_size=len(texts))
+    
+    async def embed_query(self, text: str) -> List[float]:
+        """쿼리 임베딩 (비동기) - 캐시 → executor 오프로드 + 마이크로 배칭"""
+        cached = self.embedding_cache.get(text)
+        if cached is not None:
+            return cached
+        
+        embedding = await self.encoder.encode(text)
+        self.embedding_cache.put(text, embedding)
+        
+        return embedding
     
     async def upsert_embeddings(
         self,
         docs: List[Dict],
         namespace: str,
         id_field: str = "_id",
-        text_fields: List[str] = None
+        text_fields: List[str] = None,
+        persist: bool = True
     ):
-        """MongoDB 문서 → Pinecone 임베딩
+        """MongoDB 문서 → 벡터 임베딩 업로드
         
         Args:
             docs: MongoDB 문서 리스트
-            namespace: Pinecone 네임스페이스 (qa, papers, medical)
+            namespace: 네임스페이스 (qa, papers, medical)
             id_field: 문서 ID 필드
             text_fields: 임베딩할 텍스트 필드 리스트
+            persist: 로컬 백엔드에서 호출마다 namespace 저장 (여러 번 나눠 올리면 False 후 index.save)
         """
         if not docs:
             print("⚠️ 임베딩할 문서가 없습니다")
             return
         
-        vectors = []
+        items = []  # (문서 ID, 임베딩 텍스트, 문서)
         
         for doc in docs:
             # ID 추출
@@ -104,17 +215,31 @@ class VectorDBManager:
             if not combined_text.strip():
                 continue
             
-            # 임베딩 생성
-            embedding = self.generate_embedding(combined_text)
+            items.append((doc_id, combined_text, doc))
+        
+        # 임베딩 생성 (배치 인코딩 - 문서 텍스트는 쿼리 임베딩 캐시에 넣지 않음)
+        embeddings = []
+        for i in range(0, len(items), self.EMBED_BATCH_SIZE):
+            batch_texts = [text for _, text, _ in items[i:i + self.EMBED_BATCH_SIZE]]
+            embeddings.extend(self._encode_batch(batch_texts))
+        
+        vectors = []
+        
+        for (doc_id, _, doc), embedding in zip(items, embeddings):
+            vector = {
+                "id": doc_id,
+                "values": embedding.tolist()
+            }
             
-            # 메타데이터 평탄화 (Pinecone 제약)
-            metadata = self.flatten_metadata(doc)
+            # 메타데이터 평탄화 (Pinecone 제약) - ids 모드는 필터 필드만 저장
+            if self.metadata_mode == "full":
+                vector["metadata"] = self.flatten_metadata(doc)
+            else:
+                filter_metadata = {f: doc[f] for f in self.FILTER_FIELDS if doc.get(f)}
+                if filter_metadata:
+                    vector["metadata"] = filter_metadata
             
-            vectors.append({
-                "id": doc_id,
-                "values": embedding,
-                "metadata": metadata
-            })
+            vectors.append(vector)
         
         # 배치 업로드 (100개씩)
         batch_size = 100
@@ -122,6 +247,9 @@ class VectorDBManager:
             batch = vectors[i:i+batch_size]
             self.index.upsert(vectors=batch, namespace=namespace)
         
+        if self.backend == "local" and persist:
+            self.index.save(namespace)
+        
         print(f"✅ {len(vectors)}개 벡터 업로드 완료 (namespace: {namespace})")
     
     def flatten_metadata(self, doc: Dict) -> Dict:
@@ -139,6 +267,8 @@ class VectorDBManager:
             "answer": doc.get("answer", "")[:1000],
             "text": doc.get("text", "")[:1000],
             "keyword": doc.get("keyword", "")[:200],
+            "category": doc.get("category", ""),
+            "source_dataset": doc.get("source_dataset", ""),
         }
         
         # metadata 하위 필드
@@ -167,9 +297,10 @@ class VectorDBManager:
         self,
         query: str,
         top_k: int = 10,
-        namespace: str = "papers"
+        namespace: str = "papers",
+        filter: Optional[Dict] = None
     ) -> List[Dict]:
-        """의미론적 검색
+        """의미론적 검색 (filter: Pinecone 메타데이터 필터, 예: {"category": "투석"})
         
         Returns:
             [
@@ -182,14 +313,36 @@ class VectorDBManager:
             ]
         """
         # 쿼리 임베딩
-        query_embedding = self.generate_embedding(query)
-        
-        # Pinecone 검색
-        results = self.index.query(
-            vector=query_embedding,
-            top_k=top_k,
-            namespace=namespace,
-            include_metadata=True
+        query_embedding = await self.embed_query(query)
+        
+        return await self.search_by_vector(query_embedding, top_k=top_k, namespace=namespace, filter=filter)
+    
+    async def search_by_vector(
+        self,
+        query_embedding: List[float],
+        top_k: int = 10,
+        namespace: str = "papers",
+        filter: Optional[Dict] = None
+    ) -> List[Dict]:
+        """미리 계산된 쿼리 벡터로 단일 namespace 검색
+        
+        ids 모드에서는 metadata가 None으로 반환됩니다 (MongoDB에서 조회 필요).
+        filter는 검색 단계에서 적용되므로 필터 후에도 top_k개를 채웁니다.
+        """
+        query_kwargs = {"filter": filter} if filter else {}
+        
+        # 벡터 검색 (Pinecone 또는 로컬 스토어 - 동일 인터페이스, 블로킹 호출 → executor)
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(
+            self.executor,
+            partial(
+                self.index.query,
+                vector=query_embedding,
+                top_k=top_k,
+                namespace=namespace,
+                include_metadata=self.metadata_mode == "full",
+                **query_kwargs
+            )
         )
         
         # 결과 포맷팅
@@ -202,6 +355,34 @@ class VectorDBManager:
             })
         
         return matches
+    
+    async def semantic_search_multi(
+        self,
+        query_embedding: List[float],
+        namespaces: List[str],
+        top_k: int = 10,
+        filters: Optional[Dict[str, Dict]] = None
+    ) -> Dict[str, List[Dict]]:
+        """하나의 쿼리 벡터로 여러 namespace 병렬 검색 (임베딩 1회)
+        
+        Args:
+            filters: namespace별 메타데이터 필터 {"qa": {"category": "투석"}, ...}
+        
+        Returns:
+            {"qa": [...], "papers": [...], ...}
+        """
+        filters = filters or {}
+        results = await asyncio.gather(*[
+            self.search_by_vector(
+                query_embedding,
+                top_k=top_k,
+                namespace=namespace,
+                filter=filters.get(namespace)
+            )
+            for namespace in namespaces
+        ])
+        
+        return dict(zip(namespaces, results))
 
 
 # ==================== MongoDB → Pinecone 임베딩 파이프라인 ====================
@@ -23,12 +23,17 @@ from bson import ObjectId
 from search.hybrid_search import HybridSearchEngine
 
 # ==================== 설정 ====================
+# PubMed 상세 정보 수준 (pubmed_depth): full = efetch (초록/MeSH 포함), summary = esummary (제목/저자/저널/DOI만)
+# 환자/일반 프로필은 초록을 답변에 쓰지 않으므로 작은 응답으로 지연 절감
 PROFILE_LIMITS = {
-    "researcher": {"max_results": 10, "detail_level": "high"},
-    "patient": {"max_results": 5, "detail_level": "medium"},
-    "general": {"max_results": 3, "detail_level": "low"}
+    "researcher": {"max_results": 10, "detail_level": "high", "pubmed_depth": "full"},
+    "patient": {"max_results": 5, "detail_level": "medium", "pubmed_depth": "summary"},
+    "general": {"max_results": 3, "detail_level": "low", "pubmed_depth": "summary"}
 }
 
+# 로컬 소스 결과가 모두 나온 뒤 PubMed 결과를 추가로 기다리는 최대 시간 (초)
+PUBMED_GRACE_SECONDS = float(os.getenv("PUBMED_GRACE_SECONDS", "1.0"))
+
 # ==================== 전역 변수 (변경됨) ====================
 # 기존: JSONL 파일 직접 로드
 # 새로운 방식: 하이브리드 검색 엔진 사용
@@ -73,6 +78,20 @@ async def initialize_search_engine():
         print("✅ 검색 엔진 준비 완료")
 
 
+def describe_fusion() -> str:
+    """검색 엔진의 점수 융합 설정 안내 (SEARCH_FUSION_STRATEGY / SEARCH_KEYWORD_WEIGHT)"""
+    keyword_weight = SEARCH_ENGINE.keyword_weight
+    strategy_notes = {"weighted": "", "max_norm": ", 최댓값 정규화", "rrf": ", 순위 기반 RRF"}
+    return f"키워드 {keyword_weight:.0%} + 시맨틱 {1 - keyword_weight:.0%}{strategy_notes[SEARCH_ENGINE.fusion_strategy]}"
+
+
+def describe_fusion_en() -> str:
+    """describe_fusion 영문판 (에이전트 설명용)"""
+    keyword_weight = SEARCH_ENGINE.keyword_weight
+    strategy_notes = {"weighted": "", "max_norm": ", max-normalized", "rrf": ", reciprocal rank fusion"}
+    return f"keyword {keyword_weight:.0%} + semantic {1 - keyword_weight:.0%}{strategy_notes[SEARCH_ENGINE.fusion_strategy]}"
+
+
 async def llm_refine_results_v2(query: str, raw_results: dict, profile: str) -> str:
     """LLM 정제 프롬프트 생성 - PubMed 상세 정보 포함
     
@@ -137,16 +156,17 @@ async def llm_refine_results_v2(query: str, raw_results: dict, profile: str) ->
             pub_date = paper.get('pub_date', 'N/A')
             pmid = paper.get('pmid', 'N/A')
             doi = paper.get('doi', 'N/A')
-            abstract = paper.get('abstract', 'N/A')[:400]
+            abstract = paper.get('abstract', '')[:400]
             url = paper.get('url', 'N/A')
+            # 환자/일반 프로필은 esummary 결과라 초록이 없음
+            abstract_line = f"   **초록**: {abstract}...\n" if abstract else ""
             
             pubmed_summary += f"""{i}. **제목**: {title}
    **저자**: {authors}
    **저널**: {journal} ({pub_date})
    **PMID**: {pmid}
    **DOI**: {doi}
-   **초록**: {abstract}...
-   **URL**: {url}
+{abstract_line}   **URL**: {url}
 
 """
     else:
@@ -263,7 +283,13 @@ async def select_profile() -> str:
 # ==================== Medical Information Tools ====================
 
 @p.tool
-async def search_medical_qa(context: ToolContext, query: str) -> ToolResult:
+async def search_medical_qa(
+    context: ToolContext,
+    query: str,
+    category: Optional[str] = None,
+    source_dataset: Optional[str] = None,
+    cursor: Optional[str] = None
+) -> ToolResult:
     """의료 정보 통합 검색 도구
     
     **검색 방식**:
@@ -273,11 +299,15 @@ async def search_medical_qa(context: ToolContext, query: str) -> ToolResult:
     4. PubMed API 실시간 검색 (초록, 저자, DOI 포함)
     
     **하이브리드 점수 계산**:
-    - 최종 점수 = 키워드 점수 × 0.4 + 시맨틱 점수 × 0.6
+    - 키워드 점수와 시맨틱 점수를 설정된 융합 전략으로 결합 (SEARCH_FUSION_STRATEGY: weighted | max_norm | rrf,
+      가중치 SEARCH_KEYWORD_WEIGHT) - 실제 설정은 결과 메시지의 검색 방식에 표시
     
     Args:
         context: ToolContext (프로필 정보 포함)
         query: 사용자 질문
+        category: 카테고리 필터 (예: "투석") - QA/의료 데이터 검색 범위 제한
+        source_dataset: QA 데이터셋 필터
+        cursor: 이전 검색 결과의 next_cursor ("더 보여줘" 요청 시 - 같은 후보 풀의 다음 페이지)
     
     Returns:
         ToolResult with raw_results and refinement_prompt
@@ -292,14 +322,36 @@ async def search_medical_qa(context: ToolContext, query: str) -> ToolResult:
         
         print(f"\n🔍 [{profile.upper()}] 프로필로 '{query}' 검색 중...")
         
-        # 하이브리드 검색 실행
-        raw_results = await SEARCH_ENGINE.search_all_sources(
-            query=query,
-            max_per_source=max_results,
-            use_semantic=True,  # 시맨틱 검색 활성화
-            use_pubmed=True     # PubMed 고급 검색 활성화
-        )
-
+        if cursor:
+            # "더 보기" - 첫 검색의 후보 풀 스냅샷에서 다음 페이지 (백엔드 재검색 없음)
+            raw_results = await SEARCH_ENGINE.search_all_sources(query, cursor=cursor)
+            print(f"  📄 {raw_results['page']}페이지 (커서 스냅샷)")
+        else:
+            # 연구자 프로필은 후보 풀을 깊게 가져와 스냅샷 저장 → 다음 페이지는 커서로 제공
+            paginate = profile == "researcher"
+            pool_size = max(max_results, SEARCH_ENGINE.cursor_pool_size) if paginate else max_results
+            
+            # 하이브리드 검색 실행 (스트리밍) - 로컬 소스 완료 후 PubMed는 grace 시간까지만 대기
+            raw_results = None
+            search_start = asyncio.get_running_loop().time()
+            async for source, results in SEARCH_ENGINE.search_all_sources_stream(
+                query=query,
+                max_per_source=pool_size,
+                use_semantic=True,  # 시맨틱 검색 활성화
+                use_pubmed=True,    # PubMed 고급 검색 활성화
+                pubmed_grace=PUBMED_GRACE_SECONDS,
+                filters={"category": category, "source_dataset": source_dataset},
+                pubmed_depth=PROFILE_LIMITS[profile]["pubmed_depth"]
+            ):
+                if source == "merged":
+                    raw_results = results
+                else:
+                    elapsed = asyncio.get_running_loop().time() - search_start
+                    print(f"  ⚡ {source}: {len(results)}개 ({elapsed:.2f}s)")
+            
+            if paginate:
+                raw_results = await SEARCH_ENGINE.paginate_results(query, raw_results, page_size=max_results)
+        
         # ObjectId를 문자열로 변환 (직렬화 가능하도록)
         raw_results = convert_objectid_to_str(raw_results)
 
@@ -316,19 +368,29 @@ async def search_medical_qa(context: ToolContext, query: str) -> ToolResult:
         
         print(f"✅ 검색 완료: 총 {total_count}개 결과")
         
+        method_notes = {
+            "hybrid": f"- 키워드 매칭 + 의미론적 유사도 ({describe_fusion()})",
+            "faq": "- FAQ 질문 정확 일치 (큐레이션 답변)",
+        }
+        
         return ToolResult(
             data={
                 "query": query,
                 "profile": profile,
                 "raw_results": raw_results,
                 "refinement_prompt": refinement_prompt,
-                "search_method": raw_results["search_method"],  # "hybrid" or "keyword"
+                "search_method": raw_results["search_method"],  # "hybrid", "keyword" or "faq"
                 "total_sources": 4,
                 "qa_count": len(raw_results["qa_results"]),
                 "paper_count": len(raw_results["paper_results"]),
                 "medical_count": len(raw_results["medical_results"]),
                 "pubmed_count": len(raw_results["pubmed_results"]),
                 "total_count": total_count,
+                "degraded": raw_results["degraded"],
+                "degraded_sources": raw_results["degraded_sources"],
+                "duplicates_removed": raw_results.get("duplicates_removed", 0),  # 로컬 논문 ↔ PubMed 중복 제거 수
+                "page": raw_results.get("page"),
+                "next_cursor": raw_results.get("next_cursor"),  # "더 보여줘" 시 cursor로 전달
                 "message": f"""✅ 총 {total_count}개 결과를 {raw_results['search_method'].upper()} 검색으로 찾았습니다.
 
 📊 소스별 결과:
@@ -338,7 +400,7 @@ async def search_medical_qa(context: ToolContext, query: str) -> ToolResult:
   • PubMed 실시간: {len(raw_results['pubmed_results'])}개
 
 🔬 검색 방식: {raw_results['search_method'].upper()}
-  {'- 키워드 매칭 (40%) + 의미론적 유사도 (60%)' if raw_results['search_method'] == 'hybrid' else '- 키워드 매칭만 사용'}"""
+  {method_notes.get(raw_results['search_method'], '- 키워드 매칭만 사용')}"""
             }
         )
     
@@ -889,6 +951,9 @@ async def add_profile_guidelines(agent: p.Agent) -> None:
         Use the refinement_prompt to generate comprehensive, research-oriented responses.
         
         You may reference up to 10 results per source based on the profile limit.
+        If the user asks for more results ("show me more", "더 보여줘"), call search_medical_qa again
+        with the same query and cursor set to next_cursor from the previous result.
+        When next_cursor is empty, tell the user there are no more results.
         Include citations with PMIDs, DOIs, and publication dates when mentioning PubMed papers.
         Maintain a professional and scholarly tone throughout.
         
@@ -1110,10 +1175,10 @@ async def main() -> None:
         # Agent 생성
         agent = await server.create_agent(
             name="CareGuide_v2",
-            description="""You are CareGuide v2.0, an advanced medical information chatbot with cutting-edge search capabilities.
+            description=f"""You are CareGuide v2.0, an advanced medical information chatbot with cutting-edge search capabilities.
 
 **Core Features**:
-1. **Hybrid Search Engine**: Combines keyword matching (40%) and semantic similarity (60%)
+1. **Hybrid Search Engine**: Combines keyword matching and semantic similarity ({describe_fusion_en()})
 2. **Multi-Source Integration**: 
    - MongoDB (structured data with text indexing)
    - Pinecone (vector database for semantic search)
@@ -1189,9 +1254,10 @@ Always respond in Korean unless specifically requested otherwise.""",
         print(f"  • 선택된 프로필: {profile_display[profile]}")
         print(f"  • 최대 결과 수: {PROFILE_LIMITS[profile]['max_results']}개/소스")
         print(f"  • 상세 수준: {PROFILE_LIMITS[profile]['detail_level']}")
+        print(f"  • PubMed 상세 정보: {PROFILE_LIMITS[profile]['pubmed_depth']}")
         
         print(f"\n🔍 **검색 시스템**:")
-        print(f"  • 검색 방식: 하이브리드 (키워드 40% + 시맨틱 60%)")
+        print(f"  • 검색 방식: 하이브리드 ({describe_fusion()})")
         print(f"  • 데이터 소스:")
         print(f"    1. MongoDB - 구조화된 데이터 (텍스트 인덱싱)")
         print(f"    2. Pinecone - 벡터 데이터베이스 (의미론적 검색)")
@@ -23,12 +23,17 @@ from bson import ObjectId
 from search.hybrid_search import HybridSearchEngine
 
 # ==================== Configuration ====================
+# PubMed fetch depth (pubmed_depth): full = efetch (abstracts/MeSH), summary = esummary (title/authors/journal/DOI only)
+# Patient/general profiles don't use abstracts in answers, so they get the smaller payload
 PROFILE_LIMITS = {
-    "researcher": {"max_results": 10, "detail_level": "high"},
-    "patient": {"max_results": 5, "detail_level": "medium"},
-    "general": {"max_results": 3, "detail_level": "low"}
+    "researcher": {"max_results": 10, "detail_level": "high", "pubmed_depth": "full"},
+    "patient": {"max_results": 5, "detail_level": "medium", "pubmed_depth": "summary"},
+    "general": {"max_results": 3, "detail_level": "low", "pubmed_depth": "summary"}
 }
 
+# Max time to keep waiting for PubMed once all local sources have returned (seconds)
+PUBMED_GRACE_SECONDS = float(os.getenv("PUBMED_GRACE_SECONDS", "1.0"))
+
 # ==================== Global Variables ====================
 # Old: Direct JSONL file loading
 # New: Using hybrid search engine
@@ -73,6 +78,13 @@ async def initialize_search_engine():
         print("✅ Search engine ready")
 
 
+def describe_fusion_en() -> str:
+    """Score fusion settings of the search engine (SEARCH_FUSION_STRATEGY / SEARCH_KEYWORD_WEIGHT)"""
+    keyword_weight = SEARCH_ENGINE.keyword_weight
+    strategy_notes = {"weighted": "", "max_norm": ", max-normalized", "rrf": ", reciprocal rank fusion"}
+    return f"keyword {keyword_weight:.0%} + semantic {1 - keyword_weight:.0%}{strategy_notes[SEARCH_ENGINE.fusion_strategy]}"
+
+
 async def llm_refine_results_v2(query: str, raw_results: dict, profile: str) -> str:
     """Generate LLM refinement prompt - Including PubMed detailed information
 
@@ -137,14 +149,15 @@ async def llm_refine_results_v2(query: str, raw_results: dict, profile: str) ->
             pub_date = paper.get('pub_date', 'N/A')
             pmid = paper.get('pmid', 'N/A')
             doi = paper.get('doi', 'N/A')[:40]
-            abstract = paper.get('abstract', 'N/A')[:200]
+            abstract = paper.get('abstract', '')[:200]
             url = paper.get('url', 'N/A')
+            # Patient/general profiles get esummary records without abstracts
+            abstract_line = f"   Abstract: {abstract}...\n" if abstract else ""
 
             pubmed_summary += f"""{i}. {title}
    Authors: {authors} | {journal} ({pub_date})
    PMID: {pmid} | DOI: {doi}
-   Abstract: {abstract}...
-   URL: {url}
+{abstract_line}   URL: {url}
 """
     else:
         pubmed_summary = "No results"
@@ -222,7 +235,13 @@ async def select_profile() -> str:
 # ==================== Medical Information Tools ====================
 
 @p.tool
-async def search_medical_qa(context: ToolContext, query: str) -> ToolResult:
+async def search_medical_qa(
+    context: ToolContext,
+    query: str,
+    category: Optional[str] = None,
+    source_dataset: Optional[str] = None,
+    cursor: Optional[str] = None
+) -> ToolResult:
     """Integrated medical information search tool
 
     **Search Methods**:
@@ -232,11 +251,15 @@ async def search_medical_qa(context: ToolContext, query: str) -> ToolResult:
     4. PubMed API real-time search (abstracts, authors, DOI included)
 
     **Hybrid Score Calculation**:
-    - Final score = keyword score × 0.4 + semantic score × 0.6
+    - Keyword and semantic scores are combined with the configured fusion strategy (SEARCH_FUSION_STRATEGY:
+      weighted | max_norm | rrf, weight SEARCH_KEYWORD_WEIGHT) - the active setting is shown in the result message
 
     Args:
         context: ToolContext (includes profile info)
         query: User question
+        category: Category filter (e.g. "투석") - restricts QA/medical data search
+        source_dataset: QA dataset filter
+        cursor: next_cursor from a previous result ("show me more" - next page of the same candidate pool)
 
     Returns:
         ToolResult with raw_results and refinement_prompt
@@ -251,13 +274,35 @@ async def search_medical_qa(context: ToolContext, query: str) -> ToolResult:
 
         print(f"\n🔍 [{profile.upper()}] Searching for '{query}'...")
 
-        # Execute hybrid search
-        raw_results = await SEARCH_ENGINE.search_all_sources(
-            query=query,
-            max_per_source=max_results,
-            use_semantic=True,  # Enable semantic search
-            use_pubmed=True     # Enable PubMed advanced search
-        )
+        if cursor:
+            # "Show more" - next page from the first search's candidate pool snapshot (no backend re-search)
+            raw_results = await SEARCH_ENGINE.search_all_sources(query, cursor=cursor)
+            print(f"  📄 Page {raw_results['page']} (cursor snapshot)")
+        else:
+            # Researcher profile fetches a deep candidate pool and snapshots it → next pages served by cursor
+            paginate = profile == "researcher"
+            pool_size = max(max_results, SEARCH_ENGINE.cursor_pool_size) if paginate else max_results
+
+            # Execute hybrid search (streaming) - after local sources finish, wait for PubMed only up to the grace period
+            raw_results = None
+            search_start = asyncio.get_running_loop().time()
+            async for source, results in SEARCH_ENGINE.search_all_sources_stream(
+                query=query,
+                max_per_source=pool_size,
+                use_semantic=True,  # Enable semantic search
+                use_pubmed=True,    # Enable PubMed advanced search
+                pubmed_grace=PUBMED_GRACE_SECONDS,
+                filters={"category": category, "source_dataset": source_dataset},
+                pubmed_depth=PROFILE_LIMITS[profile]["pubmed_depth"]
+            ):
+                if source == "merged":
+                    raw_results = results
+                else:
+                    elapsed = asyncio.get_running_loop().time() - search_start
+                    print(f"  ⚡ {source}: {len(results)} results ({elapsed:.2f}s)")
+
+            if paginate:
+                raw_results = await SEARCH_ENGINE.paginate_results(query, raw_results, page_size=max_results)
 
         # Convert ObjectId to string (for serialization)
         raw_results = convert_objectid_to_str(raw_results)
@@ -275,19 +320,29 @@ async def search_medical_qa(context: ToolContext, query: str) -> ToolResult:
 
         print(f"✅ Search complete: {total_count} total results")
 
+        method_notes = {
+            "hybrid": f"- Keyword matching + Semantic similarity ({describe_fusion_en()})",
+            "faq": "- Exact FAQ question match (curated answer)",
+        }
+
         return ToolResult(
             data={
                 "query": query,
                 "profile": profile,
                 "raw_results": raw_results,
                 "refinement_prompt": refinement_prompt,
-                "search_method": raw_results["search_method"],  # "hybrid" or "keyword"
+                "search_method": raw_results["search_method"],  # "hybrid", "keyword" or "faq"
                 "total_sources": 4,
                 "qa_count": len(raw_results["qa_results"]),
                 "paper_count": len(raw_results["paper_results"]),
                 "medical_count": len(raw_results["medical_results"]),
                 "pubmed_count": len(raw_results["pubmed_results"]),
                 "total_count": total_count,
+                "degraded": raw_results["degraded"],
+                "degraded_sources": raw_results["degraded_sources"],
+                "duplicates_removed": raw_results.get("duplicates_removed", 0),  # local papers ↔ PubMed duplicates removed
+                "page": raw_results.get("page"),
+                "next_cursor": raw_results.get("next_cursor"),  # pass as cursor on "show me more"
                 "message": f"""✅ Found {total_count} total results using {raw_results['search_method'].upper()} search.
 
 📊 Results by Source:
@@ -297,7 +352,7 @@ async def search_medical_qa(context: ToolContext, query: str) -> ToolResult:
   • PubMed Real-time: {len(raw_results['pubmed_results'])}
 
 🔬 Search Method: {raw_results['search_method'].upper()}
-  {'- Keyword matching (40%) + Semantic similarity (60%)' if raw_results['search_method'] == 'hybrid' else '- Keyword matching only'}"""
+  {method_notes.get(raw_results['search_method'], '- Keyword matching only')}"""
             }
         )
 
@@ -848,6 +903,9 @@ async def add_profile_guidelines(agent: p.Agent) -> None:
         Use the refinement_prompt to generate comprehensive, research-oriented responses.
 
         You may reference up to 10 results per source based on the profile limit.
+        If the user asks for more results ("show me more", "더 보여줘"), call search_medical_qa again
+        with the same query and cursor set to next_cursor from the previous result.
+        When next_cursor is empty, tell the user there are no more results.
         Include citations with PMIDs, DOIs, and publication dates when mentioning PubMed papers.
         Maintain a professional and scholarly tone throughout.
 
@@ -1069,10 +1127,10 @@ async def main() -> None:
         # Create Agent
         agent = await server.create_agent(
             name="CareGuide_v2",
-            description="""You are CareGuide v2.0, an advanced medical information chatbot with cutting-edge search capabilities.
+            description=f"""You are CareGuide v2.0, an advanced medical information chatbot with cutting-edge search capabilities.
 
 **Core Features**:
-1. **Hybrid Search Engine**: Combines keyword matching (40%) and semantic similarity (60%)
+1. **Hybrid Search Engine**: Combines keyword matching and semantic similarity ({describe_fusion_en()})
 2. **Multi-Source Integration**:
    - MongoDB (structured data with text indexing)
    - Pinecone (vector database for semantic search)
@@ -1148,9 +1206,10 @@ Always respond in Korean unless specifically requested otherwise.""",
         print(f"  • Selected Profile: {profile_display[profile]}")
         print(f"  • Max Results: {PROFILE_LIMITS[profile]['max_results']} per source")
         print(f"  • Detail Level: {PROFILE_LIMITS[profile]['detail_level']}")
+        print(f"  • PubMed Detail: {PROFILE_LIMITS[profile]['pubmed_depth']}")
 
         print(f"\n🔍 **Search System**:")
-        print(f"  • Search Method: Hybrid (Keyword 40% + Semantic 60%)")
+        print(f"  • Search Method: Hybrid ({describe_fusion_en()})")
         print(f"  • Data Sources:")
         print(f"    1. MongoDB - Structured data (text indexing)")
         print(f"    2. Pinecone - Vector database (semantic search)")
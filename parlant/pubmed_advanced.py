@@ -1,37 +1,170 @@
 import httpx
-from typing import List, Dict, Optional
-from bs4 import BeautifulSoup
+from typing import List, Dict, Optional, Union
+from datetime import timedelta
+from itertools import chain, zip_longest
 import asyncio
 from dotenv import load_dotenv
 import os
 
+from pubmed_cache import PubMedCache
+from pubmed_mirror import PubMedMirror
+from pubmed_xml import parse_pubmed_xml
+
 load_dotenv()
 
+# search_papers fetch_depth: ids (esearch만) | summary (esummary JSON) | full (efetch XML - 초록/MeSH/키워드)
+FETCH_DEPTHS = ("ids", "summary", "full")
+
+# summary 레코드 필드 (초록/키워드/MeSH 제외)
+SUMMARY_FIELDS = ("pmid", "title", "authors", "journal", "pub_date", "doi", "source", "url")
+
+
+def trim_paper(paper: Dict, fetch_depth: str) -> Dict:
+    """full 레코드 → 요청 깊이에 맞게 축소 (캐시/미러의 full 레코드를 summary/ids 요청에 재사용)"""
+    if fetch_depth == "ids":
+        return {"pmid": paper["pmid"], "source": "PubMed", "url": paper["url"]}
+    if fetch_depth == "summary":
+        return {field: paper.get(field, "") for field in SUMMARY_FIELDS}
+    return paper
+
+
+class TokenBucket:
+    """비동기 토큰 버킷 - 초당 rate회 요청 허용 (NCBI E-utilities 속도 제한 준수)
+    
+    burst=1이면 요청 시작 간격이 1/rate초로 고르게 유지되어 어느 1초 구간에서도 한도를 넘지 않습니다.
+    대기 중인 요청은 도착 순서대로 토큰을 받습니다.
+    """
+    
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated: Optional[float] = None
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            if self._updated is not None:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._tokens = 1.0
+                self._updated = loop.time()
+            
+            self._tokens -= 1
 
 
 class PubMedAdvancedSearch:
-    """PubMed API 고급 검색 클래스 - efetch 활용"""
+    """PubMed API 고급 검색 클래스 - efetch 활용
+    
+    인스턴스당 keep-alive HTTP 클라이언트 1개를 재사용하고 (요청마다 TCP/TLS 연결 생략),
+    모든 요청은 토큰 버킷으로 NCBI 속도 제한 (API key 없음 3회/초, 있음 10회/초)을 지킵니다.
+    efetch 배치는 속도 제한 안에서 동시에 실행됩니다.
+    cache(PubMedCache)를 지정하면 esearch 결과와 논문 레코드를 디스크에 저장하고,
+    efetch는 캐시에 없는 PMID만 요청합니다.
+    mirror(PubMedMirror)를 지정하면 local-first 모드: 로컬 미러에서 검색하고
+    미러 적재 이후 등록된 최근 논문만 실시간으로 검색합니다.
+    """
     
     BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
     
-    def __init__(self, email: str = "your_email@example.com", api_key: Optional[str] = None):
+    # 한도의 90%로 페이싱 (서버 도착 시각 지터로 1초 구간에 한도+1회가 몰리지 않도록)
+    RATE_SAFETY_FACTOR = 0.9
+    
+    def __init__(
+        self,
+        email: str = "your_email@example.com",
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        requests_per_second: Optional[float] = None,
+        max_connections: int = 10,
+        efetch_batch_size: int = 200,
+        cache: Optional[PubMedCache] = None,
+        mirror: Optional[PubMedMirror] = None
+    ):
         """
         Args:
             email: NCBI 정책상 필수 (API 속도 제한 완화)
-            api_key: 선택 사항 (초당 10회 → 초당 100회)
+            api_key: 선택 사항 (초당 3회 → 초당 10회)
+            base_url: E-utilities 주소 (테스트/벤치마크용 가짜 서버 지정 시)
+            requests_per_second: 속도 제한 직접 지정 (기본값: PUBMED_RATE_LIMIT 또는 API key 유무로 결정)
+            max_connections: keep-alive 연결 풀 크기
+            efetch_batch_size: efetch 1회당 PMID 수 (최대 200 권장)
+            cache: esearch/efetch 영구 캐시 (None이면 캐시 없음)
+            mirror: 로컬 PubMed 미러 (None이면 항상 실시간 검색)
         """
         self.email = email
         self.api_key = api_key
-        self.rate_limit_delay = 0.1 if api_key else 0.34  # API key 유무에 따른 딜레이
+        self.base_url = base_url or self.BASE_URL
+        self.max_connections = max_connections
+        self.efetch_batch_size = efetch_batch_size
+        
+        # API key 유무에 따른 NCBI 한도 (초당 요청 수)
+        self.requests_per_second = (
+            requests_per_second
+            or float(os.getenv("PUBMED_RATE_LIMIT") or 0)
+            or (10.0 if api_key else 3.0)
+        )
+        self.rate_limiter = TokenBucket(self.requests_per_second * self.RATE_SAFETY_FACTOR)
+        
+        self.cache = cache
+        self.mirror = mirror
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """공유 keep-alive 클라이언트 (첫 요청 시 생성)"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(60.0, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+    
+    async def close(self):
+        """HTTP 클라이언트 / 캐시 종료"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+    
+    async def _request(self, endpoint: str, params: Dict, timeout: float) -> httpx.Response:
+        """속도 제한을 지켜 E-utilities 요청 (공통 파라미터 추가)"""
+        params = {**params, "email": self.email}
+        if self.api_key:
+            params["api_key"] = self.api_key
+        
+        await self.rate_limiter.acquire()
+        response = await self._get_client().get(f"{self.base_url}/{endpoint}", params=params, timeout=timeout)
+        response.raise_for_status()
+        return response
     
     async def search_papers(
         self, 
         query: str, 
         max_results: int = 10,
-        sort: str = "relevance"  # relevance, pub_date, Author
+        sort: str = "relevance",  # relevance, pub_date, Author
+        fetch_depth: str = "full"
     ) -> List[Dict]:
         """논문 검색 및 상세 정보 수집
         
+        Args:
+            fetch_depth: 상세 정보 수준 (응답 크기/지연 절감)
+                - full: efetch XML - 초록, MeSH, 키워드 포함 (아래 구조)
+                - summary: esummary JSON - 제목/저자/저널/출판일/DOI만 (SUMMARY_FIELDS)
+                - ids: esearch만 - {"pmid", "source", "url"}
+        
+        Raises:
+            ValueError: 지원하지 않는 fetch_depth
+        
         Returns:
             [
                 {
@@ -49,185 +182,250 @@ class PubMedAdvancedSearch:
                 }
             ]
         """
+        if fetch_depth not in FETCH_DEPTHS:
+            raise ValueError(f"지원하지 않는 fetch_depth: {fetch_depth} ({' | '.join(FETCH_DEPTHS)})")
         
+        # local-first: 미러 결과가 있으면 최근 구간만 실시간 검색
+        if self.mirror is not None:
+            papers = await self._search_local_first(query, max_results, sort, fetch_depth)
+            if papers is not None:
+                return papers
+        
+        return await self._search_live(query, max_results, sort, fetch_depth)
+    
+    async def _search_live(self, query: str, max_results: int, sort: str, fetch_depth: str = "full") -> List[Dict]:
+        """E-utilities 실시간 검색 (esearch → efetch / esummary)"""
         # Step 1: PMIDs 검색
         pmids = await self._search_pmids(query, max_results, sort)
         
         if not pmids:
             return []
         
-        # Step 2: 상세 정보 가져오기
+        # Step 2: 상세 정보 가져오기 (ids는 esearch 결과만)
+        if fetch_depth == "ids":
+            return [trim_paper({"pmid": pmid, "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"}, "ids") for pmid in pmids]
+        if fetch_depth == "summary":
+            return await self._fetch_summaries(pmids)
+        
         papers = await self._fetch_details(pmids)
         
         return papers
     
+    async def _search_local_first(
+        self,
+        query: str,
+        max_results: int,
+        sort: str,
+        fetch_depth: str = "full"
+    ) -> Optional[List[Dict]]:
+        """로컬 미러 검색 + 미러 적재 이후 등록된 논문만 실시간 검색 ([EDAT] 범위 제한)
+        
+        미러가 비었거나, 조회에 실패했거나, 미러에 결과가 없으면 None (전체 실시간 검색으로 대체).
+        relevance 정렬은 두 결과를 번갈아 합치고, pub_date 정렬은 최근 결과를 앞에 둡니다.
+        """
+        try:
+            coverage = await self.mirror.get_coverage_date()
+        except Exception as e:
+            print(f"⚠️ PubMed 미러 조회 오류: {e}")
+            return None
+        
+        if coverage is None:
+            return None
+        
+        # 미러 조회(수 ms)를 먼저 해서 결과가 없으면 최근 구간 요청 없이 바로 전체 실시간 검색
+        try:
+            local = [trim_paper(paper, fetch_depth) for paper in await self.mirror.search(query, max_results, sort)]
+        except Exception as e:
+            print(f"⚠️ PubMed 미러 검색 오류: {e}")
+            return None
+        
+        if not local:
+            return None
+        
+        since = coverage - timedelta(days=self.mirror.overlap_days)
+        recent_query = f'({query}) AND ("{since:%Y/%m/%d}"[EDAT] : "3000"[EDAT])'
+        recent = await self._search_live(recent_query, max_results, sort, fetch_depth)
+        
+        if sort == "pub_date":
+            ordered = chain(recent, local)
+        else:
+            ordered = (paper for pair in zip_longest(recent, local) for paper in pair if paper is not None)
+        
+        # 겹침 구간(overlap_days) 논문은 먼저 나온 것만 유지
+        papers, seen = [], set()
+        for paper in ordered:
+            if paper["pmid"] not in seen:
+                seen.add(paper["pmid"])
+                papers.append(paper)
+        
+        print(f"📚 PubMed 미러: '{query}' → 미러 {len(local)}개 + 최근 {len(recent)}개 (등록일 {since:%Y-%m-%d} 이후)")
+        return papers[:max_results]
+    
     async def _search_pmids(self, query: str, max_results: int, sort: str) -> List[str]:
-        """esearch로 PMID 리스트 가져오기"""
+        """esearch로 PMID 리스트 가져오기 (캐시 우선)"""
+        if self.cache is not None:
+            pmids = await asyncio.to_thread(self.cache.get_search, query, sort, max_results)
+            if pmids is not None:
+                print(f"💾 PubMed 검색 캐시: '{query}' → {len(pmids)}개")
+                return pmids
         
         params = {
             "db": "pubmed",
             "term": query,
             "retmax": max_results,
             "retmode": "json",
-            "sort": sort,
-            "email": self.email
+            "sort": sort
         }
         
-        if self.api_key:
-            params["api_key"] = self.api_key
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(f"{self.BASE_URL}/esearch.fcgi", params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                pmids = data.get("esearchresult", {}).get("idlist", [])
-                print(f"✅ PubMed 검색: '{query}' → {len(pmids)}개 발견")
-                
-                return pmids
+        try:
+            response = await self._request("esearch.fcgi", params, timeout=30.0)
+            data = response.json()
+            
+            pmids = data.get("esearchresult", {}).get("idlist", [])
+            print(f"✅ PubMed 검색: '{query}' → {len(pmids)}개 발견")
+            
+            # 오류 응답은 예외로 빠지므로 성공한 결과만 저장 (결과 없음 포함)
+            if self.cache is not None:
+                await asyncio.to_thread(self.cache.put_search, query, sort, max_results, pmids)
             
-            except Exception as e:
-                print(f"⚠️ PubMed 검색 오류: {e}")
-                return []
+            return pmids
+        
+        except Exception as e:
+            print(f"⚠️ PubMed 검색 오류: {e}")
+            return []
     
     async def _fetch_details(self, pmids: List[str]) -> List[Dict]:
-        """efetch로 상세 정보 가져오기 (XML 파싱)"""
+        """efetch로 상세 정보 가져오기 (XML 파싱)
         
-        # 배치 크기 제한 (한 번에 200개까지)
-        batch_size = 200
-        all_papers = []
+        캐시에 있는 PMID는 제외하고, 나머지 배치(최대 efetch_batch_size개)는 속도 제한 안에서
+        동시에 요청합니다. 결과는 PMID 순서(검색 순위)대로 합칩니다.
+        """
+        cached = {}
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get_articles, pmids)
+        missing = [pmid for pmid in pmids if pmid not in cached]
         
-        for i in range(0, len(pmids), batch_size):
-            batch = pmids[i:i+batch_size]
+        batches = [
+            missing[i:i + self.efetch_batch_size]
+            for i in range(0, len(missing), self.efetch_batch_size)
+        ]
+        
+        results = await asyncio.gather(*(
+            self._fetch_batch(batch, batch_no)
+            for batch_no, batch in enumerate(batches, 1)
+        ))
+        fetched = [paper for papers in results for paper in papers]
+        
+        if self.cache is not None and fetched:
+            await asyncio.to_thread(self.cache.put_articles, fetched)
+        
+        papers_by_pmid = {**{paper["pmid"]: paper for paper in fetched}, **cached}
+        all_papers = [papers_by_pmid[pmid] for pmid in pmids if pmid in papers_by_pmid]
+        
+        print(f"✅ 상세 정보 수집 완료: {len(all_papers)}개 (캐시 {len(cached)}개, efetch {len(fetched)}개)")
+        return all_papers
+    
+    async def _fetch_batch(self, batch: List[str], batch_no: int) -> List[Dict]:
+        """efetch 배치 1개 (오류 시 빈 결과)"""
+        params = {
+            "db": "pubmed",
+            "id": ",".join(batch),
+            "retmode": "xml",
+            "rettype": "abstract"
+        }
+        
+        try:
+            response = await self._request("efetch.fcgi", params, timeout=60.0)
             
-            params = {
-                "db": "pubmed",
-                "id": ",".join(batch),
-                "retmode": "xml",
-                "rettype": "abstract",
-                "email": self.email
+            # XML 파싱
+            return self._parse_xml(response.content)
+        
+        except Exception as e:
+            print(f"⚠️ efetch 오류 (batch {batch_no}): {e}")
+            return []
+    
+    def _parse_xml(self, xml: Union[bytes, str]) -> List[Dict]:
+        """XML 응답 파싱 (lxml iterparse 스트리밍 - pubmed_xml.py)"""
+        return parse_pubmed_xml(xml)
+    
+    async def _fetch_summaries(self, pmids: List[str]) -> List[Dict]:
+        """esummary JSON으로 요약 정보 가져오기 (efetch XML보다 응답이 훨씬 작음)
+        
+        캐시에 full 레코드가 있으면 축소해서 사용하고, 요약 레코드는 캐시에 저장하지 않습니다
+        (full 요청이 초록 없는 레코드를 받지 않도록).
+        """
+        cached = {}
+        if self.cache is not None:
+            cached = {
+                pmid: trim_paper(paper, "summary")
+                for pmid, paper in (await asyncio.to_thread(self.cache.get_articles, pmids)).items()
             }
-            
-            if self.api_key:
-                params["api_key"] = self.api_key
-            
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                try:
-                    response = await client.get(f"{self.BASE_URL}/efetch.fcgi", params=params)
-                    response.raise_for_status()
-                    
-                    # XML 파싱
-                    papers = self._parse_xml(response.text)
-                    all_papers.extend(papers)
-                    
-                    # Rate limit 준수
-                    await asyncio.sleep(self.rate_limit_delay)
-                
-                except Exception as e:
-                    print(f"⚠️ efetch 오류 (batch {i//batch_size + 1}): {e}")
-        
-        print(f"✅ 상세 정보 수집 완료: {len(all_papers)}개")
+        missing = [pmid for pmid in pmids if pmid not in cached]
+        
+        batches = [
+            missing[i:i + self.efetch_batch_size]
+            for i in range(0, len(missing), self.efetch_batch_size)
+        ]
+        
+        results = await asyncio.gather(*(
+            self._fetch_summary_batch(batch, batch_no)
+            for batch_no, batch in enumerate(batches, 1)
+        ))
+        fetched = [paper for papers in results for paper in papers]
+        
+        papers_by_pmid = {**{paper["pmid"]: paper for paper in fetched}, **cached}
+        all_papers = [papers_by_pmid[pmid] for pmid in pmids if pmid in papers_by_pmid]
+        
+        print(f"✅ 요약 정보 수집 완료: {len(all_papers)}개 (캐시 {len(cached)}개, esummary {len(fetched)}개)")
         return all_papers
     
-    def _parse_xml(self, xml_text: str) -> List[Dict]:
-        """XML 응답 파싱"""
-        soup = BeautifulSoup(xml_text, "xml")
+    async def _fetch_summary_batch(self, batch: List[str], batch_no: int) -> List[Dict]:
+        """esummary 배치 1개 (오류 시 빈 결과)"""
+        params = {
+            "db": "pubmed",
+            "id": ",".join(batch),
+            "retmode": "json"
+        }
+        
+        try:
+            response = await self._request("esummary.fcgi", params, timeout=30.0)
+            return self._parse_summary(response.json())
+        
+        except Exception as e:
+            print(f"⚠️ esummary 오류 (batch {batch_no}): {e}")
+            return []
+    
+    def _parse_summary(self, data: Dict) -> List[Dict]:
+        """esummary JSON → 요약 레코드 (SUMMARY_FIELDS, 저자는 "Kim M" 형식)"""
+        result = data.get("result", {})
         papers = []
         
-        for article in soup.find_all("PubmedArticle"):
-            try:
-                # 기본 정보
-                pmid = article.find("PMID").text if article.find("PMID") else ""
-                
-                # 제목
-                title_elem = article.find("ArticleTitle")
-                title = title_elem.text if title_elem else ""
-                
-                # 초록
-                abstract_texts = article.find_all("AbstractText")
-                abstract = " ".join([a.text for a in abstract_texts]) if abstract_texts else ""
-                
-                # 저자
-                authors = []
-                author_list = article.find("AuthorList")
-                if author_list:
-                    for author in author_list.find_all("Author"):
-                        last_name = author.find("LastName")
-                        fore_name = author.find("ForeName")
-                        if last_name and fore_name:
-                            authors.append(f"{last_name.text} {fore_name.text}")
-                
-                # 저널
-                journal_elem = article.find("Journal")
-                journal = ""
-                if journal_elem:
-                    journal_title = journal_elem.find("Title")
-                    journal = journal_title.text if journal_title else ""
-                
-                # 출판일
-                pub_date_elem = article.find("PubDate")
-                pub_date = ""
-                if pub_date_elem:
-                    year = pub_date_elem.find("Year")
-                    month = pub_date_elem.find("Month")
-                    day = pub_date_elem.find("Day")
-                    
-                    year_str = year.text if year else "0000"
-                    month_str = month.text if month else "01"
-                    day_str = day.text if day else "01"
-                    
-                    # 월 이름 → 숫자 변환
-                    month_map = {
-                        "Jan": "01", "Feb": "02", "Mar": "03", "Apr": "04",
-                        "May": "05", "Jun": "06", "Jul": "07", "Aug": "08",
-                        "Sep": "09", "Oct": "10", "Nov": "11", "Dec": "12"
-                    }
-                    month_str = month_map.get(month_str, month_str)
-                    
-                    pub_date = f"{year_str}-{month_str}-{day_str}"
-                
-                # DOI
-                doi = ""
-                article_ids = article.find_all("ArticleId")
-                for aid in article_ids:
-                    if aid.get("IdType") == "doi":
-                        doi = aid.text
-                        break
-                
-                # MeSH 용어 (키워드)
-                mesh_terms = []
-                mesh_list = article.find("MeshHeadingList")
-                if mesh_list:
-                    for mesh in mesh_list.find_all("DescriptorName"):
-                        mesh_terms.append(mesh.text)
-                
-                # 키워드
-                keywords = []
-                keyword_list = article.find("KeywordList")
-                if keyword_list:
-                    for kw in keyword_list.find_all("Keyword"):
-                        keywords.append(kw.text)
-                
-                paper = {
-                    "pmid": pmid,
-                    "title": title,
-                    "abstract": abstract,
-                    "authors": authors,
-                    "journal": journal,
-                    "pub_date": pub_date,
-                    "doi": doi,
-                    "keywords": keywords,
-                    "mesh_terms": mesh_terms,
-                    "source": "PubMed",
-                    "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
-                }
-                
-                papers.append(paper)
-            
-            except Exception as e:
-                print(f"⚠️ 논문 파싱 오류: {e}")
+        for uid in result.get("uids", []):
+            item = result.get(uid) or {}
+            if "error" in item:
                 continue
+            
+            doi = next(
+                (article_id.get("value", "") for article_id in item.get("articleids", []) if article_id.get("idtype") == "doi"),
+                ""
+            )
+            
+            # sortpubdate: "2024/03/05 00:00" → "2024-03-05"
+            pub_date = item.get("sortpubdate", "")[:10].replace("/", "-")
+            
+            papers.append({
+                "pmid": uid,
+                "title": item.get("title", ""),
+                "authors": [
+                    author.get("name", "") for author in item.get("authors", [])
+                    if author.get("authtype", "Author") == "Author"
+                ],
+                "journal": item.get("fulljournalname") or item.get("source", ""),
+                "pub_date": pub_date,
+                "doi": doi,
+                "source": "PubMed",
+                "url": f"https://pubmed.ncbi.nlm.nih.gov/{uid}/"
+            })
         
         return papers
 
@@ -258,6 +456,8 @@ async def test_pubmed_search():
         print(f"초록: {paper['abstract'][:200]}...")
         print(f"MeSH 용어: {', '.join(paper['mesh_terms'][:5])}")
         print(f"URL: {paper['url']}")
+    
+    await searcher.close()
 
 
 if __name__ == "__main__":
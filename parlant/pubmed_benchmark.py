@@ -0,0 +1,450 @@
+"""
+PubMedAdvancedSearch HTTP 계층 벤치마크 (로컬 가짜 E-utilities 서버)
+- 기존 방식: 요청마다 새 httpx.AsyncClient + efetch 배치 순차 실행 + 고정 sleep
+- 현재 방식: 공유 keep-alive 클라이언트 + 토큰 버킷 속도 제한 + efetch 배치 동시 실행
+- 서버는 요청마다 지연(기본 150ms)을 주고 새 연결 수 / 1초 구간 최대 요청 수를 기록
+
+- --parse: 기존 BeautifulSoup 파서 vs lxml iterparse 스트리밍 파서 처리량/메모리 비교
+          (fixtures/pubmed/*.xml 고정 샘플로 결과 동일성도 확인)
+- --depth: search_papers fetch_depth별 (ids / summary / full) 지연, 요청 수, 응답 크기 비교
+
+사용법:
+    python pubmed_benchmark.py                       # 3회/초 (API key 없음) 기준
+    python pubmed_benchmark.py --rate 10 --results 200 1000 2000
+    python pubmed_benchmark.py --parse --batch-size 200
+    python pubmed_benchmark.py --depth --results 5 10 50
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+
+from pubmed_advanced import FETCH_DEPTHS, PubMedAdvancedSearch
+from pubmed_xml import parse_pubmed_xml
+
+
+# ==================== 가짜 E-utilities 서버 ====================
+
+def make_article_xml(pmid: str) -> str:
+    return f"""<PubmedArticle><MedlineCitation><PMID>{pmid}</PMID><Article>
+<Journal><Title>Kidney International</Title><JournalIssue><PubDate><Year>2024</Year><Month>Mar</Month><Day>05</Day></PubDate></JournalIssue></Journal>
+<ArticleTitle>Chronic kidney disease study {pmid}</ArticleTitle>
+<Abstract><AbstractText Label="BACKGROUND">Dietary potassium restriction in CKD patients.</AbstractText><AbstractText Label="RESULTS">Serum potassium decreased.</AbstractText></Abstract>
+<AuthorList><Author><LastName>Kim</LastName><ForeName>Minji</ForeName></Author><Author><LastName>Lee</LastName><ForeName>Junho</ForeName></Author></AuthorList>
+</Article><MeshHeadingList><MeshHeading><DescriptorName>Renal Insufficiency, Chronic</DescriptorName></MeshHeading></MeshHeadingList>
+<KeywordList><Keyword>CKD</Keyword><Keyword>potassium</Keyword></KeywordList></MedlineCitation>
+<PubmedData><ArticleIdList><ArticleId IdType="pubmed">{pmid}</ArticleId><ArticleId IdType="doi">10.1000/ckd.{pmid}</ArticleId></ArticleIdList></PubmedData></PubmedArticle>"""
+
+
+def make_summary(pmid: str) -> Dict:
+    """make_article_xml과 같은 논문의 esummary JSON 항목"""
+    return {
+        "uid": pmid,
+        "pubdate": "2024 Mar 5",
+        "source": "Kidney Int",
+        "authors": [
+            {"name": "Kim M", "authtype": "Author", "clusterid": ""},
+            {"name": "Lee J", "authtype": "Author", "clusterid": ""},
+        ],
+        "title": f"Chronic kidney disease study {pmid}",
+        "articleids": [
+            {"idtype": "pubmed", "idtypen": 1, "value": pmid},
+            {"idtype": "doi", "idtypen": 3, "value": f"10.1000/ckd.{pmid}"},
+        ],
+        "fulljournalname": "Kidney International",
+        "sortpubdate": "2024/03/05 00:00",
+    }
+
+
+class FakeEUtilsHandler(BaseHTTPRequestHandler):
+    """esearch.fcgi / esummary.fcgi (JSON), efetch.fcgi (XML) 응답, 연결/요청 시각/응답 크기 기록"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive 허용
+    latency = 0.15
+    stats: Dict = {"connections": 0, "requests": [], "bytes": 0}
+    stats_lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with self.stats_lock:
+            self.stats["connections"] += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        with self.stats_lock:
+            self.stats["requests"].append(time.monotonic())
+
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        time.sleep(self.latency)
+
+        if url.path.endswith("esearch.fcgi"):
+            retmax = int(params.get("retmax", ["10"])[0])
+            body = json.dumps({"esearchresult": {"idlist": [str(30_000_000 + i) for i in range(retmax)]}})
+            content_type = "application/json"
+        elif url.path.endswith("esummary.fcgi"):
+            pmids = params.get("id", [""])[0].split(",")
+            result = {"uids": pmids, **{pmid: make_summary(pmid) for pmid in pmids}}
+            body = json.dumps({"header": {"type": "esummary", "version": "0.3"}, "result": result})
+            content_type = "application/json"
+        elif url.path.endswith("efetch.fcgi"):
+            pmids = params.get("id", [""])[0].split(",")
+            body = "<PubmedArticleSet>" + "".join(make_article_xml(pmid) for pmid in pmids) + "</PubmedArticleSet>"
+            content_type = "text/xml"
+        else:
+            self.send_error(404)
+            return
+
+        payload = body.encode("utf-8")
+        with self.stats_lock:
+            self.stats["bytes"] += len(payload)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def start_fake_server(latency: float) -> ThreadingHTTPServer:
+    FakeEUtilsHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeEUtilsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def reset_stats():
+    with FakeEUtilsHandler.stats_lock:
+        FakeEUtilsHandler.stats = {"connections": 0, "requests": [], "bytes": 0}
+
+
+def peak_requests_per_second(timestamps: List[float]) -> int:
+    """어느 1초 구간 [t, t+1)에서든 시작된 최대 요청 수"""
+    timestamps = sorted(timestamps)
+    peak, start = 0, 0
+    for end, timestamp in enumerate(timestamps):
+        while timestamp - timestamps[start] >= 1.0:
+            start += 1
+        peak = max(peak, end - start + 1)
+    return peak
+
+
+# ==================== 기존 방식 (비교 기준) ====================
+
+async def legacy_search(searcher: PubMedAdvancedSearch, query: str, max_results: int) -> List[Dict]:
+    """기존 구현: 요청마다 새 클라이언트, efetch 배치 순차 + 고정 sleep"""
+    rate_limit_delay = 0.1 if searcher.api_key else 0.34
+    base_params = {"email": searcher.email}
+
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        response = await client.get(
+            f"{searcher.base_url}/esearch.fcgi",
+            params={**base_params, "db": "pubmed", "term": query, "retmax": max_results, "retmode": "json"}
+        )
+        pmids = response.json()["esearchresult"]["idlist"]
+
+    papers = []
+    for i in range(0, len(pmids), 200):
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            response = await client.get(
+                f"{searcher.base_url}/efetch.fcgi",
+                params={**base_params, "db": "pubmed", "id": ",".join(pmids[i:i + 200]), "retmode": "xml"}
+            )
+            papers.extend(searcher._parse_xml(response.text))
+            await asyncio.sleep(rate_limit_delay)
+
+    return papers
+
+
+# ==================== XML 파싱 (기존 BeautifulSoup vs lxml iterparse) ====================
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "pubmed"
+
+
+def legacy_parse_xml(xml_text: str) -> List[Dict]:
+    """기존 구현: BeautifulSoup 전체 트리 + find/find_all (비교 기준)"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(xml_text, "xml")
+    papers = []
+
+    for article in soup.find_all("PubmedArticle"):
+        try:
+            # 기본 정보
+            pmid = article.find("PMID").text if article.find("PMID") else ""
+
+            # 제목
+            title_elem = article.find("ArticleTitle")
+            title = title_elem.text if title_elem else ""
+
+            # 초록
+            abstract_texts = article.find_all("AbstractText")
+            abstract = " ".join([a.text for a in abstract_texts]) if abstract_texts else ""
+
+            # 저자
+            authors = []
+            author_list = article.find("AuthorList")
+            if author_list:
+                for author in author_list.find_all("Author"):
+                    last_name = author.find("LastName")
+                    fore_name = author.find("ForeName")
+                    if last_name and fore_name:
+                        authors.append(f"{last_name.text} {fore_name.text}")
+
+            # 저널
+            journal_elem = article.find("Journal")
+            journal = ""
+            if journal_elem:
+                journal_title = journal_elem.find("Title")
+                journal = journal_title.text if journal_title else ""
+
+            # 출판일
+            pub_date_elem = article.find("PubDate")
+            pub_date = ""
+            if pub_date_elem:
+                year = pub_date_elem.find("Year")
+                month = pub_date_elem.find("Month")
+                day = pub_date_elem.find("Day")
+
+                year_str = year.text if year else "0000"
+                month_str = month.text if month else "01"
+                day_str = day.text if day else "01"
+
+                # 월 이름 → 숫자 변환
+                month_map = {
+                    "Jan": "01", "Feb": "02", "Mar": "03", "Apr": "04",
+                    "May": "05", "Jun": "06", "Jul": "07", "Aug": "08",
+                    "Sep": "09", "Oct": "10", "Nov": "11", "Dec": "12"
+                }
+                month_str = month_map.get(month_str, month_str)
+
+                pub_date = f"{year_str}-{month_str}-{day_str}"
+
+            # DOI
+            doi = ""
+            article_ids = article.find_all("ArticleId")
+            for aid in article_ids:
+                if aid.get("IdType") == "doi":
+                    doi = aid.text
+                    break
+
+            # MeSH 용어 (키워드)
+            mesh_terms = []
+            mesh_list = article.find("MeshHeadingList")
+            if mesh_list:
+                for mesh in mesh_list.find_all("DescriptorName"):
+                    mesh_terms.append(mesh.text)
+
+            # 키워드
+            keywords = []
+            keyword_list = article.find("KeywordList")
+            if keyword_list:
+                for kw in keyword_list.find_all("Keyword"):
+                    keywords.append(kw.text)
+
+            paper = {
+                "pmid": pmid,
+                "title": title,
+                "abstract": abstract,
+                "authors": authors,
+                "journal": journal,
+                "pub_date": pub_date,
+                "doi": doi,
+                "keywords": keywords,
+                "mesh_terms": mesh_terms,
+                "source": "PubMed",
+                "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
+            }
+
+            papers.append(paper)
+
+        except Exception as e:
+            print(f"⚠️ 논문 파싱 오류: {e}")
+            continue
+
+    return papers
+
+
+def check_fixtures() -> List[Dict]:
+    """고정 샘플 XML: 스트리밍 파서 결과 == 기록된 기대 결과 == 기존 파서 결과"""
+    rows = []
+    for xml_path in sorted(FIXTURE_DIR.glob("*.xml")):
+        xml = xml_path.read_bytes()
+        expected = json.loads(xml_path.with_suffix(".expected.json").read_text(encoding="utf-8"))
+        papers = parse_pubmed_xml(xml)
+        rows.append({
+            "fixture": xml_path.name,
+            "articles": len(papers),
+            "matches_expected": papers == expected,
+            "matches_legacy": papers == legacy_parse_xml(xml.decode("utf-8")),
+        })
+    return rows
+
+
+def benchmark_parse(batch_size: int = 200, repeat: int = 5) -> Dict:
+    """고정 샘플 논문을 복제한 batch_size개 efetch 응답 파싱 처리량 (논문/초)"""
+    import tracemalloc
+    from lxml import etree
+
+    articles = []
+    for xml_path in sorted(FIXTURE_DIR.glob("*.xml")):
+        root = etree.fromstring(xml_path.read_bytes(), parser=etree.XMLParser(load_dtd=False, no_network=True))
+        articles += [etree.tostring(article, encoding="unicode") for article in root.iter("PubmedArticle")]
+
+    body = "".join(articles[i % len(articles)] for i in range(batch_size))
+    xml_text = f'<?xml version="1.0" ?>\n<PubmedArticleSet>{body}</PubmedArticleSet>'
+    xml_bytes = xml_text.encode("utf-8")
+
+    result = {"batch_size": batch_size, "xml_kb": len(xml_bytes) / 1024}
+    for name, parse, payload in (("bs4", legacy_parse_xml, xml_text), ("iterparse", parse_pubmed_xml, xml_bytes)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            parse(payload)
+        result[f"{name}_articles_per_second"] = batch_size * repeat / (time.perf_counter() - start)
+
+        tracemalloc.start()
+        parse(payload)
+        result[f"{name}_peak_mb"] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+
+    return result
+
+
+# ==================== 벤치마크 ====================
+
+async def run_benchmark(result_sizes: List[int], rate: float, latency: float, queries: int) -> List[Dict]:
+    server = start_fake_server(latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    rows = []
+
+    try:
+        for max_results in result_sizes:
+            for mode in ("legacy", "pooled"):
+                searcher = PubMedAdvancedSearch(
+                    email="bench@example.com",
+                    api_key="bench" if rate >= 10 else None,
+                    base_url=base_url,
+                    requests_per_second=rate
+                )
+                reset_stats()
+
+                start = time.perf_counter()
+                for query_no in range(queries):
+                    if mode == "legacy":
+                        papers = await legacy_search(searcher, f"ckd {query_no}", max_results)
+                    else:
+                        papers = await searcher.search_papers(f"ckd {query_no}", max_results)
+                elapsed = time.perf_counter() - start
+
+                await searcher.close()
+                stats = FakeEUtilsHandler.stats
+                rows.append({
+                    "results": max_results,
+                    "mode": mode,
+                    "seconds_per_query": elapsed / queries,
+                    "papers": len(papers),
+                    "requests": len(stats["requests"]),
+                    "connections": stats["connections"],
+                    "peak_rps": peak_requests_per_second(stats["requests"]),
+                })
+    finally:
+        server.shutdown()
+
+    return rows
+
+
+async def run_depth_benchmark(result_sizes: List[int], rate: float, latency: float, queries: int) -> List[Dict]:
+    """fetch_depth별 검색 1회 비용 (프로필별 PubMed 상세 정보 수준 - healthcare_v2.PROFILE_LIMITS)"""
+    server = start_fake_server(latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    rows = []
+
+    try:
+        for max_results in result_sizes:
+            for depth in FETCH_DEPTHS:
+                searcher = PubMedAdvancedSearch(
+                    email="bench@example.com",
+                    api_key="bench" if rate >= 10 else None,
+                    base_url=base_url,
+                    requests_per_second=rate
+                )
+                reset_stats()
+
+                start = time.perf_counter()
+                for query_no in range(queries):
+                    papers = await searcher.search_papers(f"ckd {query_no}", max_results, fetch_depth=depth)
+                elapsed = time.perf_counter() - start
+
+                await searcher.close()
+                stats = FakeEUtilsHandler.stats
+                rows.append({
+                    "results": max_results,
+                    "depth": depth,
+                    "seconds_per_query": elapsed / queries,
+                    "papers": len(papers),
+                    "requests": len(stats["requests"]),
+                    "response_kb": stats["bytes"] / queries / 1024,
+                    "result_kb": len(json.dumps(papers, ensure_ascii=False).encode("utf-8")) / 1024,
+                })
+    finally:
+        server.shutdown()
+
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PubMed HTTP 계층 벤치마크 (가짜 E-utilities 서버)")
+    parser.add_argument("--results", type=int, nargs="+", default=[10, 200, 1000])
+    parser.add_argument("--rate", type=float, default=3.0, help="초당 요청 한도 (3: API key 없음, 10: 있음)")
+    parser.add_argument("--latency", type=float, default=0.15, help="서버 응답 지연 (초)")
+    parser.add_argument("--queries", type=int, default=3, help="결과 수별 연속 검색 횟수")
+    parser.add_argument("--parse", action="store_true", help="HTTP 대신 XML 파싱 처리량 비교 (bs4 vs iterparse)")
+    parser.add_argument("--batch-size", type=int, default=200, help="--parse: efetch 1회당 논문 수")
+    parser.add_argument("--depth", action="store_true", help="fetch_depth별 비교 (ids / summary / full)")
+    args = parser.parse_args()
+
+    if args.depth:
+        print(f"\n🧪 PubMed fetch_depth 벤치마크: 한도 {args.rate:g}회/초, 서버 지연 {args.latency * 1000:.0f}ms, 쿼리 {args.queries}회")
+        print(f"{'결과 수':>8} {'깊이':<9}{'초/쿼리':>9}{'논문':>7}{'요청':>6}{'응답 KB/쿼리':>13}{'결과 KB':>9}")
+
+        rows = asyncio.run(run_depth_benchmark(args.results, args.rate, args.latency, args.queries))
+        for row in rows:
+            print(
+                f"{row['results']:>8} {row['depth']:<9}{row['seconds_per_query']:>9.2f}{row['papers']:>7}"
+                f"{row['requests']:>6}{row['response_kb']:>13.1f}{row['result_kb']:>9.1f}"
+            )
+        raise SystemExit
+
+    if args.parse:
+        print("\n🧪 PubMed XML 파싱: 고정 샘플 검증")
+        for row in check_fixtures():
+            print(
+                f"  {row['fixture']}: 논문 {row['articles']}개, 기대 결과 {'✅' if row['matches_expected'] else '❌'}, "
+                f"기존 파서 {'✅' if row['matches_legacy'] else '❌'}"
+            )
+
+        stats = benchmark_parse(args.batch_size)
+        print(f"\n⚡ 파싱 처리량: 배치 {stats['batch_size']}개 ({stats['xml_kb']:.0f} KB)")
+        for name in ("bs4", "iterparse"):
+            print(f"  {name:<10}{stats[f'{name}_articles_per_second']:>10,.0f} 논문/초   최대 Python 힙 {stats[f'{name}_peak_mb']:.1f} MB")
+        raise SystemExit
+
+    print(f"\n🧪 PubMed HTTP 벤치마크: 한도 {args.rate:g}회/초, 서버 지연 {args.latency * 1000:.0f}ms, 쿼리 {args.queries}회")
+    print(f"{'결과 수':>8} {'방식':<8}{'초/쿼리':>9}{'논문':>7}{'요청':>6}{'연결':>6}{'최대 rps':>9}")
+
+    rows = asyncio.run(run_benchmark(args.results, args.rate, args.latency, args.queries))
+    for row in rows:
+        print(
+            f"{row['results']:>8} {row['mode']:<8}{row['seconds_per_query']:>9.2f}{row['papers']:>7}"
+            f"{row['requests']:>6}{row['connections']:>6}{row['peak_rps']:>9}"
+        )
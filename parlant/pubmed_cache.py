@@ -0,0 +1,268 @@
+"""
+PubMed E-utilities 영구 캐시 (SQLite)
+- 챗봇 재시작/여러 워커 간에 같은 쿼리와 PMID로 E-utilities를 반복 호출하지 않도록 디스크에 저장
+- esearch: (정규화 쿼리, 정렬) → PMID 목록, 짧은 TTL (새 논문 반영)
+- efetch: PMID → 파싱된 논문 레코드, 긴 TTL (논문 메타데이터는 거의 바뀌지 않음)
+- 크기 제한 (마지막 조회 시각 기준 LRU 제거) + 적중률 통계
+- WAL 모드: 여러 워커 프로세스가 같은 파일을 동시에 읽고 씀
+
+사용법:
+    python pubmed_cache.py                 # 캐시 통계
+    python pubmed_cache.py --purge         # 만료 항목 삭제 + VACUUM
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+# 기본 저장 위치 (parlant/data/pubmed_cache.sqlite3)
+DEFAULT_CACHE_PATH = Path(__file__).parent / "data" / "pubmed_cache.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS searches (
+    key TEXT PRIMARY KEY,
+    retmax INTEGER NOT NULL,
+    pmids TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS articles (
+    pmid TEXT PRIMARY KEY,
+    record TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS searches_accessed_at ON searches (accessed_at);
+CREATE INDEX IF NOT EXISTS articles_accessed_at ON articles (accessed_at);
+"""
+
+
+def search_key(query: str, sort: str) -> str:
+    """esearch 캐시 키 (대소문자/공백 차이 무시)"""
+    return f"{sort}:{' '.join(query.lower().split())}"
+
+
+class PubMedCache:
+    """esearch / efetch 결과 SQLite 캐시
+
+    메서드는 동기 함수입니다 (로컬 조회는 1ms 미만).
+    비동기 코드에서는 asyncio.to_thread로 호출하세요.
+
+    사용 예:
+        cache = PubMedCache("data/pubmed_cache.sqlite3")
+        pmids = cache.get_search(query, "relevance", 10)
+        records = cache.get_articles(pmids)   # {pmid: record} - 캐시에 있는 것만
+    """
+
+    def __init__(
+        self,
+        path=DEFAULT_CACHE_PATH,
+        search_ttl: float = 300,
+        article_ttl: float = 30 * 86400,
+        max_searches: int = 20_000,
+        max_articles: int = 200_000
+    ):
+        """
+        Args:
+            path: SQLite 파일 경로
+            search_ttl: esearch 결과 유효 시간 (초)
+            article_ttl: 논문 레코드 유효 시간 (초)
+            max_searches: 최대 esearch 항목 수 (초과 시 오래 조회되지 않은 항목부터 제거)
+            max_articles: 최대 논문 레코드 수
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.search_ttl = search_ttl
+        self.article_ttl = article_ttl
+        self.max_searches = max_searches
+        self.max_articles = max_articles
+
+        # to_thread 실행 스레드가 바뀌어도 연결 1개를 공유 (직렬화는 lock)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5.0)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+        self.stats = {
+            "search_hits": 0,
+            "search_misses": 0,
+            "article_hits": 0,
+            "article_misses": 0,
+            "evictions": 0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ==================== esearch ====================
+
+    def get_search(self, query: str, sort: str, max_results: int) -> Optional[List[str]]:
+        """캐시된 PMID 목록 (더 큰 retmax로 저장된 결과도 앞부분을 잘라 재사용)"""
+        key = search_key(query, sort)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT retmax, pmids, stored_at FROM searches WHERE key = ?", (key,)
+            ).fetchone()
+
+            # 저장된 목록이 retmax보다 짧으면 전체 결과이므로 더 큰 요청에도 사용 가능
+            if row is not None and now - row[2] <= self.search_ttl:
+                pmids = json.loads(row[1])
+                if row[0] >= max_results or len(pmids) < row[0]:
+                    self._conn.execute("UPDATE searches SET accessed_at = ? WHERE key = ?", (now, key))
+                    self._conn.commit()
+                    self.stats["search_hits"] += 1
+                    return pmids[:max_results]
+
+        self.stats["search_misses"] += 1
+        return None
+
+    def put_search(self, query: str, sort: str, max_results: int, pmids: List[str]):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO searches (key, retmax, pmids, stored_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (search_key(query, sort), max_results, json.dumps(pmids), now, now)
+            )
+            self._evict("searches", "key", self.max_searches)
+            self._conn.commit()
+
+    # ==================== efetch ====================
+
+    def get_articles(self, pmids: Iterable[str]) -> Dict[str, Dict]:
+        """캐시에 있는 (만료되지 않은) 논문 레코드 {pmid: record}"""
+        pmids = list(dict.fromkeys(pmids))
+        if not pmids:
+            return {}
+
+        now = time.time()
+        found = {}
+
+        with self._lock:
+            # SQLite 변수 개수 제한을 넘지 않도록 나눠서 조회
+            for i in range(0, len(pmids), 500):
+                chunk = pmids[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for pmid, record in self._conn.execute(
+                    f"SELECT pmid, record FROM articles WHERE pmid IN ({placeholders}) AND stored_at >= ?",
+                    (*chunk, now - self.article_ttl)
+                ):
+                    found[pmid] = json.loads(record)
+
+            if found:
+                self._conn.executemany(
+                    "UPDATE articles SET accessed_at = ? WHERE pmid = ?",
+                    [(now, pmid) for pmid in found]
+                )
+                self._conn.commit()
+
+        self.stats["article_hits"] += len(found)
+        self.stats["article_misses"] += len(pmids) - len(found)
+        return found
+
+    def put_articles(self, records: List[Dict]):
+        records = [record for record in records if record.get("pmid")]
+        if not records:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO articles (pmid, record, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [(record["pmid"], json.dumps(record, ensure_ascii=False), now, now) for record in records]
+            )
+            self._evict("articles", "pmid", self.max_articles)
+            self._conn.commit()
+
+    # ==================== 관리 ====================
+
+    def _evict(self, table: str, key_column: str, max_rows: int):
+        """최대 크기 초과분을 마지막 조회 시각이 오래된 순으로 삭제 (lock 안에서 호출)"""
+        count = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        overflow = count - max_rows
+        if overflow > 0:
+            self._conn.execute(
+                f"DELETE FROM {table} WHERE {key_column} IN "
+                f"(SELECT {key_column} FROM {table} ORDER BY accessed_at LIMIT ?)",
+                (overflow,)
+            )
+            self.stats["evictions"] += overflow
+
+    def purge_expired(self) -> Dict[str, int]:
+        """만료 항목 삭제 후 파일 정리"""
+        now = time.time()
+        with self._lock:
+            searches = self._conn.execute(
+                "DELETE FROM searches WHERE stored_at < ?", (now - self.search_ttl,)
+            ).rowcount
+            articles = self._conn.execute(
+                "DELETE FROM articles WHERE stored_at < ?", (now - self.article_ttl,)
+            ).rowcount
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+        return {"searches": searches, "articles": articles}
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            searches = self._conn.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+            articles = self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+        search_total = self.stats["search_hits"] + self.stats["search_misses"]
+        article_total = self.stats["article_hits"] + self.stats["article_misses"]
+        return {
+            **self.stats,
+            "searches": searches,
+            "articles": articles,
+            "search_hit_rate": self.stats["search_hits"] / search_total if search_total else 0.0,
+            "article_hit_rate": self.stats["article_hits"] / article_total if article_total else 0.0,
+            "disk_mb": sum(
+                path.stat().st_size for path in self.path.parent.glob(self.path.name + "*")
+            ) / 1024 / 1024,
+        }
+
+
+def create_pubmed_cache(
+    path: Optional[str] = None,
+    search_ttl: float = 300,
+    article_ttl: float = 30 * 86400,
+    max_searches: int = 20_000,
+    max_articles: int = 200_000
+) -> Optional[PubMedCache]:
+    """설정값으로 PubMed 캐시 생성 (path="none"이면 None)"""
+    if path is not None and path.lower() == "none":
+        return None
+
+    return PubMedCache(
+        path or DEFAULT_CACHE_PATH,
+        search_ttl=search_ttl,
+        article_ttl=article_ttl,
+        max_searches=max_searches,
+        max_articles=max_articles
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="PubMed 영구 캐시 통계 / 정리")
+    parser.add_argument("--path", default=str(DEFAULT_CACHE_PATH))
+    parser.add_argument("--purge", action="store_true", help="만료 항목 삭제 + VACUUM")
+    args = parser.parse_args()
+
+    cache = PubMedCache(args.path)
+    if args.purge:
+        removed = cache.purge_expired()
+        print(f"🧹 만료 항목 삭제: esearch {removed['searches']:,}개, 논문 {removed['articles']:,}개")
+
+    stats = cache.get_stats()
+    print(f"\n💾 PubMed 캐시: {cache.path}")
+    print(f"  esearch {stats['searches']:,}개, 논문 {stats['articles']:,}개, 디스크 {stats['disk_mb']:.1f} MB")
+    cache.close()
@@ -0,0 +1,136 @@
+"""
+PubMed 로컬 미러 (baseline/update XML → MongoDB papers 컬렉션)
+- database/ingest_pubmed_baseline.py가 적재한 논문을 PubMed 실시간 검색 대신 조회
+- 미러 논문은 source="pubmed_baseline", metadata.pmid 기준으로 저장 (로컬 논문 검색/BM25/벡터에도 함께 노출)
+- 적재 범위: 파일별 최대 PubMed 등록일(entrez) → 그 이후 논문만 실시간 검색 (PubMedAdvancedSearch local-first)
+
+사용 예:
+    mirror = PubMedMirror(mongo)
+    coverage = await mirror.get_coverage_date()   # 미러가 비었으면 None
+    papers = await mirror.search("ckd potassium", 10)   # search_papers 결과와 같은 구조
+"""
+
+import time
+from datetime import date
+from typing import Dict, List, Optional
+
+# 미러 논문 source 값 / 파일별 적재 상태 컬렉션
+MIRROR_SOURCE = "pubmed_baseline"
+STATE_COLLECTION = "pubmed_mirror_files"
+
+# 검색 결과 변환에 필요한 필드 (preview 모드에서도 원문 필드로 다시 조회)
+MIRROR_PROJECTION = {"title": 1, "abstract": 1, "source": 1, "metadata": 1, "_id": 1}
+
+
+def paper_to_document(paper: Dict, entrez_date: str = "") -> Dict:
+    """parse_article 결과 → papers 컬렉션 문서
+
+    DOI가 없으면 metadata.doi를 넣지 않습니다 (doi_unique sparse 인덱스에서 빈 문자열 충돌 방지).
+    """
+    metadata = {
+        "pmid": paper["pmid"],
+        "journal": paper["journal"],
+        "authors": paper["authors"],
+        "keywords": paper["keywords"],
+        "mesh_terms": paper["mesh_terms"],
+        "publication_date": paper["pub_date"].replace("-", "."),  # 전처리 데이터와 같은 YYYY.MM.DD
+        "entrez_date": entrez_date,
+        "source": "pubmed",
+    }
+    if paper["doi"].strip():
+        metadata["doi"] = paper["doi"].strip()
+
+    return {
+        "title": paper["title"],
+        "abstract": paper["abstract"],
+        "source": MIRROR_SOURCE,
+        "metadata": metadata,
+    }
+
+
+def document_to_paper(doc: Dict) -> Dict:
+    """papers 컬렉션 문서 → PubMedAdvancedSearch.search_papers 결과 구조"""
+    metadata = doc.get("metadata") or {}
+    pmid = str(metadata.get("pmid", ""))
+
+    return {
+        "pmid": pmid,
+        "title": doc.get("title", ""),
+        "abstract": doc.get("abstract", ""),
+        "authors": metadata.get("authors", []),
+        "journal": metadata.get("journal", ""),
+        "pub_date": metadata.get("publication_date", "").replace(".", "-"),
+        "doi": metadata.get("doi", ""),
+        "keywords": metadata.get("keywords", []),
+        "mesh_terms": metadata.get("mesh_terms", []),
+        "source": "PubMed",
+        "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
+    }
+
+
+class PubMedMirror:
+    """MongoDB에 적재된 PubMed 미러 조회
+
+    키워드 검색은 MongoDBManager.search_papers를 그대로 사용합니다
+    (KEYWORD_BACKEND=bm25이면 BM25 역색인, 아니면 $text - source 필터 적용).
+    """
+
+    def __init__(self, mongo, overlap_days: int = 2, refresh_seconds: float = 600):
+        """
+        Args:
+            mongo: MongoDBManager (연결은 호출자가 관리)
+            overlap_days: 실시간 검색 구간을 적재 범위보다 며칠 앞당김 (update 파일 지연/누락 보정)
+            refresh_seconds: 적재 범위 재조회 주기 (초)
+        """
+        self.mongo = mongo
+        self.overlap_days = overlap_days
+        self.refresh_seconds = refresh_seconds
+
+        self._coverage: Optional[date] = None
+        self._coverage_checked_at = 0.0
+
+    async def get_coverage_date(self) -> Optional[date]:
+        """미러가 포함하는 마지막 PubMed 등록일 (색인까지 끝난 파일 기준, 없으면 None)"""
+        now = time.monotonic()
+        if self._coverage_checked_at and now - self._coverage_checked_at < self.refresh_seconds:
+            return self._coverage
+
+        state = await self.mongo.db[STATE_COLLECTION].find_one(
+            {"stage": "indexed", "max_entrez_date": {"$gt": ""}},
+            sort=[("max_entrez_date", -1)]
+        )
+        self._coverage = date.fromisoformat(state["max_entrez_date"]) if state else None
+        self._coverage_checked_at = now
+        return self._coverage
+
+    async def search(self, query: str, max_results: int = 10, sort: str = "relevance") -> List[Dict]:
+        """미러 논문 키워드 검색 (sort="pub_date"이면 출판일 최신순)"""
+        docs = await self.mongo.search_papers(query, max_results, filters={"source": MIRROR_SOURCE})
+
+        # preview 모드 결과는 초록/메타데이터가 빠져 있으므로 원문 필드로 다시 조회
+        if self.mongo.projection_mode != "full" and docs:
+            full = await self.mongo.get_documents_by_ids(
+                "papers", [str(doc["_id"]) for doc in docs], projection=MIRROR_PROJECTION
+            )
+            docs = [full[str(doc["_id"])] for doc in docs if str(doc["_id"]) in full]
+
+        papers = [document_to_paper(doc) for doc in docs]
+        if sort == "pub_date":
+            papers.sort(key=lambda paper: paper["pub_date"], reverse=True)
+
+        return papers
+
+    async def get_stats(self) -> Dict:
+        """파일 단계별 수 / 미러 논문 수 / 적재 범위"""
+        stages = {}
+        async for row in self.mongo.db[STATE_COLLECTION].aggregate([
+            {"$group": {"_id": "$stage", "files": {"$sum": 1}}}
+        ]):
+            stages[row["_id"]] = row["files"]
+
+        coverage = await self.get_coverage_date()
+        return {
+            "files": stages,
+            "papers": await self.mongo.db.papers.count_documents({"source": MIRROR_SOURCE}),
+            "coverage_date": coverage.isoformat() if coverage else None,
+        }
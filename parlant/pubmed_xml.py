@@ -0,0 +1,172 @@
+"""
+PubMed efetch XML 스트리밍 파서 (lxml iterparse)
+- 전체 트리를 만들지 않고 PubmedArticle 요소가 끝날 때마다 파싱 후 즉시 해제 → 200개 배치도 메모리 일정
+- PubMedAdvancedSearch.search_papers 결과와 같은 dict 구조 (월 이름 → 숫자 변환 포함)
+- pubmed_enricher_standalone.py (전처리), database/ingest_pubmed_baseline.py (baseline 미러 적재)도 같은 파서 사용
+
+사용 예:
+    papers = parse_pubmed_xml(response.content)
+    for article in iter_pubmed_articles(fp): ...   # 요소 단위 (호출자 파싱)
+"""
+
+import io
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+from lxml import etree
+
+MONTH_MAP = {
+    "Jan": "01", "Feb": "02", "Mar": "03", "Apr": "04",
+    "May": "05", "Jun": "06", "Jul": "07", "Aug": "08",
+    "Sep": "09", "Oct": "10", "Nov": "11", "Dec": "12"
+}
+
+
+def normalize_month(month: str) -> str:
+    """월 이름 → 숫자 ("Mar" → "03"), 그 외 값은 그대로"""
+    return MONTH_MAP.get(month, month)
+
+
+def element_text(element) -> str:
+    """하위 태그(<i>, <sup> 등)를 포함한 전체 텍스트"""
+    return "".join(element.itertext()) if element is not None else ""
+
+
+def _first(element, tag: str):
+    """첫 번째 하위 요소 (문서 순서, 깊이 무관)"""
+    return next(element.iter(tag), None)
+
+
+def _first_text(element, tag: str, default: str = "") -> str:
+    """첫 번째 하위 요소 텍스트 (요소가 없으면 default, 빈 요소는 빈 문자열)"""
+    found = _first(element, tag)
+    return element_text(found) if found is not None else default
+
+
+def iter_pubmed_articles(
+    source: Union[bytes, str, io.IOBase],
+    tags: Sequence[str] = ("PubmedArticle",)
+) -> Iterator:
+    """PubmedArticle 요소를 하나씩 반환 (호출자가 처리한 뒤 요소와 앞선 형제를 해제)
+
+    Args:
+        source: efetch 응답 (bytes / str) 또는 파일 객체 (baseline .xml.gz는 gzip.open 결과)
+        tags: 반환할 요소 태그 (update 파일의 삭제 목록은 "DeleteCitation" 추가 - element.tag로 구분)
+    """
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    # DTD는 읽지 않음 (네트워크 조회 없음)
+    for _, article in etree.iterparse(source, events=("end",), tag=tuple(tags), load_dtd=False, no_network=True):
+        yield article
+
+        article.clear()
+        parent = article.getparent()
+        if parent is not None:
+            while article.getprevious() is not None:
+                del parent[0]
+
+
+def history_date(article, status: str = "entrez") -> str:
+    """PubmedData/History 날짜 → "YYYY-MM-DD" (없으면 빈 문자열)
+
+    Args:
+        status: PubStatus (entrez: PubMed 등록일 - esearch [EDAT] 기준, pubmed, medline 등)
+    """
+    for date in article.iter("PubMedPubDate"):
+        if date.get("PubStatus") != status:
+            continue
+
+        year = _first_text(date, "Year")
+        month = normalize_month(_first_text(date, "Month", "01"))
+        day = _first_text(date, "Day", "01")
+        if year.isdigit() and month.isdigit() and day.isdigit():
+            return f"{year}-{int(month):02d}-{int(day):02d}"
+
+    return ""
+
+
+def parse_article(article) -> Dict:
+    """PubmedArticle 요소 → 논문 dict (search_papers 결과 구조)"""
+    # 기본 정보 (MedlineCitation/PMID - 문서 순서상 첫 PMID)
+    pmid = _first_text(article, "PMID")
+
+    # 제목
+    title = _first_text(article, "ArticleTitle")
+
+    # 초록 (구조화 초록은 섹션별 AbstractText를 공백으로 연결)
+    abstract = " ".join(element_text(a) for a in article.iter("AbstractText"))
+
+    # 저자 (LastName, ForeName 요소가 모두 있는 저자만 - CollectiveName 제외)
+    authors = []
+    author_list = _first(article, "AuthorList")
+    if author_list is not None:
+        for author in author_list.iter("Author"):
+            last_name = _first(author, "LastName")
+            fore_name = _first(author, "ForeName")
+            if last_name is not None and fore_name is not None:
+                authors.append(f"{element_text(last_name)} {element_text(fore_name)}")
+
+    # 저널
+    journal_elem = _first(article, "Journal")
+    journal = _first_text(journal_elem, "Title") if journal_elem is not None else ""
+
+    # 출판일 (값이 없으면 0000-01-01 기준으로 채움)
+    pub_date = ""
+    pub_date_elem = _first(article, "PubDate")
+    if pub_date_elem is not None:
+        year_str = _first_text(pub_date_elem, "Year", "0000")
+        month_str = normalize_month(_first_text(pub_date_elem, "Month", "01"))
+        day_str = _first_text(pub_date_elem, "Day", "01")
+        pub_date = f"{year_str}-{month_str}-{day_str}"
+
+    # DOI
+    doi = ""
+    for article_id in article.iter("ArticleId"):
+        if article_id.get("IdType") == "doi":
+            doi = element_text(article_id)
+            break
+
+    # MeSH 용어
+    mesh_terms = []
+    mesh_list = _first(article, "MeshHeadingList")
+    if mesh_list is not None:
+        mesh_terms = [element_text(mesh) for mesh in mesh_list.iter("DescriptorName")]
+
+    # 키워드
+    keywords = []
+    keyword_list = _first(article, "KeywordList")
+    if keyword_list is not None:
+        keywords = [element_text(kw) for kw in keyword_list.iter("Keyword")]
+
+    return {
+        "pmid": pmid,
+        "title": title,
+        "abstract": abstract,
+        "authors": authors,
+        "journal": journal,
+        "pub_date": pub_date,
+        "doi": doi,
+        "keywords": keywords,
+        "mesh_terms": mesh_terms,
+        "source": "PubMed",
+        "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
+    }
+
+
+def parse_pubmed_xml(source: Union[bytes, str, io.IOBase], limit: Optional[int] = None) -> List[Dict]:
+    """efetch 응답 → 논문 dict 리스트 (파싱 오류 논문은 건너뜀)"""
+    papers = []
+
+    for article in iter_pubmed_articles(source):
+        try:
+            papers.append(parse_article(article))
+        except Exception as e:
+            print(f"⚠️ 논문 파싱 오류: {e}")
+            continue
+
+        if limit is not None and len(papers) >= limit:
+            break
+
+    return papers
@@ -0,0 +1,94 @@
+"""
+로컬 논문(paper_results) ↔ PubMed(pubmed_results) 중복 제거
+- 같은 논문이 로컬 papers 컬렉션(metadata.doi)과 PubMed 실시간 검색에 동시에 나오면
+  LLM 프롬프트에 두 번 들어가 토큰과 지연을 낭비
+- 정규화한 DOI / PMID를 키로 하는 해시 인덱스로 묶고, 더 풍부한 레코드 하나만 유지
+- 남은 레코드는 원래 소스 목록의 원래 순위 위치를 유지
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+DOI_PREFIX = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+
+# 레코드 풍부도 판정 필드 (최상위 또는 metadata 하위)
+RICHNESS_FIELDS = ("title", "abstract", "authors", "journal", "pub_date", "publication_date", "doi", "pmid", "mesh_terms", "keywords")
+
+
+def normalize_doi(doi) -> str:
+    """DOI 정규화 (URL/doi: 접두사 제거, 소문자) - 값이 없으면 빈 문자열"""
+    if not doi or not isinstance(doi, str):
+        return ""
+    doi = DOI_PREFIX.sub("", doi.strip()).strip().lower()
+    return doi if doi.startswith("10.") else ""
+
+
+def normalize_pmid(pmid) -> str:
+    """PMID 정규화 (숫자만) - 값이 없으면 빈 문자열"""
+    pmid = re.sub(r"^pmid:\s*", "", str(pmid or "").strip(), flags=re.IGNORECASE)
+    return pmid.lstrip("0") if pmid.isdigit() else ""
+
+
+def _field(record: Dict, field: str):
+    value = record.get(field)
+    if not value and isinstance(record.get("metadata"), dict):
+        value = record["metadata"].get(field)
+    return value
+
+
+def record_keys(record: Dict) -> List[str]:
+    """레코드 식별 키 목록 ("doi:...", "pmid:...")"""
+    keys = []
+    doi = normalize_doi(_field(record, "doi"))
+    if doi:
+        keys.append("doi:" + doi)
+    pmid = normalize_pmid(_field(record, "pmid"))
+    if pmid:
+        keys.append("pmid:" + pmid)
+    return keys
+
+
+def richness(record: Dict) -> Tuple[int, int]:
+    """(채워진 필드 수, 초록 길이) - 클수록 풍부한 레코드"""
+    filled = sum(1 for field in RICHNESS_FIELDS if _field(record, field))
+    return filled, len(_field(record, "abstract") or "")
+
+
+def dedupe_papers(paper_results: List[Dict], pubmed_results: List[Dict]) -> Tuple[List[Dict], List[Dict], int]:
+    """DOI/PMID 기준 중복 제거 (소스 내부 중복 포함)
+
+    풍부도가 같으면 먼저 나온 레코드 (로컬 논문 → PubMed 순)를 유지합니다.
+
+    Returns:
+        (paper_results, pubmed_results, 제거된 중복 수)
+    """
+    records = [("papers", record) for record in paper_results] + [("pubmed", record) for record in pubmed_results]
+
+    index: Dict[str, int] = {}   # 정규화 키 → 그룹 번호
+    winners: List[int] = []      # 그룹 번호 → 유지할 레코드 (records 위치)
+    removed = set()
+
+    for position, (_, record) in enumerate(records):
+        keys = record_keys(record)
+        group = next((index[key] for key in keys if key in index), None)
+
+        if group is None:
+            group = len(winners)
+            winners.append(position)
+        else:
+            current = winners[group]
+            if richness(record) > richness(records[current][1]):
+                removed.add(current)
+                winners[group] = position
+            else:
+                removed.add(position)
+
+        for key in keys:
+            index.setdefault(key, group)
+
+    kept = {"papers": [], "pubmed": []}
+    for position, (source, record) in enumerate(records):
+        if position not in removed:
+            kept[source].append(record)
+
+    return kept["papers"], kept["pubmed"], len(removed)
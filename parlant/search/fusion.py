@@ -0,0 +1,235 @@
+"""
+키워드 + 시맨틱 레그 점수 융합 (배열 기반)
+- 후보를 ID 목록 + 점수 배열로 다루고 융합 점수를 numpy로 한 번에 계산
+- 전략: weighted (키워드 최대값 정규화 + 코사인 그대로, 기존 0.4/0.6 가중합)
+        max_norm (두 레그 모두 최대값 정규화 후 가중합)
+        rrf (Reciprocal Rank Fusion, 점수 스케일 무관)
+- 전체 정렬 대신 argpartition으로 상위 k개만 선택 (동점은 기존처럼 입력 순서 유지)
+- 연구자 프로필의 깊은 쿼리 (레그당 수천 개 후보)에서도 CPU 부담이 거의 없음
+"""
+
+from itertools import chain
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+STRATEGIES = ("weighted", "max_norm", "rrf")
+
+
+def _max_normalize(scores: np.ndarray) -> np.ndarray:
+    peak = scores.max(initial=0.0)
+    return scores / peak if peak > 0 else np.zeros_like(scores)
+
+
+def _scatter_best(rows: np.ndarray, scores: Sequence[float], n: int) -> np.ndarray:
+    """후보 위치별 레그 점수 배열 (같은 ID가 레그에 중복되면 최고 점수)"""
+    values = np.asarray(scores, dtype=np.float64)
+    order = np.argsort(values, kind="stable")
+
+    array = np.zeros(n, dtype=np.float64)
+    array[rows[order]] = values[order]  # 오름차순 대입 → 마지막(최고) 점수가 남음
+    return array
+
+
+def _reciprocal_ranks(scores: np.ndarray, present: np.ndarray, rrf_k: float) -> np.ndarray:
+    """레그 내 점수 순위 기반 1 / (rrf_k + rank), 해당 레그에 없는 후보는 0"""
+    rows = np.flatnonzero(present)
+    order = rows[np.argsort(-scores[rows], kind="stable")]
+
+    contribution = np.zeros(len(scores), dtype=np.float64)
+    contribution[order] = 1.0 / (rrf_k + np.arange(1, len(order) + 1))
+    return contribution
+
+
+def fuse_scores(
+    keyword_scores: np.ndarray,
+    semantic_scores: np.ndarray,
+    keyword_present: np.ndarray,
+    semantic_present: np.ndarray,
+    strategy: str = "weighted",
+    keyword_weight: float = 0.4,
+    rrf_k: float = 60.0
+) -> np.ndarray:
+    """후보별 레그 점수 배열 → 융합 점수 배열
+
+    Args:
+        keyword_scores / semantic_scores: 후보별 레그 원점수 (레그에 없으면 0)
+        keyword_present / semantic_present: 후보가 해당 레그에 있는지 (bool 배열, rrf용)
+        strategy: weighted | max_norm | rrf
+        keyword_weight: 키워드 가중치 (시맨틱은 1 - keyword_weight)
+        rrf_k: RRF 상수
+    """
+    semantic_weight = 1.0 - keyword_weight
+
+    if strategy == "weighted":
+        return keyword_weight * _max_normalize(keyword_scores) + semantic_weight * semantic_scores
+    if strategy == "max_norm":
+        return keyword_weight * _max_normalize(keyword_scores) + semantic_weight * _max_normalize(semantic_scores)
+    if strategy == "rrf":
+        return (
+            keyword_weight * _reciprocal_ranks(keyword_scores, keyword_present, rrf_k)
+            + semantic_weight * _reciprocal_ranks(semantic_scores, semantic_present, rrf_k)
+        )
+
+    raise ValueError(f"지원하지 않는 융합 전략: {strategy} ({' | '.join(STRATEGIES)})")
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 상위 k개 인덱스 (내림차순, 동점은 인덱스 순) - 전체 정렬 없이 argpartition"""
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    if k < n:
+        # k번째 점수 이상인 후보만 남긴 뒤 정렬 (경계 동점까지 포함해야 입력 순서 유지)
+        kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(n)
+
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order[:k]]
+
+
+def fuse(
+    keyword_ids: Sequence[str],
+    keyword_scores: Sequence[float],
+    semantic_ids: Sequence[str],
+    semantic_scores: Sequence[float],
+    limit: int,
+    strategy: str = "weighted",
+    keyword_weight: float = 0.4,
+    rrf_k: float = 60.0
+) -> Tuple[List[str], np.ndarray]:
+    """두 레그의 (ID, 점수) 목록을 융합해 상위 limit개 반환
+
+    후보 순서는 키워드 결과 → 시맨틱 전용 결과 (동점 시 이 순서 유지).
+
+    Returns:
+        (상위 ID 목록, 융합 점수 배열)
+    """
+    # ID → 후보 위치 (ID 중복 제거, 첫 등장 순서)
+    positions = {doc_id: row for row, doc_id in enumerate(dict.fromkeys(chain(keyword_ids, semantic_ids)))}
+    candidate_ids = list(positions)
+    n = len(candidate_ids)
+
+    keyword_rows = np.fromiter((positions[doc_id] for doc_id in keyword_ids), dtype=np.int64, count=len(keyword_ids))
+    semantic_rows = np.fromiter((positions[doc_id] for doc_id in semantic_ids), dtype=np.int64, count=len(semantic_ids))
+
+    keyword_array = _scatter_best(keyword_rows, keyword_scores, n)
+    semantic_array = _scatter_best(semantic_rows, semantic_scores, n)
+
+    keyword_present = np.zeros(n, dtype=bool)
+    semantic_present = np.zeros(n, dtype=bool)
+    keyword_present[keyword_rows] = True
+    semantic_present[semantic_rows] = True
+
+    scores = fuse_scores(
+        keyword_array, semantic_array, keyword_present, semantic_present,
+        strategy=strategy, keyword_weight=keyword_weight, rrf_k=rrf_k
+    )
+    top = top_k_indices(scores, limit)
+    return [candidate_ids[row] for row in top], scores[top]
+
+
+# ==================== 벤치마크 ====================
+
+def _dict_merge(keyword_results: List[Dict], semantic_matches: List[Dict], limit: int) -> List[Dict]:
+    """기존 _merge_results 구현 (후보별 dict + 전체 정렬) - 벤치마크 비교 기준"""
+    merged_dict = {}
+    max_keyword_score = max([r.get("score", 0) for r in keyword_results], default=1.0)
+
+    for r in keyword_results:
+        doc_id = str(r.get("_id", ""))
+        normalized_score = r.get("score", 0) / max_keyword_score if max_keyword_score > 0 else 0
+        merged_dict[doc_id] = {"data": r, "keyword_score": normalized_score, "semantic_score": 0.0}
+
+    for match in semantic_matches:
+        doc_id = match["id"]
+        if doc_id in merged_dict:
+            merged_dict[doc_id]["semantic_score"] = match["score"]
+        else:
+            merged_dict[doc_id] = {
+                "data": match["metadata"] or {"_id": doc_id},
+                "keyword_score": 0.0,
+                "semantic_score": match["score"]
+            }
+
+    for info in merged_dict.values():
+        info["final_score"] = info["keyword_score"] * 0.4 + info["semantic_score"] * 0.6
+
+    sorted_results = sorted(merged_dict.values(), key=lambda x: x["final_score"], reverse=True)
+    return [r["data"] for r in sorted_results[:limit]]
+
+
+def benchmark(
+    sizes: Sequence[int] = (100, 1_000, 5_000, 20_000),
+    limit: int = 10,
+    overlap: float = 0.3,
+    repeat: int = 20
+) -> List[Dict]:
+    """레그당 후보 수별 기존 dict 병합 vs 배열 융합 지연 비교 (ms)"""
+    import time
+
+    rng = np.random.default_rng(0)
+    rows = []
+
+    for size in sizes:
+        keyword_ids = [f"doc{i}" for i in range(size)]
+        shared = int(size * overlap)
+        semantic_ids = keyword_ids[:shared] + [f"vec{i}" for i in range(size - shared)]
+        rng.shuffle(semantic_ids)
+
+        keyword_results = [
+            {"_id": doc_id, "score": float(score)}
+            for doc_id, score in zip(keyword_ids, rng.gamma(2.0, 2.0, size))
+        ]
+        semantic_matches = [
+            {"id": doc_id, "score": float(score), "metadata": None}
+            for doc_id, score in zip(semantic_ids, rng.uniform(0.2, 0.95, size))
+        ]
+
+        timings = {}
+        for name in ("dict", *STRATEGIES):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                if name == "dict":
+                    _dict_merge(keyword_results, semantic_matches, limit)
+                else:
+                    fuse(
+                        [str(r["_id"]) for r in keyword_results], [r["score"] for r in keyword_results],
+                        [m["id"] for m in semantic_matches], [m["score"] for m in semantic_matches],
+                        limit, strategy=name
+                    )
+            timings[name] = (time.perf_counter() - start) / repeat * 1000
+
+        # weighted 전략은 기존 구현과 같은 순위여야 함
+        expected = [str(r["_id"]) for r in _dict_merge(keyword_results, semantic_matches, limit)]
+        actual, _ = fuse(
+            [str(r["_id"]) for r in keyword_results], [r["score"] for r in keyword_results],
+            [m["id"] for m in semantic_matches], [m["score"] for m in semantic_matches],
+            limit
+        )
+
+        rows.append({"candidates_per_leg": size, **timings, "same_ranking": expected == actual})
+
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="융합 마이크로벤치마크 (기존 dict 병합 vs 배열 융합)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 5_000, 20_000])
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"\n⚖️ 융합 벤치마크: limit {args.limit}, 반복 {args.repeat}회 (ms/호출)")
+    print(f"{'후보/레그':>10}{'dict':>10}" + "".join(f"{name:>10}" for name in STRATEGIES) + "  순위 일치")
+    for row in benchmark(args.sizes, args.limit, repeat=args.repeat):
+        print(
+            f"{row['candidates_per_leg']:>10,}{row['dict']:>10.2f}"
+            + "".join(f"{row[name]:>10.2f}" for name in STRATEGIES)
+            + f"  {'✅' if row['same_ranking'] else '❌'}"
+        )
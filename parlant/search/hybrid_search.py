@@ -5,10 +5,18 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from typing import List, Dict
+from typing import List, Dict, Optional, Set, Tuple, Any, AsyncIterator
 from database.mongodb_manager import MongoDBManager
 from database.vector_manager import VectorDBManager
-from pubmed_advanced import PubMedAdvancedSearch
+from pubmed_advanced import FETCH_DEPTHS, PubMedAdvancedSearch
+from pubmed_cache import create_pubmed_cache
+from pubmed_mirror import PubMedMirror
+from search.dedup import dedupe_papers
+from search.fusion import STRATEGIES, fuse
+from search.pagination import create_cursor_store
+from search.result_cache import create_result_cache, make_cache_key
+from search.semantic_cache import SemanticResultCache
+from search.singleflight import SingleFlight
 import asyncio
 from dotenv import load_dotenv
 import os
@@ -16,13 +24,125 @@ import os
 load_dotenv()
 
 
+# _run_leg timeout 기본값 표시 (None은 "데드라인 없음"이므로 별도 sentinel 사용)
+LEG_TIMEOUT = object()
+
+
+def resolve_timeout(value: Optional[float], env_name: str, default: str) -> Optional[float]:
+    """데드라인 설정값 (인자 우선, 없으면 환경 변수) - 0이면 무제한(None)"""
+    if value is None:
+        value = float(os.getenv(env_name, default))
+    return value or None
+
+
 class HybridSearchEngine:
     """하이브리드 검색 엔진 - MongoDB + Pinecone + PubMed"""
     
-    def __init__(self):
+    # 벡터 namespace → MongoDB 컬렉션
+    NAMESPACE_COLLECTIONS = {
+        "qa": "qa_data",
+        "papers": "papers",
+        "medical": "medical_data",
+    }
+    
+    # 스트리밍 소스 이름 → 결과 키
+    SOURCE_RESULT_KEYS = {
+        "qa": "qa_results",
+        "papers": "paper_results",
+        "medical": "medical_results",
+        "pubmed": "pubmed_results",
+    }
+    
+    def __init__(
+        self,
+        leg_timeout: Optional[float] = None,
+        pubmed_timeout: Optional[float] = None,
+        total_timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            leg_timeout: 로컬 검색 레그(키워드/시맨틱)별 데드라인 (초, 0이면 무제한)
+            pubmed_timeout: PubMed 레그 데드라인 (초, 0이면 무제한)
+            total_timeout: search_all_sources 전체 데드라인 (초, 0이면 무제한)
+        """
         self.mongo = MongoDBManager()
         self.vector_db = VectorDBManager()
-        self.pubmed = PubMedAdvancedSearch(email=os.getenv("PUBMED_EMAIL"))
+        
+        # PubMed 검색 모드: live (항상 E-utilities) | local_first (ingest_pubmed_baseline.py로 적재한 미러 우선)
+        pubmed_mode = os.getenv("PUBMED_SEARCH_MODE", "live").lower()
+        if pubmed_mode not in ("live", "local_first"):
+            raise ValueError(f"지원하지 않는 PubMed 검색 모드: {pubmed_mode} (live | local_first)")
+        
+        self.pubmed = PubMedAdvancedSearch(
+            email=os.getenv("PUBMED_EMAIL"),
+            api_key=os.getenv("PUBMED_API_KEY") or None,
+            # esearch/efetch 영구 캐시 (PUBMED_CACHE_PATH=none이면 비활성화)
+            cache=create_pubmed_cache(
+                path=os.getenv("PUBMED_CACHE_PATH"),
+                search_ttl=float(os.getenv("PUBMED_CACHE_SEARCH_TTL", "300")),
+                article_ttl=float(os.getenv("PUBMED_CACHE_ARTICLE_TTL", str(30 * 86400))),
+                max_searches=int(os.getenv("PUBMED_CACHE_MAX_SEARCHES", "20000")),
+                max_articles=int(os.getenv("PUBMED_CACHE_MAX_ARTICLES", "200000"))
+            ),
+            mirror=PubMedMirror(
+                self.mongo,
+                overlap_days=int(os.getenv("PUBMED_MIRROR_OVERLAP_DAYS", "2"))
+            ) if pubmed_mode == "local_first" else None
+        )
+        
+        # 데드라인 초과 레그는 빈 결과로 대체하고 degraded로 표시 (0이면 무제한)
+        self.leg_timeout = resolve_timeout(leg_timeout, "SEARCH_LEG_TIMEOUT", "2.0")
+        self.pubmed_timeout = resolve_timeout(pubmed_timeout, "PUBMED_TIMEOUT", "3.0")
+        self.total_timeout = resolve_timeout(total_timeout, "SEARCH_TOTAL_TIMEOUT", "5.0")
+        
+        # 전체 응답 캐시 (소스별 TTL + stale-while-revalidate)
+        self.result_cache = create_result_cache(
+            backend=os.getenv("RESULT_CACHE_BACKEND", "memory"),
+            url=os.getenv("RESULT_CACHE_URL"),
+            max_size=int(os.getenv("RESULT_CACHE_SIZE", "1000")),
+            default_ttl=float(os.getenv("RESULT_CACHE_TTL", "3600")),
+            pubmed_ttl=float(os.getenv("RESULT_CACHE_PUBMED_TTL", "300")),
+            stale_seconds=float(os.getenv("RESULT_CACHE_STALE_SECONDS", "600"))
+        )
+        self._refreshing = set()  # 백그라운드 갱신 중인 캐시 키
+        self._refresh_tasks: Set[asyncio.Task] = set()  # 갱신 태스크 (이벤트 루프는 약한 참조만 유지 → GC 방지)
+        
+        # 유사 쿼리 캐시 (임베딩 코사인 유사도, SEMANTIC_CACHE_SIZE=0이면 비활성화)
+        semantic_cache_size = int(os.getenv("SEMANTIC_CACHE_SIZE", "1000"))
+        self.semantic_cache = SemanticResultCache(
+            threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+            max_size=semantic_cache_size,
+            ttl_seconds=float(os.getenv("SEMANTIC_CACHE_TTL", "600")),
+            # PubMed를 포함한 항목은 정확 일치 캐시의 PubMed TTL을 넘겨 재사용하지 않음 (갱신 경로가 없으므로)
+            source_ttls={"pubmed_results": float(os.getenv("RESULT_CACHE_PUBMED_TTL", "300"))}
+        ) if semantic_cache_size > 0 else None
+        
+        # 동일 쿼리 동시 요청 병합 (백엔드 호출 1회 공유)
+        self.singleflight = SingleFlight()
+        
+        # FAQ 정확 일치 시 하이브리드/PubMed 검색 생략 (question_hash 인덱스 조회 1회)
+        self.faq_fast_path = os.getenv("SEARCH_FAQ_FAST_PATH", "1") == "1"
+        
+        # 키워드 레그를 $unionWith 집계 1회로 통합 (0이면 컬렉션별 개별 쿼리)
+        self.union_keyword_search = os.getenv("SEARCH_UNION_KEYWORD", "1") == "1"
+        
+        # 로컬 논문 ↔ PubMed DOI/PMID 중복 제거 (풍부한 레코드 유지)
+        self.dedup_papers = os.getenv("SEARCH_DEDUP_PAPERS", "1") == "1"
+        
+        # 키워드/시맨틱 점수 융합 전략 (weighted | max_norm | rrf)
+        self.fusion_strategy = os.getenv("SEARCH_FUSION_STRATEGY", "weighted")
+        if self.fusion_strategy not in STRATEGIES:
+            raise ValueError(f"지원하지 않는 융합 전략: {self.fusion_strategy} ({' | '.join(STRATEGIES)})")
+        self.keyword_weight = float(os.getenv("SEARCH_KEYWORD_WEIGHT", "0.4"))
+        
+        # 페이지네이션: 첫 검색에서 소스별 cursor_pool_size개를 가져와 스냅샷 저장, 다음 페이지는 커서로 제공
+        self.cursor_pool_size = int(os.getenv("SEARCH_CURSOR_POOL_SIZE", "50"))
+        self.cursor_store = create_cursor_store(
+            backend=os.getenv("RESULT_CACHE_BACKEND", "memory"),
+            url=os.getenv("RESULT_CACHE_URL"),
+            max_size=int(os.getenv("SEARCH_CURSOR_MAX_SNAPSHOTS", "500")),
+            ttl_seconds=float(os.getenv("SEARCH_CURSOR_TTL", "900"))
+        )
         
         self.initialized = False
     
@@ -35,132 +155,637 @@ class HybridSearchEngine:
             print("✅ 하이브리드 검색 엔진 초기화 완료")
     
     async def close(self):
-        """연결 종료"""
+        """연결 종료 (진행 중인 백그라운드 캐시 갱신은 취소 - 닫힌 클라이언트에 쓰지 않도록)"""
+        for task in list(self._refresh_tasks):
+            task.cancel()
+        if self._refresh_tasks:
+            await asyncio.gather(*self._refresh_tasks, return_exceptions=True)
+        
         await self.mongo.close()
+        await self.pubmed.close()
     
     async def search_all_sources(
         self,
         query: str,
         max_per_source: int = 5,
         use_semantic: bool = True,
-        use_pubmed: bool = True
+        use_pubmed: bool = True,
+        timeout: Optional[float] = None,
+        use_cache: bool = True,
+        filters: Optional[Dict[str, Any]] = None,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None,
+        pubmed_depth: str = "full"
     ) -> Dict:
         """통합 검색 - 4개 소스 + 하이브리드 방식
         
+        각 소스와 소스 내부 레그(키워드/시맨틱)를 동시에 실행합니다.
+        데드라인을 넘긴 레그는 기다리지 않고 부분 결과를 반환하며 degraded로 표시합니다.
+        
+        page_size를 지정하면 소스별 max(max_per_source, cursor_pool_size)개의 후보 풀을 한 번 검색해
+        스냅샷으로 저장하고 첫 페이지와 next_cursor를 반환합니다. 이후 cursor만 넘기면
+        스냅샷에서 다음 페이지를 반환하며 백엔드는 다시 호출하지 않습니다.
+        
+        Args:
+            timeout: 전체 데드라인 (초, 기본값: total_timeout, 0이면 무제한)
+            use_cache: 결과 캐시 사용 여부
+            filters: {"category": "투석", "source_dataset": [...]} - 문자열은 일치, 리스트는 포함.
+                키워드 쿼리와 벡터 메타데이터 필터에 모두 적용되며, 해당 필드가 있는 소스(QA: category,
+                source_dataset / 의료: category)에만 적용됩니다 (논문, PubMed는 필터 없음).
+            page_size: 페이지당 소스별 결과 수 (지정 시 페이지네이션)
+            cursor: 이전 응답의 next_cursor (지정 시 다른 인자는 무시)
+            pubmed_depth: PubMed 상세 정보 수준 - full (초록 포함) | summary (esummary) | ids
+                (PubMedAdvancedSearch.search_papers의 fetch_depth, 캐시 키에 포함)
+        
+        Raises:
+            ValueError: 잘못되었거나 만료된 cursor, 지원하지 않는 pubmed_depth
+        
         Returns:
             {
                 "qa_results": [...],
                 "paper_results": [...],
                 "medical_results": [...],
                 "pubmed_results": [...],
-                "search_method": "hybrid"  # 또는 "keyword"
+                "search_method": "hybrid",  # 또는 "keyword", "faq" (FAQ 정확 일치)
+                "degraded": False,
+                "degraded_sources": [],  # 예: ["pubmed", "qa.semantic"]
+                "duplicates_removed": 0,  # 로컬 논문 ↔ PubMed DOI/PMID 중복 제거 수
+                "cache_status": "miss",  # fresh | stale | semantic | miss | cursor
+                "page": 1,  # 페이지네이션 시: 페이지 번호, 소스별 후보 풀 크기, 다음 페이지 커서
+                "pool_sizes": {...},
+                "next_cursor": "..."  # 마지막 페이지면 None
             }
         """
+        if cursor:
+            return await self.cursor_store.next_page(cursor)
+        
+        envelope = None
+        
+        async for source, results in self.search_all_sources_stream(
+            query,
+            max_per_source=max(max_per_source, self.cursor_pool_size) if page_size else max_per_source,
+            use_semantic=use_semantic,
+            use_pubmed=use_pubmed,
+            timeout=timeout,
+            use_cache=use_cache,
+            filters=filters,
+            pubmed_depth=pubmed_depth
+        ):
+            if source == "merged":
+                envelope = results
+        
+        if page_size:
+            envelope = await self.paginate_results(query, envelope, page_size)
+        
+        return envelope
+    
+    async def paginate_results(self, query: str, envelope: Dict, page_size: int) -> Dict:
+        """검색 결과(후보 풀)를 커서 스냅샷으로 저장하고 첫 페이지 반환
+        
+        스트리밍 검색(search_all_sources_stream)을 깊은 풀로 실행한 호출자도 사용합니다.
+        """
+        return await self.cursor_store.create(query, envelope, page_size)
+    
+    async def search_all_sources_stream(
+        self,
+        query: str,
+        max_per_source: int = 5,
+        use_semantic: bool = True,
+        use_pubmed: bool = True,
+        timeout: Optional[float] = None,
+        pubmed_grace: Optional[float] = None,
+        use_cache: bool = True,
+        filters: Optional[Dict[str, Any]] = None,
+        pubmed_depth: str = "full"
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """스트리밍 통합 검색 - 소스가 끝나는 즉시 결과 전달
+        
+        캐시 적중 시 (fresh/stale) 백엔드를 호출하지 않고 캐시된 결과를 즉시 전달하며,
+        stale이면 백그라운드에서 만료된 소스만 갱신합니다.
+        정확 일치 캐시 미스여도 임베딩이 충분히 가까운 이전 쿼리가 있으면 그 결과를 재사용합니다
+        (cache_status: "semantic").
+        질문이 QA 데이터의 질문과 (정규화 후) 정확히 일치하면 해당 답변만 반환합니다
+        (search_method: "faq", 팬아웃 생략).
+        캐시 미스인 동일 요청이 동시에 들어오면 검색 1회를 공유합니다 (singleflight,
+        뒤늦게 합류한 요청은 먼저 시작한 요청의 timeout/pubmed_grace를 따름).
+        
+        Args:
+            timeout: 전체 데드라인 (초, 기본값: total_timeout, 0이면 무제한)
+            pubmed_grace: 로컬 소스가 모두 끝난 뒤 PubMed를 추가로 기다릴 최대 시간 (초)
+            use_cache: 결과 캐시 사용 여부
+            filters: 카테고리/데이터셋 필터 (search_all_sources 참고)
+            pubmed_depth: PubMed 상세 정보 수준 (search_all_sources 참고)
+        
+        Yields:
+            ("qa", [...]), ("papers", [...]), ("pubmed", [...])  # 완료 순서대로
+            ("merged", {...})  # 마지막: search_all_sources와 동일한 결과 구조
+        """
+        if pubmed_depth not in FETCH_DEPTHS:
+            raise ValueError(f"지원하지 않는 pubmed_depth: {pubmed_depth} ({' | '.join(FETCH_DEPTHS)})")
+        
         await self.initialize()
         
-        tasks = []
+        # 빈 필터 값 제거 (캐시 키 일관성)
+        filters = {k: v for k, v in (filters or {}).items() if v not in (None, "", [])} or None
+        
+        params = {
+            "max_per_source": max_per_source,
+            "use_semantic": use_semantic,
+            "use_pubmed": use_pubmed,
+            "filters": filters,
+            "pubmed_depth": pubmed_depth,
+        }
+        
+        # 1. 캐시 조회
+        cache_key = None
+        if use_cache and self.result_cache is not None:
+            cache_key = make_cache_key(query, **params)
+            entry = await self.result_cache.get(cache_key)
+            status = self.result_cache.freshness(entry)
+            self.result_cache.record(status)
+            
+            if status != "expired":
+                if status == "stale":
+                    self._schedule_refresh(cache_key, query, params, self.result_cache.expired_sources(entry))
+                
+                envelope = self._dedupe_papers({**entry["envelope"], "cache_status": status})
+                for source, result_key in self.SOURCE_RESULT_KEYS.items():
+                    yield source, envelope.get(result_key, [])
+                yield "merged", envelope
+                return
+        
+        # 2. FAQ 정확 일치 - 큐레이션된 답변이 있으면 팬아웃 없이 즉시 반환
+        if self.faq_fast_path:
+            try:
+                faq = await self.mongo.find_faq(query, filters)
+            except Exception as e:
+                faq = None
+                print(f"⚠️ FAQ 조회 오류: {e}")
+            
+            if faq is not None:
+                print(f"⚡ FAQ {faq['faq_match']} 일치 - 통합 검색 생략")
+                envelope = {
+                    **{result_key: [] for result_key in self.SOURCE_RESULT_KEYS.values()},
+                    "qa_results": [faq],
+                    "search_method": "faq",
+                    "degraded": False,
+                    "degraded_sources": [],
+                    "duplicates_removed": 0,
+                    "cache_status": "miss",
+                    "faq_match": faq["faq_match"]
+                }
+                for source, result_key in self.SOURCE_RESULT_KEYS.items():
+                    yield source, envelope[result_key]
+                yield "merged", envelope
+                return
+        
+        # 3. 유사 쿼리 캐시 조회 (임베딩은 캐시되어 시맨틱 검색 레그에서 재사용)
+        query_embedding = None
+        params_key = make_cache_key("", **params)
+        if use_cache and self.semantic_cache is not None:
+            try:
+                query_embedding = await self.vector_db.embed_query(query)
+            except Exception as e:
+                print(f"⚠️ 유사 쿼리 캐시 임베딩 오류: {e}")
+            
+            if query_embedding is not None:
+                hit = self.semantic_cache.lookup(query_embedding, params_key, query=query)
+                if hit is not None:
+                    envelope, similarity, matched_query = hit
+                    envelope = {
+                        **envelope,
+                        "cache_status": "semantic",
+                        "semantic_match": {"query": matched_query, "similarity": similarity}
+                    }
+                    for source, result_key in self.SOURCE_RESULT_KEYS.items():
+                        yield source, envelope.get(result_key, [])
+                    yield "merged", envelope
+                    return
+        
+        # 4. 캐시 미스 - 실제 검색 (진행 중인 동일 요청이 있으면 그 결과 공유)
+        flight_key = cache_key or make_cache_key(query, **params)
+        async for source, results in self.singleflight.stream(
+            flight_key,
+            lambda: self._search_and_cache(
+                cache_key, query, params, timeout, pubmed_grace,
+                query_embedding=query_embedding, params_key=params_key
+            )
+        ):
+            if source == "merged":
+                results = {**results, "cache_status": "miss"}
+            yield source, results
+    
+    async def _search_and_cache(
+        self,
+        cache_key: Optional[str],
+        query: str,
+        params: Dict,
+        timeout: Optional[float],
+        pubmed_grace: Optional[float],
+        query_embedding: Optional[List[float]] = None,
+        params_key: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """실제 검색 후 결과 캐시 저장 (degraded 결과는 캐시하지 않음)"""
+        async for source, results in self._stream_sources(query, **params, timeout=timeout, pubmed_grace=pubmed_grace):
+            if source == "merged" and not results["degraded"]:
+                if cache_key is not None:
+                    await self.result_cache.set(cache_key, results)
+                if query_embedding is not None and self.semantic_cache is not None:
+                    searched = [
+                        result_key for source_name, result_key in self.SOURCE_RESULT_KEYS.items()
+                        if source_name != "pubmed" or params["use_pubmed"]
+                    ]
+                    self.semantic_cache.put(query, query_embedding, params_key, results, sources=searched)
+            yield source, results
+    
+    async def _stream_sources(
+        self,
+        query: str,
+        max_per_source: int,
+        use_semantic: bool,
+        use_pubmed: bool,
+        timeout: Optional[float] = None,
+        pubmed_grace: Optional[float] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        pubmed_depth: str = "full"
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """소스별 검색 실행 (캐시 미사용) - search_all_sources_stream 참고"""
+        degraded: List[str] = []
+        legs, shared_tasks = self._build_legs(
+            query, max_per_source, use_semantic, use_pubmed, degraded, filters, pubmed_depth
+        )
+        
+        loop = asyncio.get_running_loop()
+        timeout = timeout if timeout is not None else self.total_timeout
+        deadline = loop.time() + timeout if timeout else None  # 0 / None이면 무제한
+        
+        tasks = {asyncio.ensure_future(leg): name for name, leg in legs.items()}
+        pending = set(tasks)
+        results: Dict[str, List[Dict]] = {}
+        
+        try:
+            while pending:
+                remaining = None if deadline is None else max(0.0, deadline - loop.time())
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=remaining,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                if not done:
+                    break  # 전체 데드라인 초과
+                
+                for task in done:
+                    name = tasks[task]
+                    if task.exception() is not None:
+                        degraded.append(name)
+                        print(f"⚠️ {name} 검색 오류: {task.exception()}")
+                        results[name] = []
+                    else:
+                        results[name] = task.result()
+                    
+                    yield name, results[name]
+                
+                # 로컬 소스가 모두 끝나면 PubMed는 grace 시간까지만 대기
+                if pubmed_grace is not None and pending and all(tasks[t] == "pubmed" for t in pending):
+                    grace_deadline = loop.time() + pubmed_grace
+                    deadline = grace_deadline if deadline is None else min(deadline, grace_deadline)
+            
+            for task in pending:
+                degraded.append(tasks[task])
+                print(f"⏱️ {tasks[task]} 데드라인 초과 - 결과 제외")
+        
+        finally:
+            # 데드라인 초과 또는 소비자가 중간에 중단한 경우 남은 작업 정리
+            for task in pending:
+                task.cancel()
+            for task in shared_tasks:
+                if not task.done():
+                    task.cancel()
+        
+        envelope = {
+            **{
+                result_key: results.get(source, [])
+                for source, result_key in self.SOURCE_RESULT_KEYS.items()
+            },
+            "search_method": "hybrid" if use_semantic else "keyword",
+            "degraded": bool(degraded),
+            "degraded_sources": degraded,
+            "duplicates_removed": 0
+        }
+        
+        yield "merged", self._dedupe_papers(envelope)
+    
+    def _dedupe_papers(self, envelope: Dict) -> Dict:
+        """같은 논문이 로컬 논문과 PubMed에 모두 있으면 풍부한 레코드 하나만 유지 (프롬프트 중복 방지)
+        
+        이미 중복 제거된 결과에 다시 적용해도 변화 없음 (캐시 적중 시에도 적용 →
+        PubMed만 백그라운드 갱신된 캐시 항목도 처리).
+        """
+        if not self.dedup_papers:
+            return envelope
+        
+        papers, pubmed, removed = dedupe_papers(envelope.get("paper_results", []), envelope.get("pubmed_results", []))
+        if removed:
+            print(f"🔗 논문 중복 {removed}개 제거 (DOI/PMID)")
+        
+        return {
+            **envelope,
+            "paper_results": papers,
+            "pubmed_results": pubmed,
+            "duplicates_removed": envelope.get("duplicates_removed", 0) + removed
+        }
+    
+    # ==================== 캐시 백그라운드 갱신 ====================
+    
+    def _schedule_refresh(self, cache_key: str, query: str, params: Dict, expired_sources: List[str]):
+        """stale 캐시 갱신 예약 (키당 동시에 1개만)"""
+        if cache_key in self._refreshing:
+            return
+        
+        self._refreshing.add(cache_key)
+        task = asyncio.ensure_future(self._refresh_cache(cache_key, query, params, expired_sources))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+        task.add_done_callback(lambda _: self._refreshing.discard(cache_key))
+    
+    async def _refresh_cache(self, cache_key: str, query: str, params: Dict, expired_sources: List[str]):
+        """만료된 소스만 다시 검색해 캐시 갱신"""
+        self.result_cache.stats["refreshes"] += 1
+        
+        try:
+            # PubMed만 만료 (TTL이 가장 짧아 가장 흔한 경우) → PubMed 레그만 재실행
+            if set(expired_sources) <= {"pubmed_results"}:
+                pubmed_results = []
+                if params["use_pubmed"]:
+                    degraded = []
+                    pubmed_results = await self._run_leg(
+                        "pubmed",
+                        self.pubmed.search_papers(
+                            query, params["max_per_source"], fetch_depth=params["pubmed_depth"]
+                        ),
+                        degraded,
+                        timeout=self.pubmed_timeout
+                    )
+                    if degraded:
+                        return
+                
+                await self.result_cache.set(
+                    cache_key,
+                    {"pubmed_results": pubmed_results},
+                    sources=["pubmed_results"]
+                )
+                return
+            
+            async for source, results in self._stream_sources(query, **params):
+                if source == "merged" and not results["degraded"]:
+                    await self.result_cache.set(cache_key, results)
+        
+        except Exception as e:
+            print(f"⚠️ 캐시 갱신 오류: {e}")
+    
+    def _build_legs(
+        self,
+        query: str,
+        max_per_source: int,
+        use_semantic: bool,
+        use_pubmed: bool,
+        degraded: List[str],
+        filters: Optional[Dict[str, Any]] = None,
+        pubmed_depth: str = "full"
+    ) -> Tuple[Dict[str, Any], List[asyncio.Future]]:
+        """소스별 검색 코루틴 구성
+        
+        Returns:
+            ({"qa": coro, "papers": coro, "pubmed": coro}, 공유 태스크 리스트 (정리용))
+        """
+        legs = {}
+        shared_tasks = []
+        namespaces = ["qa", "papers"]
+        
+        # 0-1. 시맨틱 검색 - 쿼리 임베딩 1회 계산 후 모든 namespace에 병렬 조회
+        semantic_task = None
+        if use_semantic:
+            semantic_task = asyncio.ensure_future(
+                self._semantic_search_all(query, namespaces, max_per_source, filters)
+            )
+            shared_tasks.append(semantic_task)
+        
+        # 0-2. 키워드 검색 - 모든 컬렉션을 집계 1회로 조회 ($unionWith)
+        keyword_task = None
+        if self.union_keyword_search:
+            keyword_task = asyncio.ensure_future(
+                self.mongo.search_all_collections(
+                    query,
+                    {self.NAMESPACE_COLLECTIONS[ns]: max_per_source for ns in namespaces},
+                    filters=filters
+                )
+            )
+            shared_tasks.append(keyword_task)
         
         # 1. QA 검색 (키워드 + 의미)
         if use_semantic:
-            tasks.append(self._hybrid_qa_search(query, max_per_source))
+            legs["qa"] = self._hybrid_qa_search(query, max_per_source, semantic_task, degraded, keyword_task, filters)
         else:
-            tasks.append(self._keyword_qa_search(query, max_per_source))
+            legs["qa"] = self._run_leg(
+                "qa.keyword",
+                self._get_keyword_results(query, max_per_source, "qa", self._keyword_qa_search, keyword_task, filters),
+                degraded
+            )
         
         # 2. 논문 검색 (키워드 + 의미)
         if use_semantic:
-            tasks.append(self._hybrid_paper_search(query, max_per_source))
+            legs["papers"] = self._hybrid_paper_search(query, max_per_source, semantic_task, degraded, keyword_task, filters)
         else:
-            tasks.append(self._keyword_paper_search(query, max_per_source))
+            legs["papers"] = self._run_leg(
+                "papers.keyword",
+                self._get_keyword_results(query, max_per_source, "papers", self._keyword_paper_search, keyword_task, filters),
+                degraded
+            )
         
-        # # 3. 의료 데이터 검색
+        # # 3. 의료 데이터 검색 (활성화 시 namespaces에 "medical" 추가)
         # if use_semantic:
-        #     tasks.append(self._hybrid_medical_search(query, max_per_source))
+        #     legs["medical"] = self._hybrid_medical_search(query, max_per_source, semantic_task, degraded, keyword_task, filters)
         # else:
-        #     tasks.append(self._keyword_medical_search(query, max_per_source))
+        #     legs["medical"] = self._run_leg("medical.keyword", self._keyword_medical_search(query, max_per_source), degraded)
 
-        # 4. PubMed 검색 (선택적)
+        # 4. PubMed 검색 (선택적) - 로컬 결과를 붙잡지 않도록 별도 데드라인
         if use_pubmed:
-            tasks.append(self.pubmed.search_papers(query, max_per_source))
-        else:
-            tasks.append(asyncio.create_task(self._dummy_task()))
-
-        # 병렬 실행
-        results = await asyncio.gather(*tasks)
-
-        return {
-            "qa_results": results[0],
-            "paper_results": results[1],
-            "medical_results": [],  # Medical search is commented out, return empty list
-            "pubmed_results": results[2] if use_pubmed else [],  # Fixed: PubMed is at index 2, not 3
-            "search_method": "hybrid" if use_semantic else "keyword"
-        }
+            legs["pubmed"] = self._run_leg(
+                "pubmed",
+                self.pubmed.search_papers(query, max_per_source, fetch_depth=pubmed_depth),
+                degraded,
+                timeout=self.pubmed_timeout
+            )
+        
+        return legs, shared_tasks
+    
+    # ==================== 레그 실행 (데드라인) ====================
     
-    async def _dummy_task(self):
-        """더미 태스크"""
+    async def _run_leg(
+        self,
+        name: str,
+        awaitable,
+        degraded: List[str],
+        timeout: Any = LEG_TIMEOUT
+    ) -> List[Dict]:
+        """단일 검색 레그 실행 - 데드라인 초과/오류 시 빈 결과 + degraded 기록
+        
+        timeout을 생략하면 leg_timeout, None이면 데드라인 없음 (PUBMED_TIMEOUT=0 등)
+        """
+        if timeout is LEG_TIMEOUT:
+            timeout = self.leg_timeout
+        
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            print(f"⏱️ {name} 데드라인 초과 ({timeout}s) - 부분 결과로 진행")
+        except Exception as e:
+            print(f"⚠️ {name} 검색 오류: {e}")
+        
+        degraded.append(name)
         return []
     
     # ==================== 하이브리드 검색 (키워드 + 시맨틱) ====================
     
-    async def _hybrid_qa_search(self, query: str, limit: int) -> List[Dict]:
-        """QA 하이브리드 검색"""
+    async def _semantic_search_all(
+        self,
+        query: str,
+        namespaces: List[str],
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, List[Dict]]:
+        """쿼리 임베딩 1회 → 여러 namespace 병렬 검색 (필터는 벡터 메타데이터 필터로 전달)"""
+        query_embedding = await self.vector_db.embed_query(query)
+        return await self.vector_db.semantic_search_multi(
+            query_embedding,
+            namespaces=namespaces,
+            top_k=top_k,
+            filters={
+                ns: self.mongo.build_filter(self.NAMESPACE_COLLECTIONS[ns], filters)
+                for ns in namespaces
+            }
+        )
+    
+    async def _get_semantic_matches(
+        self,
+        query: str,
+        limit: int,
+        namespace: str,
+        semantic_task: Optional[asyncio.Future] = None
+    ) -> List[Dict]:
+        """공유 멀티 namespace 검색 결과 사용 (없으면 단독 검색)"""
+        if semantic_task is not None:
+            # 한 레그의 데드라인 초과가 공유 태스크를 취소하지 않도록 shield
+            results = await asyncio.shield(semantic_task)
+            return results.get(namespace, [])
+        
+        return await self.vector_db.semantic_search(query, top_k=limit, namespace=namespace)
+    
+    async def _get_keyword_results(
+        self,
+        query: str,
+        limit: int,
+        namespace: str,
+        keyword_search,
+        keyword_task: Optional[asyncio.Future] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict]:
+        """공유 통합 키워드 검색 결과 사용 (없으면 단독 검색)"""
+        if keyword_task is not None:
+            # 한 레그의 데드라인 초과가 공유 태스크를 취소하지 않도록 shield
+            results = await asyncio.shield(keyword_task)
+            return results.get(self.NAMESPACE_COLLECTIONS[namespace], [])
         
-        # 1. 키워드 검색 (MongoDB)
-        keyword_results = await self.mongo.search_qa(query, limit=limit)
+        return await keyword_search(query, limit=limit, filters=filters)
+    
+    async def _hybrid_search(
+        self,
+        query: str,
+        limit: int,
+        namespace: str,
+        keyword_search,
+        semantic_task: Optional[asyncio.Future] = None,
+        degraded: Optional[List[str]] = None,
+        keyword_task: Optional[asyncio.Future] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict]:
+        """키워드 레그와 시맨틱 레그를 동시에 실행 후 병합"""
+        if degraded is None:
+            degraded = []
         
-        # 2. 시맨틱 검색 (Pinecone)
-        semantic_matches = await self.vector_db.semantic_search(
-            query, 
-            top_k=limit, 
-            namespace="qa"
+        # 1. 키워드 검색 (MongoDB) + 2. 시맨틱 검색 (Pinecone) - 동시 실행, 레그별 데드라인
+        keyword_results, semantic_matches = await asyncio.gather(
+            self._run_leg(
+                f"{namespace}.keyword",
+                self._get_keyword_results(query, limit, namespace, keyword_search, keyword_task, filters),
+                degraded
+            ),
+            self._run_leg(
+                f"{namespace}.semantic",
+                self._get_semantic_matches(query, limit, namespace, semantic_task),
+                degraded
+            )
         )
         
         # 3. 결과 병합 (중복 제거 + 점수 조합)
         merged = self._merge_results(keyword_results, semantic_matches, limit)
         
-        return merged
+        # 4. 시맨틱 전용 결과는 MongoDB에서 원문 조회
+        return await self._hydrate_results(merged, namespace)
     
-    async def _hybrid_paper_search(self, query: str, limit: int) -> List[Dict]:
+    async def _hybrid_qa_search(
+        self,
+        query: str,
+        limit: int,
+        semantic_task: Optional[asyncio.Future] = None,
+        degraded: Optional[List[str]] = None,
+        keyword_task: Optional[asyncio.Future] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict]:
+        """QA 하이브리드 검색"""
+        return await self._hybrid_search(
+            query, limit, "qa", self.mongo.search_qa, semantic_task, degraded, keyword_task, filters
+        )
+    
+    async def _hybrid_paper_search(
+        self,
+        query: str,
+        limit: int,
+        semantic_task: Optional[asyncio.Future] = None,
+        degraded: Optional[List[str]] = None,
+        keyword_task: Optional[asyncio.Future] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict]:
         """논문 하이브리드 검색"""
-        
-        # 1. 키워드 검색
-        keyword_results = await self.mongo.search_papers(query, limit=limit)
-        
-        # 2. 시맨틱 검색
-        semantic_matches = await self.vector_db.semantic_search(
-            query,
-            top_k=limit,
-            namespace="papers"
+        return await self._hybrid_search(
+            query, limit, "papers", self.mongo.search_papers, semantic_task, degraded, keyword_task, filters
         )
-        
-        # 3. 병합
-        merged = self._merge_results(keyword_results, semantic_matches, limit)
-        
-        return merged
     
-    async def _hybrid_medical_search(self, query: str, limit: int) -> List[Dict]:
+    async def _hybrid_medical_search(
+        self,
+        query: str,
+        limit: int,
+        semantic_task: Optional[asyncio.Future] = None,
+        degraded: Optional[List[str]] = None,
+        keyword_task: Optional[asyncio.Future] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict]:
         """의료 데이터 하이브리드 검색"""
-        
-        keyword_results = await self.mongo.search_medical(query, limit=limit)
-        semantic_matches = await self.vector_db.semantic_search(
-            query,
-            top_k=limit,
-            namespace="medical"
+        return await self._hybrid_search(
+            query, limit, "medical", self.mongo.search_medical, semantic_task, degraded, keyword_task, filters
         )
-        
-        merged = self._merge_results(keyword_results, semantic_matches, limit)
-        
-        return merged
     
     # ==================== 키워드 검색 (폴백) ====================
     
-    async def _keyword_qa_search(self, query: str, limit: int) -> List[Dict]:
-        return await self.mongo.search_qa(query, limit=limit)
+    async def _keyword_qa_search(self, query: str, limit: int, filters: Optional[Dict] = None) -> List[Dict]:
+        return await self.mongo.search_qa(query, limit=limit, filters=filters)
     
-    async def _keyword_paper_search(self, query: str, limit: int) -> List[Dict]:
-        return await self.mongo.search_papers(query, limit=limit)
+    async def _keyword_paper_search(self, query: str, limit: int, filters: Optional[Dict] = None) -> List[Dict]:
+        return await self.mongo.search_papers(query, limit=limit, filters=filters)
     
-    async def _keyword_medical_search(self, query: str, limit: int) -> List[Dict]:
-        return await self.mongo.search_medical(query, limit=limit)
+    async def _keyword_medical_search(self, query: str, limit: int, filters: Optional[Dict] = None) -> List[Dict]:
+        return await self.mongo.search_medical(query, limit=limit, filters=filters)
     
     # ==================== 결과 병합 로직 ====================
     
@@ -172,59 +797,69 @@ class HybridSearchEngine:
     ) -> List[Dict]:
         """키워드 + 시맨틱 결과 병합
         
-        전략:
+        전략 (search/fusion.py, 점수는 배열로 일괄 계산):
         1. ID 기반 중복 제거
-        2. 점수 조합 (keyword_score * 0.4 + semantic_score * 0.6)
-        3. 상위 limit개 반환
+        2. 점수 조합 (fusion_strategy: weighted = keyword_score * keyword_weight + semantic_score * (1 - keyword_weight) | max_norm | rrf)
+        3. 상위 limit개 반환 (전체 정렬 없이 argpartition)
         """
+        # ID → 문서 (키워드 결과 원문 우선, 시맨틱 전용은 메타데이터 또는 ID 자리표시자
+        # → ids 모드는 _hydrate_results에서 조회)
+        documents = {match["id"]: match["metadata"] or {"_id": match["id"]} for match in semantic_matches}
+        keyword_ids = [str(r.get("_id", "")) for r in keyword_results]
+        documents.update(zip(keyword_ids, keyword_results))
         
-        # ID → 문서 매핑
-        merged_dict = {}
+        top_ids, _ = fuse(
+            keyword_ids,
+            [r.get("score", 0) for r in keyword_results],
+            [match["id"] for match in semantic_matches],
+            [match["score"] for match in semantic_matches],  # 코사인 유사도 (0~1)
+            limit,
+            strategy=self.fusion_strategy,
+            keyword_weight=self.keyword_weight
+        )
         
-        # 1. 키워드 결과 (MongoDB textScore 정규화)
-        max_keyword_score = max([r.get("score", 0) for r in keyword_results], default=1.0)
+        return [documents[doc_id] for doc_id in top_ids]
+    
+    async def _hydrate_results(self, results: List[Dict], namespace: str) -> List[Dict]:
+        """ID만 있는 결과를 MongoDB 원문으로 교체 (최종 top-k만, 컬렉션당 $in 쿼리 1회)"""
+        missing_ids = [
+            str(r["_id"]) for r in results
+            if r.keys() == {"_id"}
+        ]
         
-        for r in keyword_results:
-            doc_id = str(r.get("_id", ""))
-            normalized_score = r.get("score", 0) / max_keyword_score if max_keyword_score > 0 else 0
-            
-            merged_dict[doc_id] = {
-                "data": r,
-                "keyword_score": normalized_score,
-                "semantic_score": 0.0
-            }
+        if not missing_ids:
+            return results
         
-        # 2. 시맨틱 결과 (Pinecone 코사인 유사도)
-        for match in semantic_matches:
-            doc_id = match["id"]
-            semantic_score = match["score"]  # 이미 0~1 범위
-            
-            if doc_id in merged_dict:
-                # 기존 문서 - 점수 업데이트
-                merged_dict[doc_id]["semantic_score"] = semantic_score
+        documents = await self.mongo.get_documents_by_ids(
+            self.NAMESPACE_COLLECTIONS[namespace],
+            missing_ids
+        )
+        
+        hydrated = []
+        for r in results:
+            if r.keys() == {"_id"}:
+                doc = documents.get(str(r["_id"]))
+                if doc is None:
+                    continue  # 벡터에는 있지만 MongoDB에서 삭제된 문서
+                hydrated.append(doc)
             else:
-                # 새 문서 - 추가
-                merged_dict[doc_id] = {
-                    "data": match["metadata"],
-                    "keyword_score": 0.0,
-                    "semantic_score": semantic_score
-                }
+                hydrated.append(r)
         
-        # 3. 최종 점수 계산 (가중 평균)
-        for doc_id, info in merged_dict.items():
-            info["final_score"] = (
-                info["keyword_score"] * 0.4 + 
-                info["semantic_score"] * 0.6
-            )
+        return hydrated
+    
+    async def get_full_documents(self, source: str, ids: List[str]) -> Dict[str, Dict]:
+        """검색 결과 원문 전체 조회 (preview 모드 결과의 상세 보기용)
         
-        # 4. 정렬 및 반환
-        sorted_results = sorted(
-            merged_dict.values(),
-            key=lambda x: x["final_score"],
-            reverse=True
+        Args:
+            source: qa, papers, medical
+            ids: 검색 결과의 _id 리스트
+        """
+        await self.initialize()
+        return await self.mongo.get_documents_by_ids(
+            self.NAMESPACE_COLLECTIONS[source],
+            [str(i) for i in ids],
+            full=True
         )
-        
-        return [r["data"] for r in sorted_results[:limit]]
 
 
 # ==================== 테스트 ====================
@@ -0,0 +1,167 @@
+"""
+커서 기반 페이지네이션 (연구자 "더 보여줘" 요청)
+- 첫 검색에서 깊은 후보 풀(소스별 pool_size개)을 한 번만 가져와 융합 순위 그대로 스냅샷 저장
+- 다음 페이지는 불투명 커서(스냅샷 ID + 오프셋)로 스냅샷에서 잘라 반환 → 백엔드 재호출 없음
+- 스냅샷 저장소는 결과 캐시와 같은 백엔드 사용 (memory | redis, redis면 워커 간 커서 공유)
+"""
+
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import base64
+import binascii
+import json
+import secrets
+from typing import Dict, Optional, Tuple
+
+from search.result_cache import SOURCE_KEYS, InMemoryCacheBackend, RedisCacheBackend
+
+
+def encode_cursor(snapshot_id: str, offset: int) -> str:
+    """스냅샷 ID + 오프셋 → 불투명 커서 문자열"""
+    payload = json.dumps({"s": snapshot_id, "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """커서 문자열 → (스냅샷 ID, 오프셋)
+
+    Raises:
+        ValueError: 형식이 잘못된 커서
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        snapshot_id, offset = str(payload["s"]), int(payload["o"])
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"잘못된 커서: {cursor!r}") from e
+
+    if offset < 0:
+        raise ValueError(f"잘못된 커서: {cursor!r}")
+    return snapshot_id, offset
+
+
+class CursorStore:
+    """후보 풀 스냅샷 저장소 (TTL 만료)
+
+    사용 예:
+        store = CursorStore(InMemoryCacheBackend(500), ttl_seconds=900)
+        page = await store.create(query, envelope, page_size=10)   # 첫 페이지 + next_cursor
+        page = await store.next_page(page["next_cursor"])          # 다음 페이지
+    """
+
+    def __init__(self, backend, ttl_seconds: float = 900):
+        """
+        Args:
+            backend: InMemoryCacheBackend 또는 RedisCacheBackend
+            ttl_seconds: 커서(스냅샷) 유효 시간 (초)
+        """
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+
+        self.stats = {
+            "snapshots": 0,
+            "pages_served": 0,
+            "expired": 0,
+        }
+
+    @staticmethod
+    def _key(snapshot_id: str) -> str:
+        return "cursor:" + snapshot_id
+
+    @staticmethod
+    def paginate(envelope: Dict, offset: int, page_size: int) -> Dict:
+        """소스별 결과 목록을 [offset, offset + page_size) 구간으로 자른 envelope"""
+        page = {
+            field: value for field, value in envelope.items()
+            if field not in SOURCE_KEYS
+        }
+        for source in SOURCE_KEYS:
+            page[source] = envelope.get(source, [])[offset:offset + page_size]
+        return page
+
+    async def create(self, query: str, envelope: Dict, page_size: int) -> Dict:
+        """후보 풀 스냅샷 저장 후 첫 페이지 반환
+
+        남은 결과가 없으면 스냅샷을 저장하지 않습니다 (next_cursor: None).
+        """
+        pool_sizes = {source: len(envelope.get(source, [])) for source in SOURCE_KEYS}
+        snapshot = {
+            "query": query,
+            "page_size": page_size,
+            "envelope": {
+                field: value for field, value in envelope.items()
+                if field not in ("cache_status", "semantic_match")
+            },
+        }
+
+        next_cursor = None
+        if max(pool_sizes.values()) > page_size:
+            snapshot_id = secrets.token_urlsafe(12)
+            await self.backend.set(self._key(snapshot_id), snapshot, ttl=self.ttl_seconds)
+            next_cursor = encode_cursor(snapshot_id, page_size)
+            self.stats["snapshots"] += 1
+
+        return {
+            **self.paginate(envelope, 0, page_size),
+            "page": 1,
+            "pool_sizes": pool_sizes,
+            "next_cursor": next_cursor,
+        }
+
+    async def next_page(self, cursor: str) -> Dict:
+        """커서 위치의 페이지를 스냅샷에서 반환 (백엔드 검색 없음)
+
+        Raises:
+            ValueError: 잘못되었거나 만료된 커서
+        """
+        snapshot_id, offset = decode_cursor(cursor)
+
+        snapshot = await self.backend.get(self._key(snapshot_id))
+        if snapshot is None:
+            self.stats["expired"] += 1
+            raise ValueError("만료되었거나 존재하지 않는 커서입니다. 새로 검색해주세요.")
+
+        envelope = snapshot["envelope"]
+        page_size = snapshot["page_size"]
+        pool_sizes = {source: len(envelope.get(source, [])) for source in SOURCE_KEYS}
+
+        next_offset = offset + page_size
+        next_cursor = (
+            encode_cursor(snapshot_id, next_offset)
+            if max(pool_sizes.values()) > next_offset else None
+        )
+        self.stats["pages_served"] += 1
+
+        return {
+            **self.paginate(envelope, offset, page_size),
+            "query": snapshot["query"],
+            "cache_status": "cursor",
+            "page": offset // page_size + 1,
+            "pool_sizes": pool_sizes,
+            "next_cursor": next_cursor,
+        }
+
+    def get_stats(self) -> Dict:
+        return dict(self.stats)
+
+
+def create_cursor_store(
+    backend: str = "memory",
+    url: Optional[str] = None,
+    max_size: int = 500,
+    ttl_seconds: float = 900
+) -> CursorStore:
+    """설정값으로 커서 저장소 생성 (결과 캐시가 none이어도 인프로세스 저장소 사용)"""
+    backend = backend.lower()
+
+    if backend == "redis":
+        store_backend = RedisCacheBackend(url or "redis://localhost:6379/0")
+    else:
+        store_backend = InMemoryCacheBackend(max_size=max_size)
+
+    return CursorStore(store_backend, ttl_seconds=ttl_seconds)
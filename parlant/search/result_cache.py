@@ -0,0 +1,233 @@
+"""
+검색 결과 캐시 (search_all_sources 전체 응답)
+- 키: 정규화된 쿼리 + 검색 파라미터 (max_per_source, use_semantic, use_pubmed)
+- 소스별 TTL: 로컬 소스는 길게, PubMed는 짧게
+- stale-while-revalidate: 만료 후 stale_seconds 동안은 캐시를 즉시 반환하고 백그라운드에서 갱신
+- 백엔드: 인프로세스 LRU (기본값) 또는 Redis (여러 챗봇 워커가 캐시 공유)
+"""
+
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import copy
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from database.embedding_cache import normalize_text
+
+# 캐시 대상 소스 키 (search_all_sources 결과 구조)
+SOURCE_KEYS = ("qa_results", "paper_results", "medical_results", "pubmed_results")
+
+
+def make_cache_key(query: str, **params) -> str:
+    """정규화된 쿼리 + 파라미터 → 캐시 키"""
+    payload = json.dumps(
+        {"query": normalize_text(query), **params},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return "search:" + hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+# ==================== 백엔드 ====================
+
+class InMemoryCacheBackend:
+    """인프로세스 LRU 백엔드 (크기 제한 + 항목별 만료)"""
+
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Dict]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at is not None and time.time() > expires_at:
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        # 호출자가 결과를 수정해도 캐시가 오염되지 않도록 복사본 반환
+        return copy.deepcopy(value)
+
+    async def set(self, key: str, value: Dict, ttl: Optional[float] = None):
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.time() + ttl if ttl else None
+        self._data[key] = (expires_at, copy.deepcopy(value))
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    async def delete(self, key: str):
+        self._data.pop(key, None)
+
+    async def clear(self):
+        self._data.clear()
+
+
+class RedisCacheBackend:
+    """Redis 공유 백엔드 (챗봇 워커 간 캐시 공유)
+
+    ObjectId 등 JSON 비호환 값은 문자열로 저장됩니다.
+    """
+
+    def __init__(self, url: str, prefix: str = "careguide:"):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Dict]:
+        raw = await self.client.get(self.prefix + key)
+        return json.loads(raw) if raw else None
+
+    async def set(self, key: str, value: Dict, ttl: Optional[float] = None):
+        raw = json.dumps(value, ensure_ascii=False, default=str)
+        await self.client.set(self.prefix + key, raw, ex=int(ttl) if ttl else None)
+
+    async def delete(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+    async def clear(self):
+        async for key in self.client.scan_iter(match=self.prefix + "search:*"):
+            await self.client.delete(key)
+
+
+# ==================== 결과 캐시 ====================
+
+class SearchResultCache:
+    """소스별 TTL + stale-while-revalidate 결과 캐시
+
+    사용 예:
+        cache = SearchResultCache(InMemoryCacheBackend(1000), source_ttls={...})
+        entry = await cache.get(key)
+        status = cache.freshness(entry)   # "fresh" | "stale" | "expired"
+    """
+
+    def __init__(
+        self,
+        backend,
+        default_ttl: float = 3600,
+        source_ttls: Optional[Dict[str, float]] = None,
+        stale_seconds: float = 600
+    ):
+        """
+        Args:
+            backend: InMemoryCacheBackend 또는 RedisCacheBackend
+            default_ttl: 소스별 TTL 미지정 시 기본 TTL (초)
+            source_ttls: {"pubmed_results": 300, ...}
+            stale_seconds: 만료 후에도 캐시를 반환하며 백그라운드 갱신하는 시간 (초)
+        """
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.source_ttls = source_ttls or {}
+        self.stale_seconds = stale_seconds
+
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+        }
+
+    def ttl_for(self, source: str) -> float:
+        return self.source_ttls.get(source, self.default_ttl)
+
+    async def get(self, key: str) -> Optional[Dict]:
+        return await self.backend.get(key)
+
+    async def set(self, key: str, envelope: Dict, sources: Optional[List[str]] = None):
+        """결과 저장 (sources 지정 시 해당 소스만 저장 시각 갱신)"""
+        now = time.time()
+        entry = await self.backend.get(key) if sources else None
+
+        if entry is None:
+            entry = {"envelope": {}, "stored_at": {}}
+
+        for source in sources or SOURCE_KEYS:
+            entry["envelope"][source] = envelope.get(source, [])
+            entry["stored_at"][source] = now
+
+        for field, value in envelope.items():
+            if field not in SOURCE_KEYS:
+                entry["envelope"][field] = value
+
+        # 백엔드 보관 기간 = 가장 긴 소스 TTL + stale 구간
+        backend_ttl = max(self.ttl_for(s) for s in SOURCE_KEYS) + self.stale_seconds
+        await self.backend.set(key, entry, ttl=backend_ttl)
+
+    def expired_sources(self, entry: Dict) -> List[str]:
+        """TTL이 지난 소스 목록"""
+        now = time.time()
+        return [
+            source for source in SOURCE_KEYS
+            if now - entry["stored_at"].get(source, 0) > self.ttl_for(source)
+        ]
+
+    def freshness(self, entry: Optional[Dict]) -> str:
+        """fresh (그대로 사용) | stale (반환 + 백그라운드 갱신) | expired (재검색)"""
+        if entry is None:
+            return "expired"
+
+        now = time.time()
+        status = "fresh"
+        for source in SOURCE_KEYS:
+            age = now - entry["stored_at"].get(source, 0)
+            ttl = self.ttl_for(source)
+            if age > ttl + self.stale_seconds:
+                return "expired"
+            if age > ttl:
+                status = "stale"
+
+        return status
+
+    def record(self, status: str):
+        key = {"fresh": "hits", "stale": "stale_hits"}.get(status, "misses")
+        self.stats[key] += 1
+
+    def get_stats(self) -> Dict:
+        total = self.stats["hits"] + self.stats["stale_hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": (self.stats["hits"] + self.stats["stale_hits"]) / total if total else 0.0,
+        }
+
+
+def create_result_cache(
+    backend: str = "memory",
+    url: Optional[str] = None,
+    max_size: int = 1000,
+    default_ttl: float = 3600,
+    pubmed_ttl: float = 300,
+    stale_seconds: float = 600
+) -> Optional[SearchResultCache]:
+    """설정값으로 결과 캐시 생성 (backend="none"이면 None)"""
+    backend = backend.lower()
+
+    if backend == "none":
+        return None
+    if backend == "memory":
+        cache_backend = InMemoryCacheBackend(max_size=max_size)
+    elif backend == "redis":
+        cache_backend = RedisCacheBackend(url or "redis://localhost:6379/0")
+    else:
+        raise ValueError(f"지원하지 않는 캐시 백엔드: {backend} (memory | redis | none)")
+
+    return SearchResultCache(
+        cache_backend,
+        default_ttl=default_ttl,
+        source_ttls={"pubmed_results": pubmed_ttl},
+        stale_seconds=stale_seconds
+    )
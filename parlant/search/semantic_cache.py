@@ -0,0 +1,189 @@
+"""
+의미 기반 근사 중복 쿼리 캐시
+- 정확 일치 캐시가 놓치는 표현만 다른 질문 ("신부전 식단" vs "신장 기능 저하 식이요법") 처리
+- 쿼리 임베딩을 결과와 함께 저장하고, 새 쿼리와의 코사인 유사도가 임계값 이상이면 캐시 반환
+- VectorDBManager.embed_query 임베딩을 그대로 재사용 (추가 인코딩 없음)
+- 크기 제한 LRU + TTL, 적중 품질 로그 (매칭된 쿼리 / 유사도)
+- 소스별 TTL: 항목 유효 시간은 포함된 소스 중 가장 짧은 TTL로 제한
+  (PubMed 결과가 정확 일치 캐시의 RESULT_CACHE_PUBMED_TTL보다 오래 재사용되지 않도록)
+"""
+
+import copy
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticResultCache:
+    """임베딩 유사도 기반 결과 캐시
+
+    사용 예:
+        cache = SemanticResultCache(threshold=0.92, max_size=1000)
+        hit = cache.lookup(embedding, params_key)
+        if hit is None:
+            cache.put(query, embedding, params_key, envelope)
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        max_size: int = 1000,
+        ttl_seconds: Optional[float] = 600,
+        log_size: int = 200,
+        source_ttls: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            threshold: 캐시 적중 최소 코사인 유사도
+            max_size: 최대 항목 수 (초과 시 LRU 제거)
+            ttl_seconds: 항목 유효 시간 (None 또는 0이면 만료 없음)
+            log_size: 최근 적중 기록 보관 수 (품질 점검용)
+            source_ttls: 결과 키별 유효 시간 (예: {"pubmed_results": 300}) - 해당 소스를 검색한 항목은
+                ttl_seconds와 이 값 중 짧은 시간 후 만료
+        """
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds or None
+        self.source_ttls = {source: ttl for source, ttl in (source_ttls or {}).items() if ttl}
+
+        # key → {"query", "embedding", "params_key", "envelope", "stored_at", "ttl"}
+        self._entries: "OrderedDict[int, Dict]" = OrderedDict()
+        self._next_key = 0
+
+        # 유사도 계산용 행렬 (변경 시 지연 재구성)
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[int] = []
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.hit_log: deque = deque(maxlen=log_size)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _entry_ttl(self, sources: List[str]) -> Optional[float]:
+        """검색한 소스 기준 항목 유효 시간 (가장 짧은 TTL, 없으면 None)"""
+        ttls = [self.source_ttls[source] for source in sources if source in self.source_ttls]
+        if self.ttl_seconds:
+            ttls.append(self.ttl_seconds)
+        return min(ttls) if ttls else None
+
+    def _expire(self):
+        now = time.monotonic()
+        expired = [
+            key for key, entry in self._entries.items()
+            if entry["ttl"] is not None and now - entry["stored_at"] > entry["ttl"]
+        ]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+    def _ensure_matrix(self):
+        if self._matrix is None:
+            self._matrix_keys = list(self._entries)
+            self._matrix = (
+                np.stack([self._entries[key]["embedding"] for key in self._matrix_keys])
+                if self._matrix_keys else None
+            )
+
+    def lookup(self, embedding, params_key: str, query: str = "") -> Optional[Tuple[Dict, float, str]]:
+        """유사 쿼리 캐시 조회
+
+        Returns:
+            (envelope, 유사도, 매칭된 원래 쿼리) 또는 None
+        """
+        self._expire()
+        self._ensure_matrix()
+
+        if self._matrix is None:
+            self.misses += 1
+            return None
+
+        similarities = self._matrix @ self._normalize(embedding)
+
+        # 검색 파라미터가 다른 항목은 제외
+        for row, key in enumerate(self._matrix_keys):
+            if self._entries[key]["params_key"] != params_key:
+                similarities[row] = -1.0
+
+        best_row = int(np.argmax(similarities))
+        best_similarity = float(similarities[best_row])
+
+        if best_similarity < self.threshold:
+            self.misses += 1
+            return None
+
+        key = self._matrix_keys[best_row]
+        entry = self._entries[key]
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        # 적중 품질 로그 (임계값 조정 근거)
+        self.hit_log.append({
+            "query": query,
+            "matched_query": entry["query"],
+            "similarity": best_similarity,
+        })
+        print(f"🧠 유사 쿼리 캐시 적중: '{query}' ≈ '{entry['query']}' (유사도 {best_similarity:.3f})")
+
+        # 호출자가 결과를 수정해도 캐시가 오염되지 않도록 복사본 반환
+        return copy.deepcopy(entry["envelope"]), best_similarity, entry["query"]
+
+    def put(
+        self,
+        query: str,
+        embedding,
+        params_key: str,
+        envelope: Dict,
+        sources: Optional[List[str]] = None
+    ):
+        """
+        Args:
+            sources: 실제로 검색한 결과 키 (source_ttls 적용 대상, 기본값: envelope의 모든 키)
+        """
+        if self.max_size <= 0:
+            return
+
+        self._entries[self._next_key] = {
+            "query": query,
+            "embedding": self._normalize(embedding),
+            "params_key": params_key,
+            "envelope": copy.deepcopy(envelope),
+            "stored_at": time.monotonic(),
+            "ttl": self._entry_ttl(list(envelope) if sources is None else sources),
+        }
+        self._next_key += 1
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+        self._matrix = None
+
+    def clear(self):
+        self._entries.clear()
+        self._matrix = None
+
+    def get_stats(self) -> Dict:
+        total = self.hits + self.misses
+        similarities = [record["similarity"] for record in self.hit_log]
+        return {
+            "size": len(self._entries),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+            "avg_hit_similarity": float(np.mean(similarities)) if similarities else 0.0,
+            "min_hit_similarity": float(np.min(similarities)) if similarities else 0.0,
+        }
@@ -0,0 +1,115 @@
+"""
+Singleflight 요청 병합
+- 같은 키의 동시 요청은 하나의 실행만 백엔드로 보내고 결과를 공유
+- async generator (스트리밍 검색)도 공유: 모든 구독자가 같은 항목을 같은 순서로 받음
+- 병합 비율 지표 제공 (coalesced / calls)
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+
+class _StreamFlight:
+    """진행 중인 스트림 1개 - 항목을 기록하며 구독자에게 전달"""
+
+    def __init__(self, stream: AsyncIterator):
+        self.items: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._changed = asyncio.Event()
+        # 구독자(요청자) 취소와 무관하게 끝까지 실행
+        self.task = asyncio.ensure_future(self._run(stream))
+
+    async def _run(self, stream: AsyncIterator):
+        try:
+            async for item in stream:
+                self.items.append(item)
+                self._notify()
+        except asyncio.CancelledError:
+            self.error = RuntimeError("공유 검색이 취소되었습니다")
+            raise
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self._notify()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self):
+        await self._changed.wait()
+
+
+class SingleFlight:
+    """동일 키 동시 요청 병합
+
+    사용 예:
+        flight = SingleFlight()
+        result = await flight.do(key, lambda: fetch(query))
+        async for item in flight.stream(key, lambda: search_stream(query)):
+            ...
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, Any] = {}
+        self.stats = {
+            "calls": 0,
+            "executions": 0,
+            "coalesced": 0,
+        }
+
+    def _release(self, key: str, flight: Any):
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """코루틴 결과 공유 - 진행 중인 동일 키 실행이 있으면 그 결과를 기다림"""
+        self.stats["calls"] += 1
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self.stats["executions"] += 1
+            task.add_done_callback(lambda _: self._release(key, task))
+        else:
+            self.stats["coalesced"] += 1
+
+        # 한 요청자의 취소가 공유 실행을 취소하지 않도록 shield
+        return await asyncio.shield(task)
+
+    async def stream(self, key: str, fn: Callable[[], AsyncIterator]) -> AsyncIterator:
+        """async generator 공유 - 늦게 합류한 구독자는 지난 항목부터 재생"""
+        self.stats["calls"] += 1
+
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = _StreamFlight(fn())
+            self._inflight[key] = flight
+            self.stats["executions"] += 1
+            flight.task.add_done_callback(lambda _: self._release(key, flight))
+        else:
+            self.stats["coalesced"] += 1
+
+        index = 0
+        while True:
+            while index < len(flight.items):
+                yield flight.items[index]
+                index += 1
+
+            if flight.done:
+                if flight.error is not None:
+                    raise flight.error
+                return
+
+            await flight.wait()
+
+    def get_stats(self) -> Dict:
+        calls = self.stats["calls"]
+        return {
+            **self.stats,
+            "inflight": len(self._inflight),
+            "coalescing_ratio": self.stats["coalesced"] / calls if calls else 0.0,
+        }
@@ -18,13 +18,17 @@ https://api.semanticscholar.org/api-docs/
 import json
 import time
 import argparse
+import sys
 import requests
-import xml.etree.ElementTree as ET
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import random
 from difflib import SequenceMatcher
 
+# parlant/pubmed_xml.py (검색 엔진과 같은 efetch 스트리밍 파서) 사용
+sys.path.insert(0, str(Path(__file__).parent.parent / "parlant"))
+from pubmed_xml import element_text, iter_pubmed_articles, normalize_month, parse_article
+
 
 class SemanticScholarPubMedEnricher:
     """PubMed + Semantic Scholar API 하이브리드 메타데이터 보완 클래스"""
@@ -176,13 +180,10 @@ class SemanticScholarPubMedEnricher:
                     continue
                 
                 response.raise_for_status()
-                root = ET.fromstring(response.content)
-                article_elem = root.find('.//PubmedArticle')
-                
-                if article_elem is None:
-                    return None
+                for article_elem in iter_pubmed_articles(response.content):
+                    return self._parse_article_xml(article_elem)
                 
-                return self._parse_article_xml(article_elem)
+                return None
                 
             except requests.exceptions.RequestException as e:
                 if attempt == self.max_retries - 1:
@@ -192,62 +193,43 @@ class SemanticScholarPubMedEnricher:
         return None
     
     def _parse_article_xml(self, article_elem) -> Optional[Dict]:
-        """XML에서 메타데이터 파싱"""
+        """XML에서 메타데이터 파싱 (공통 파서 결과를 전처리 메타데이터 형식으로 변환)"""
         try:
-            medline_citation = article_elem.find('.//MedlineCitation')
-            article = medline_citation.find('.//Article')
+            paper = parse_article(article_elem)
             
-            # 제목
-            title_elem = article.find('.//ArticleTitle')
-            title = ''.join(title_elem.itertext()) if title_elem is not None else ''
-            
-            # 저자
+            # 저자 ("이름 성" 형식, 한쪽만 있어도 포함)
             authors = []
-            for author_elem in article.findall('.//Author'):
+            for author_elem in article_elem.iter('Author'):
                 last_name = author_elem.findtext('LastName', '')
                 fore_name = author_elem.findtext('ForeName', '')
                 if last_name or fore_name:
                     authors.append(f"{fore_name} {last_name}".strip())
             
-            # 저널
-            journal_elem = article.find('.//Journal')
-            journal = journal_elem.findtext('.//Title', '') if journal_elem is not None else ''
-            
-            # 출판일
-            pub_date_elem = article.find('.//PubDate')
-            publication_date = self._parse_pub_date(pub_date_elem)
-            
-            # DOI
-            doi = ''
-            for article_id in article_elem.findall('.//ArticleId'):
-                if article_id.get('IdType') == 'doi':
-                    doi = article_id.text
-                    break
-            
-            # 키워드
+            # 키워드 (parse_article은 첫 KeywordList만 읽으므로 NLM/NOTNLM 등 모든 KeywordList에서 수집)
             keywords = []
-            for keyword_elem in medline_citation.findall('.//Keyword'):
-                keyword = keyword_elem.text
-                if keyword:
-                    keywords.append(keyword)
+            medline_citation = article_elem.find('MedlineCitation')
+            if medline_citation is not None:
+                for keyword_elem in medline_citation.iter('Keyword'):
+                    keyword = element_text(keyword_elem)
+                    if keyword:
+                        keywords.append(keyword)
             
             # MeSH 용어 추가
             mesh_count = 0
-            for mesh_elem in medline_citation.findall('.//MeshHeading/DescriptorName'):
+            for mesh_term in paper['mesh_terms']:
                 if mesh_count >= 5:
                     break
-                mesh_term = mesh_elem.text
                 if mesh_term and mesh_term not in keywords:
                     keywords.append(mesh_term)
                     mesh_count += 1
             
             metadata = {
-                'title': title,
+                'title': paper['title'],
                 'keywords': keywords,
-                'journal': journal,
+                'journal': paper['journal'],
                 'authors': authors,
-                'doi': doi,
-                'publication_date': publication_date,
+                'doi': paper['doi'],
+                'publication_date': self._parse_pub_date(article_elem.find('.//PubDate')),
                 'source': 'pubmed'
             }
             
@@ -266,15 +248,8 @@ class SemanticScholarPubMedEnricher:
         month = pub_date_elem.findtext('Month', '01')
         day = pub_date_elem.findtext('Day', '01')
         
-        month_map = {
-            'Jan': '01', 'Feb': '02', 'Mar': '03', 'Apr': '04',
-            'May': '05', 'Jun': '06', 'Jul': '07', 'Aug': '08',
-            'Sep': '09', 'Oct': '10', 'Nov': '11', 'Dec': '12'
-        }
-        
-        if month in month_map:
-            month = month_map[month]
-        elif not month.isdigit():
+        month = normalize_month(month)
+        if not month.isdigit():
             month = '01'
         
         try: